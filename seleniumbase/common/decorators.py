@@ -1,3 +1,4 @@
+import collections
 import inspect
 import logging
 import math
@@ -72,6 +73,50 @@ def rate_limited(max_per_second):
     return decorate
 
 
+def memoized(max_size=1024):
+    """ This decorator caches the results of a function in a bounded LRU,
+        keyed by the (hashable) positional arguments of each call.
+        Exceptions are not cached. Thread-safe.
+        Use func.cache_info() to see hits/misses, and func.cache_clear(). """
+
+    def decorate(func):
+        cache = collections.OrderedDict()
+        stats = {"hits": 0, "misses": 0}
+        cache_lock = threading.Lock()  # To support multi-threading
+
+        @wraps(func)
+        def memoized_function(*args):
+            with cache_lock:
+                if args in cache:
+                    stats["hits"] += 1
+                    result = cache.pop(args)
+                    cache[args] = result  # Mark as most recently used
+                    return result
+                stats["misses"] += 1
+            result = func(*args)
+            with cache_lock:
+                cache[args] = result
+                while len(cache) > max_size:
+                    cache.popitem(last=False)
+            return result
+
+        def cache_info():
+            with cache_lock:
+                return {"hits": stats["hits"], "misses": stats["misses"],
+                        "size": len(cache), "max_size": max_size}
+
+        def cache_clear():
+            with cache_lock:
+                cache.clear()
+                stats["hits"] = 0
+                stats["misses"] = 0
+
+        memoized_function.cache_info = cache_info
+        memoized_function.cache_clear = cache_clear
+        return memoized_function
+    return decorate
+
+
 def deprecated(message=None):
     """ This decorator marks methods as deprecated.
         A warning is displayed if the method is called. """
@@ -14,6 +14,12 @@ which is always run after page loads, unless changed in "settings.py".
 Using ad_block will slow down test runs a little. (Use only if necessary.)
 
 Format: A CSS Selector that's ready for JavaScript's querySelectorAll()
+
+When using "--ad_block", requests to the hosts in AD_HOST_BLOCK_LIST are
+also blocked when the browser launches (Chrome: host resolver rules,
+Firefox: a proxy auto-config script), so those ads never get downloaded.
+(This only works when not using a proxy server.)
+Format: A host name, optionally starting with "*." for all subdomains.
 """
 
 AD_BLOCK_LIST = [
@@ -73,3 +79,29 @@ AD_BLOCK_LIST = [
     'script[src*="/pagead/"]',
     'section.dianomi-ad',
 ]
+
+
+AD_HOST_BLOCK_LIST = [
+    '*.2mdn.net',
+    '*.adnxs.com',
+    '*.adsrvr.org',
+    '*.advertising.com',
+    '*.amazon-adsystem.com',
+    '*.carbonads.com',
+    '*.casalemedia.com',
+    '*.criteo.com',
+    '*.criteo.net',
+    '*.dianomi.com',
+    '*.doubleclick.net',
+    '*.googleadservices.com',
+    '*.googlesyndication.com',
+    '*.googletagservices.com',
+    '*.moatads.com',
+    '*.openx.net',
+    '*.outbrain.com',
+    '*.pubmatic.com',
+    '*.rubiconproject.com',
+    '*.smartadserver.com',
+    '*.taboola.com',
+    'adservice.google.com',
+]
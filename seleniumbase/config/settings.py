@@ -17,6 +17,108 @@ SMALL_TIMEOUT = 6
 LARGE_TIMEOUT = 10
 EXTREME_TIMEOUT = 30
 
+# Polling intervals (in seconds) used while waiting for page elements.
+# Polls start at POLL_MIN_INTERVAL and back off exponentially (multiplied by
+# POLL_BACKOFF after each attempt) until reaching POLL_MAX_INTERVAL.
+# This makes fast pages pass sooner without flooding slow pages with polls.
+POLL_MIN_INTERVAL = 0.01
+POLL_MAX_INTERVAL = 0.1
+POLL_BACKOFF = 1.5
+
+# If True, wait_for_element_visible() / assert_element() and
+# wait_for_element_absent() wait inside the browser using a MutationObserver
+# (for CSS Selectors and XPaths), which only takes one WebDriver call per wait
+# instead of one or two calls per poll. Useful when running on a busy Grid.
+# (Waits fall back to regular polling if the in-page wait can't be used.)
+WAIT_FOR_ELEMENTS_IN_PAGE = False
+
+# If True, elements found by visibility waits (used by click(), get_text(),
+# update_text(), etc.) are cached per driver by (by, selector, frame, window),
+# so that repeated actions on the same selector skip the element lookup.
+# Cached elements are re-checked with is_displayed() before use, evicted when
+# stale, and the cache is cleared when navigating to a new page.
+# (Use self.get_element_cache_stats() to see hits/misses for tuning.)
+CACHE_ELEMENTS = False
+ELEMENT_CACHE_MAX_SIZE = 200
+
+# The maximum number of selectors to keep pre-parsed (type detection, CSS
+# conversion, and JS escaping) in the selector LRU cache. (selector_utils.py)
+SELECTOR_CACHE_MAX_SIZE = 2048
+
+# When using lean mode ("--lean"), the short hard-coded sleeps after actions
+# are replaced with waiting for the DOM to settle. The DOM is considered
+# settled once there haven't been any DOM mutations for this many seconds.
+# (Waiting never lasts longer than the sleep it replaces.)
+LEAN_MODE_QUIET_TIME = 0.03
+
+# The time saved by lean mode in each test is saved to this file, as JSON
+# lines, in the log folder. (The plugins print a report from it at the end.)
+LEAN_MODE_REPORT_FILE = "lean_mode.jsonl"
+
+# When reusing browser sessions between tests ("--reuse_session"), a browser
+# gets quit and replaced with a new one after being used by this many tests.
+REUSE_SESSION_MAX_USES = 25
+
+# If True, browsers are quit on background threads at the end of each test,
+# so that the next test can start right away. A browser that doesn't quit
+# within DRIVER_QUIT_TIMEOUT seconds has its process tree killed.
+# (All remaining quits are waited for at the end of the test run.)
+QUIT_DRIVERS_IN_BACKGROUND = True
+DRIVER_QUIT_TIMEOUT = 10
+
+# Generated browser artifacts (the Chrome proxy-auth extension zip and
+# Firefox profile templates) are built once and then cached in this folder.
+# (If None, a "seleniumbase_artifacts" folder in the temp directory is used.)
+ARTIFACT_CACHE_DIR = None
+
+# When profiling browser launches ("--profile_launch"), the phase timings of
+# every launch are saved to this file, as JSON lines, in the log folder.
+LAUNCH_PROFILE_FILE = "launch_profile.jsonl"
+
+# Browsers get replaced (recycled) at safe points once the RSS memory of the
+# browser's process tree reaches RECYCLE_DRIVER_MAX_RSS_MB (requires psutil),
+# or once RECYCLE_DRIVER_MAX_COMMANDS WebDriver commands have been sent.
+# (0 turns a limit off. Override with: "--max_driver_rss=MB" and/or
+# "--max_driver_commands=COUNT") Recycling events go to the log file below.
+RECYCLE_DRIVER_MAX_RSS_MB = 0
+RECYCLE_DRIVER_MAX_COMMANDS = 0
+DRIVER_RECYCLE_LOG = "driver_recycling.log"
+
+# Browser/driver processes that are left running (after a failed quit, or
+# from a test process that crashed) get killed, and each time that happens
+# it gets saved to this file, as JSON lines, in the log folder.
+# (Tracking processes requires psutil.)
+PROCESS_REAPER_LOG = "process_reaper.jsonl"
+
+# If True, the JavaScript/CSS libraries that SeleniumBase adds to web pages
+# (jQuery, Messenger, jquery-confirm, and the tour libraries) are added inline
+# from local copies, in a single script call. (Download them ahead of time
+# with: "seleniumbase download assets") If an asset isn't available, or if
+# INLINE_ASSETS is False, libraries are loaded from their CDN links instead.
+# (If ASSET_STORE_DIR is None, the "seleniumbase/assets" folder is used.)
+INLINE_ASSETS = True
+ASSET_STORE_DIR = None
+
+# Link checking, used by assert_no_404_errors() and
+# print_unique_links_with_status_codes(). Links are checked with HEAD
+# requests first (GET if that fails), with a shared connection pool per host.
+# MAX_WORKERS caps the links checked at once overall, and MAX_PER_HOST caps
+# them for each host. If LINK_CHECK_TIME_BUDGET (seconds) isn't None,
+# links that haven't been checked by then are reported as not checked.
+LINK_CHECK_MAX_WORKERS = 20
+LINK_CHECK_MAX_PER_HOST = 6
+LINK_CHECK_TIME_BUDGET = None
+
+# Link status codes are cached for LINK_CACHE_TTL seconds (0 turns it off),
+# or for LINK_CACHE_NEGATIVE_TTL seconds for broken links (Ex: 404s).
+# (Timeouts and connection errors aren't cached.)
+# Use "--link_cache_db=FILE" to share the cache between test processes
+# (Ex: pytest -n 4) with a SQLite file. Cache hit rates get saved to the
+# LINK_CACHE_STATS_FILE in the log folder, and printed at the end.
+LINK_CACHE_TTL = 600
+LINK_CACHE_NEGATIVE_TTL = 60
+LINK_CACHE_STATS_FILE = "link_cache_stats.jsonl"
+
 # If True, existing logs from past test runs will be saved and take up space.
 # If False, only the logs from the most recent test run will be saved locally.
 # You can also archive existing logs on the command line with: "--archive_logs"
@@ -54,6 +156,26 @@ This adds wait_for_angularjs() after various browser actions.
 '''
 WAIT_FOR_ANGULARJS = True
 
+'''
+This adds waiting for pending jQuery AJAX requests (jQuery.active == 0)
+to wait_for_ready_state_complete(). (Gives up after MINI_TIMEOUT seconds.)
+All page readiness checks are done together with a single script call.
+(Off by default: pages that keep a jQuery long-polling request open would
+wait MINI_TIMEOUT seconds after every click.)
+'''
+WAIT_FOR_JQUERY_AJAX = False
+
+'''
+This adds waiting for the network to be idle (no fetch/XHR/WebSocket-connect
+requests in flight for NETWORK_IDLE_MS milliseconds) to the page readiness
+check that's done by wait_for_ready_state_complete(), including after clicks
+when WAIT_FOR_RSC_ON_CLICKS is on. (Gives up after MINI_TIMEOUT seconds.)
+Useful for single-page apps that keep loading data after readyState is done.
+You can also call self.wait_for_network_idle() directly in tests.
+'''
+WAIT_FOR_NETWORK_IDLE = False
+NETWORK_IDLE_MS = 500
+
 # Default time to wait after each browser action performed during Demo Mode.
 # Use Demo Mode when you want others to see what your automation is doing.
 # Usage: "--demo_mode". (Can be overwritten by using "--demo_sleep=TIME".)
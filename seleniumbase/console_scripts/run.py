@@ -9,6 +9,8 @@ seleniumbase install chromedriver
 seleniumbase mkdir browser_tests
 seleniumbase convert my_old_webdriver_unittest.py
 seleniumbase download server
+seleniumbase download assets
+seleniumbase warm-cache https://my-app.example.com
 seleniumbase grid-hub start
 seleniumbase grid-node start --hub=127.0.0.1
 """
@@ -17,6 +19,8 @@ import sys
 from seleniumbase.console_scripts import logo_helper
 from seleniumbase.console_scripts import sb_mkdir
 from seleniumbase.console_scripts import sb_install
+from seleniumbase.console_scripts import sb_warm_cache
+from seleniumbase.core import asset_store
 from seleniumbase.utilities.selenium_grid import download_selenium_server
 from seleniumbase.utilities.selenium_grid import grid_hub
 from seleniumbase.utilities.selenium_grid import grid_node
@@ -45,6 +49,7 @@ def show_basic_usage():
     print("       objectify [SELENIUMBASE_PYTHON_FILE] [OPTIONS]")
     print("       revert-objects [SELENIUMBASE_PYTHON_FILE]")
     print("       download [ITEM]")
+    print("       warm-cache [URL] [MORE URLS] [OPTIONS]")
     print("       grid-hub [start|stop|restart] [OPTIONS]")
     print("       grid-node [start|stop|restart] --hub=[HUB_IP] [OPTIONS]")
     print('  * (EXAMPLE: "seleniumbase install chromedriver") *')
@@ -166,12 +171,38 @@ def show_download_usage():
     print("")
     print("  Usage:")
     print("           seleniumbase download [ITEM]")
-    print("                  (Choices: server)")
-    print("  Example:")
+    print("                  (Choices: server, assets)")
+    print("  Examples:")
     print("           seleniumbase download server")
+    print("           seleniumbase download assets")
     print("  Output:")
     print("           Downloads the specified item.")
     print("           (server is required for using your own Selenium Grid)")
+    print("           (assets are the JS/CSS libraries that get added to")
+    print("            pages inline, such as jQuery, so that tests don't")
+    print("            need to load them from CDNs while running.)")
+    print("")
+
+
+def show_warm_cache_usage():
+    print("  ** warm-cache **")
+    print("")
+    print("  Usage:")
+    print("           seleniumbase warm-cache [URL] [MORE URLS] [OPTIONS]")
+    print("  Options:")
+    print("           --dir=DIR  (The warm cache profile folder.)")
+    print("                 (Default: warm_cache_profile)")
+    print("           --browser=BROWSER  (chrome or firefox)")
+    print("                 (Default: chrome)")
+    print("           --headless  (Run the browser in headless mode.)")
+    print("  Example:")
+    print("           seleniumbase warm-cache https://my-app.example.com")
+    print("  Output:")
+    print("           Visits the URLs with a new browser, and then saves")
+    print("           that browser's HTTP cache in DIR. Tests that run with")
+    print("           --warm_cache_profile=DIR start with a copy of it, so")
+    print("           they don't re-download the same JS/CSS and fonts.")
+    print("           (Cookies and Web Storage are not saved.)")
     print("")
 
 
@@ -221,6 +252,7 @@ def show_detailed_help():
     show_objectify_usage()
     show_revert_objects_usage()
     show_download_usage()
+    show_warm_cache_usage()
     show_grid_hub_usage()
     show_grid_node_usage()
 
@@ -285,9 +317,19 @@ def main():
     elif command == "download":
         if len(command_args) >= 1 and command_args[0].lower() == "server":
             download_selenium_server.main(force_download=True)
+        elif len(command_args) >= 1 and command_args[0].lower() == "assets":
+            failed_links = asset_store.download_all_assets()
+            if failed_links:
+                sys.exit(1)
         else:
             show_basic_usage()
             show_download_usage()
+    elif command == "warm-cache" or command == "warm_cache":
+        if len(command_args) >= 1:
+            sb_warm_cache.main()
+        else:
+            show_basic_usage()
+            show_warm_cache_usage()
     elif command == "grid-hub" or command == "grid_hub":
         if len(command_args) >= 1:
             grid_hub.main()
@@ -334,6 +376,10 @@ def main():
                 print("")
                 show_download_usage()
                 return
+            elif command_args[0] == "warm-cache":
+                print("")
+                show_warm_cache_usage()
+                return
             elif command_args[0] == "grid-hub":
                 print("")
                 show_grid_hub_usage()
@@ -0,0 +1,80 @@
+"""
+Builds a warm HTTP cache for "--warm_cache_profile=DIR".
+
+Usage:
+seleniumbase warm-cache [URL] [MORE URLS] [OPTIONS]
+Options:
+--dir=DIR (The warm cache profile folder.) (Default: warm_cache_profile)
+--browser=BROWSER (chrome or firefox) (Default: chrome)
+--headless (Run the browser in headless mode.)
+Output:
+Visits the URLs with a new browser, and then saves that browser's
+HTTP cache as the cache template of the browser type, in DIR.
+Tests that run with "--warm_cache_profile=DIR" start with a copy
+of that cache, so they don't have to re-download the same assets.
+(Run again after deploying new assets to refresh the cache.)
+"""
+
+import sys
+from seleniumbase.core import warm_cache
+
+DEFAULT_DIR = "warm_cache_profile"
+VALID_BROWSERS = ["chrome", "firefox"]
+
+
+def invalid_run_command():
+    exp = ("  ** warm-cache **\n\n")
+    exp += "  Usage:\n"
+    exp += "        seleniumbase warm-cache [URL] [MORE URLS] [OPTIONS]\n"
+    exp += "  Options:\n"
+    exp += "        --dir=DIR (The warm cache profile folder.)\n"
+    exp += "              (Default: warm_cache_profile)\n"
+    exp += "        --browser=BROWSER (chrome or firefox)\n"
+    exp += "              (Default: chrome)\n"
+    exp += "        --headless (Run the browser in headless mode.)\n"
+    exp += "  Output:\n"
+    exp += "        Visits the URLs with a new browser, and then saves that\n"
+    exp += "        browser's HTTP cache in DIR. Tests that run with\n"
+    exp += "        --warm_cache_profile=DIR start with a copy of it.\n"
+    raise Exception('INVALID RUN COMMAND!\n\n%s' % exp)
+
+
+def main():
+    num_args = len(sys.argv)
+    if sys.argv[0].split('/')[-1] == "seleniumbase" or (
+            sys.argv[0].split('\\')[-1] == "seleniumbase"):
+        if num_args < 3:
+            invalid_run_command()
+    else:
+        invalid_run_command()
+    urls = []
+    warm_cache_profile = DEFAULT_DIR
+    browser_name = "chrome"
+    headless = False
+    for arg in sys.argv[2:]:
+        if arg.startswith("--dir="):
+            warm_cache_profile = arg.split("--dir=")[1]
+        elif arg.startswith("--browser="):
+            browser_name = arg.split("--browser=")[1].lower()
+        elif arg == "--headless":
+            headless = True
+        elif arg.startswith("-"):
+            invalid_run_command()
+        else:
+            urls.append(arg)
+    if not urls or not warm_cache_profile:
+        invalid_run_command()
+    if browser_name not in VALID_BROWSERS:
+        raise Exception("Browser: {%s} can't use a warm cache! "
+                        "Valid options = {%s}" % (
+                            browser_name, ", ".join(VALID_BROWSERS)))
+    template_path = warm_cache.warm_cache(
+        urls, warm_cache_profile, browser_name, headless=headless)
+    print("\n>>> The %s cache was saved to: %s" % (
+        browser_name, template_path))
+    print('(Run tests with "--warm_cache_profile=%s" to use it.)\n' % (
+        warm_cache_profile))
+
+
+if __name__ == "__main__":
+    main()
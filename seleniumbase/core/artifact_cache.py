@@ -0,0 +1,134 @@
+"""
+This module keeps generated browser artifacts (such as the Chrome proxy
+extension zip and Firefox profile templates) in a content-addressed cache
+directory, so that each one is only built once per machine.
+These helper methods SHOULD NOT be called directly from tests.
+
+An artifact's path comes from a hash of everything that goes into it.
+Artifacts are built in a temporary path next to the final one, and then
+renamed into place (an atomic operation), so parallel test processes
+(Ex: pytest -n 4) never see a partially-written artifact, and no locking
+between processes is needed. If two processes build the same artifact at
+the same time, both builds are identical, and the first rename wins.
+
+Artifacts that contain credentials (such as the proxy extension zip, which
+has the proxy password) never go in the shared cache directory. They go
+in a private directory that only exists for the current test process, and
+gets deleted at the end of the run. The same goes for all artifacts if the
+shared cache directory is owned by another user or is writable by others.
+"""
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from seleniumbase.config import settings
+
+# Bump this to invalidate existing artifacts when their contents change
+CACHE_VERSION = "1"
+
+_private_dir = {"path": None}  # Per test process (deleted at the end)
+_private_dir_lock = threading.Lock()
+
+
+def _is_secure_dir(path):
+    """ Returns True if the directory is owned by the current user and
+        isn't writable by other users. (Always True on Windows.) """
+    if not hasattr(os, "getuid"):
+        return True
+    try:
+        stat_info = os.stat(path)
+    except OSError:
+        return False
+    return stat_info.st_uid == os.getuid() and not (
+        stat_info.st_mode & 0o022)
+
+
+def get_cache_dir():
+    cache_dir = settings.ARTIFACT_CACHE_DIR
+    if not cache_dir:
+        cache_dir = os.path.join(
+            tempfile.gettempdir(), "seleniumbase_artifacts")
+    if not os.path.exists(cache_dir):
+        try:
+            os.makedirs(cache_dir, 0o700)
+        except OSError:
+            pass  # Only reachable during multi-process test runs
+    if not _is_secure_dir(cache_dir):
+        # (Another user could replace the artifacts in that directory)
+        return get_private_dir()
+    return cache_dir
+
+
+def get_private_dir():
+    """ Returns the private artifact directory of this test process. """
+    with _private_dir_lock:
+        if not _private_dir["path"]:
+            # (mkdtemp() gives an unpredictable name, with 0o700 permissions)
+            _private_dir["path"] = tempfile.mkdtemp(
+                prefix="seleniumbase_private_")
+        return _private_dir["path"]
+
+
+def remove_private_dir():
+    """ Deletes the private artifact directory. (Called at the end.) """
+    with _private_dir_lock:
+        if _private_dir["path"]:
+            _remove_path(_private_dir["path"])
+            _private_dir["path"] = None
+
+
+def get_artifact_key(kind, *inputs):
+    """ Returns the hash of the artifact kind and all of its inputs. """
+    key_data = repr((CACHE_VERSION, kind) + tuple(inputs))
+    return hashlib.sha256(key_data.encode("utf-8")).hexdigest()[:32]
+
+
+def get_artifact(kind, inputs, build, suffix="", private=False):
+    """
+    Returns the path of the cached artifact, building it first if needed.
+    @Params
+    kind - the type of artifact (used in the file name, Ex: "proxy")
+    inputs - a tuple of everything that determines the artifact's contents
+    build - a function that creates the artifact at the path it's given
+            (as a file or a directory)
+    suffix - the file extension of the artifact (Ex: ".zip")
+    private - if True, use the private directory of this test process
+              (For artifacts that contain credentials, such as passwords)
+    """
+    if private:
+        cache_dir = get_private_dir()
+    else:
+        cache_dir = get_cache_dir()
+    artifact_path = os.path.join(cache_dir, "%s_%s%s" % (
+        kind, get_artifact_key(kind, *inputs), suffix))
+    if os.path.exists(artifact_path):
+        return artifact_path
+    temp_path = "%s.%s.%s.tmp%s" % (
+        artifact_path, os.getpid(), threading.current_thread().ident, suffix)
+    try:
+        build(temp_path)
+        try:
+            os.rename(temp_path, artifact_path)
+        except OSError:
+            # The artifact was already renamed into place by another process
+            # (On Windows, os.rename() fails if the destination exists)
+            if not os.path.exists(artifact_path):
+                raise
+    finally:
+        _remove_path(temp_path)
+    return artifact_path
+
+
+def _remove_path(path):
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    except OSError:
+        pass
+
+
+atexit.register(remove_private_dir)
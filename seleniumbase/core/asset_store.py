@@ -0,0 +1,183 @@
+"""
+This module keeps local copies of the JavaScript/CSS libraries that
+SeleniumBase adds to web pages (jQuery, Messenger, jquery-confirm, and the
+website tour libraries), so that those can be added inline, without using
+the network. These helper methods SHOULD NOT be called directly from tests.
+
+Assets are stored in the "seleniumbase/assets" folder (or ASSET_STORE_DIR
+from settings.py), at the pinned versions from constants.py. Use
+"seleniumbase download assets" to download all of them ahead of time.
+Otherwise, each asset gets downloaded the first time that it's needed.
+Asset contents (and the scripts built from them) are kept in memory after
+the first read, so that adding them to a page costs a single script call.
+"""
+import codecs
+import json
+import os
+import threading
+from seleniumbase.config import settings
+from seleniumbase.fixtures import constants
+from seleniumbase import assets  # asset storage folder for SeleniumBase
+ASSETS_DIR = os.path.dirname(os.path.realpath(assets.__file__))
+
+_contents = {}  # url -> the text of the asset
+_scripts = {}  # (js_links, css_links) -> the script that adds the assets
+_unavailable = set()  # Links that couldn't be downloaded (not retried)
+_store_lock = threading.Lock()
+
+
+def get_all_asset_links():
+    """ Returns the links of all assets that SeleniumBase adds to pages. """
+    asset_classes = [
+        constants.JQuery, constants.Messenger, constants.Underscore,
+        constants.Backbone, constants.JqueryConfirm, constants.BootstrapTour,
+        constants.Hopscotch, constants.IntroJS, constants.Shepherd,
+        constants.Tether]
+    links = []
+    for asset_class in asset_classes:
+        for name in sorted(vars(asset_class)):
+            if name.endswith("_JS") or name.endswith("_CSS"):
+                links.append(getattr(asset_class, name))
+    return links
+
+
+def get_store_dir():
+    return settings.ASSET_STORE_DIR or ASSETS_DIR
+
+
+def get_asset_path(link):
+    """ Returns the local path of the asset, based on its link.
+        Ex: "//cdnjs.cloudflare.com/ajax/libs/jquery/3.4.1/jquery.min.js"
+            => "ASSETS_DIR/cdnjs.cloudflare.com/.../jquery.min.js" """
+    relative_path = link.split("//", 1)[-1].split("?")[0]
+    return os.path.join(get_store_dir(), *relative_path.split("/"))
+
+
+def fetch_asset(link):
+    """ Downloads the asset, and returns its text. (Doesn't store it.) """
+    import requests
+    url = link
+    if url.startswith("//"):
+        url = "https:" + url
+    response = requests.get(url, timeout=settings.SMALL_TIMEOUT)
+    response.raise_for_status()
+    return response.text
+
+
+def save_asset(link, text):
+    """ Saves the text of the asset into the asset store. """
+    asset_path = get_asset_path(link)
+    folder = os.path.dirname(asset_path)
+    if not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except OSError:
+            pass  # Only reachable during multi-process test runs
+    # Write to a temporary file first, then rename (an atomic operation),
+    # so that other test processes never read a partially-written asset
+    temp_path = "%s.%s.%s.tmp" % (
+        asset_path, os.getpid(), threading.current_thread().ident)
+    with codecs.open(temp_path, "w", "utf-8") as asset_file:
+        asset_file.write(text)
+    try:
+        os.rename(temp_path, asset_path)
+    except OSError:
+        os.remove(temp_path)  # (Another process already saved it)
+
+
+def download_asset(link):
+    """ Downloads the asset into the asset store, and returns its text. """
+    text = fetch_asset(link)
+    save_asset(link, text)
+    return text
+
+
+def get_asset(link):
+    """ Returns the text of the asset (from memory, from the asset store,
+        or by downloading it), or None if it isn't available. """
+    with _store_lock:
+        if link in _contents:
+            return _contents[link]
+        if link in _unavailable:
+            return None
+    asset_path = get_asset_path(link)
+    if os.path.exists(asset_path):
+        with codecs.open(asset_path, "r", "utf-8") as asset_file:
+            text = asset_file.read()
+    else:
+        try:
+            text = fetch_asset(link)
+        except Exception:
+            # (Ex: No network access.) Don't try again during this run,
+            # since every try would cost up to SMALL_TIMEOUT seconds.
+            with _store_lock:
+                _unavailable.add(link)
+            return None
+        try:
+            save_asset(link, text)
+        except (IOError, OSError):
+            pass  # (Ex: A read-only install.) Keep the text in memory.
+    with _store_lock:
+        _contents[link] = text
+    return text
+
+
+def get_inline_script(js_links=(), css_links=()):
+    """ Returns a script that adds all the assets to the page inline
+        (CSS first, then JS in order), or None if any asset isn't available.
+        The script returns the number of assets that were added. """
+    key = (tuple(js_links), tuple(css_links))
+    with _store_lock:
+        if key in _scripts:
+            return _scripts[key]
+    styles = []
+    for css_link in css_links:
+        text = get_asset(css_link)
+        if text is None:
+            return None
+        styles.append(text)
+    scripts = []
+    for js_link in js_links:
+        text = get_asset(js_link)
+        if text is None:
+            return None
+        scripts.append(text)
+    # (Inline scripts run as soon as they're added, so no waiting is needed)
+    script = (
+        """var styles = %s, scripts = %s;
+        var head = document.head || document.documentElement;
+        for (var i = 0; i < styles.length; i++) {
+            var style = document.createElement("style");
+            style.type = "text/css";
+            style.appendChild(document.createTextNode(styles[i]));
+            head.appendChild(style);
+        }
+        for (var j = 0; j < scripts.length; j++) {
+            var script = document.createElement("script");
+            script.type = "text/javascript";
+            script.text = scripts[j];
+            head.appendChild(script);
+        }
+        return styles.length + scripts.length;""" % (
+            json.dumps(styles), json.dumps(scripts)))
+    with _store_lock:
+        _scripts[key] = script
+    return script
+
+
+def download_all_assets():
+    """ Downloads all assets into the asset store. (Replaces old copies.)
+        Returns the list of links that couldn't be downloaded. """
+    failed_links = []
+    for link in get_all_asset_links():
+        try:
+            download_asset(link)
+            print("* Downloaded: %s" % link)
+        except Exception as e:
+            print("* FAILED to download: %s (%s)" % (link, e))
+            failed_links.append(link)
+    with _store_lock:
+        _contents.clear()
+        _scripts.clear()
+        _unavailable.clear()
+    return failed_links
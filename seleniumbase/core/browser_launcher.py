@@ -1,17 +1,31 @@
+import json
 import os
-import random
 import re
+import shutil
 import sys
 import threading
 import time
 import warnings
+import zipfile
+if sys.version_info[0] == 2:
+    from urllib import getproxies, quote
+else:
+    from urllib.parse import quote
+    from urllib.request import getproxies
 from selenium import webdriver
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from seleniumbase.config import ad_block_list
 from seleniumbase.config import proxy_list
 from seleniumbase.config import settings
+from seleniumbase.core import artifact_cache
 from seleniumbase.core import download_helper
+from seleniumbase.core import driver_reaper
+from seleniumbase.core import driver_recycler
+from seleniumbase.core import launch_profiler
+from seleniumbase.core import process_tracker
 from seleniumbase.core import proxy_helper
+from seleniumbase.core import warm_cache
 from seleniumbase.core import capabilities_parser
 from seleniumbase.fixtures import constants
 from seleniumbase.fixtures import page_utils
@@ -22,6 +36,10 @@ EXTENSIONS_DIR = os.path.dirname(os.path.realpath(extensions.__file__))
 DISABLE_CSP_ZIP_PATH = "%s/%s" % (EXTENSIONS_DIR, "disable_csp.zip")
 PROXY_ZIP_PATH = proxy_helper.PROXY_ZIP_PATH
 PROXY_ZIP_PATH_2 = proxy_helper.PROXY_ZIP_PATH_2
+BLOCKABLE_RESOURCES = ("images", "fonts", "media")
+# The chrome.webRequest resource types of the resources blocked by extension
+CHROME_REQUEST_TYPES = {"fonts": "font", "media": "media"}
+_shown_warnings = set()  # (Each warning is only shown once per process)
 PLATFORM = sys.platform
 IS_WINDOWS = False
 LOCAL_CHROMEDRIVER = None
@@ -45,6 +63,14 @@ else:
     pass  # SeleniumBase will use web drivers from the System PATH by default
 
 
+# Set in the thread that pre-launches the next test's driver (see below)
+_launch_state = threading.local()
+# The driver being pre-launched (or already pre-launched) for the next test
+_prelaunched = None
+_prelaunch_lock = threading.Lock()
+_prelaunch_stats = {"launched": 0, "adopted": 0, "discarded": 0, "saved": 0.0}
+
+
 def make_executable(file_path):
     # Set permissions to: "If you can read it, you can execute it."
     mode = os.stat(file_path).st_mode
@@ -65,22 +91,19 @@ def _add_chrome_proxy_extension(
     """ Implementation of https://stackoverflow.com/a/35293284 for
         https://stackoverflow.com/questions/12848327/
         (Run Selenium on a proxy server that requires authentication.) """
-    if not "".join(sys.argv) == "-c":
-        # Single-threaded
+    # The zip is built once per test process for the proxy settings, and
+    # then reused from the private artifact directory
+    try:
+        proxy_zip = proxy_helper.get_proxy_zip(
+            proxy_string, proxy_user, proxy_pass)
+    except Exception:
+        # The private artifact directory can't be written. Build the zip
+        # for this run only. (It gets removed at the end of the run.)
         proxy_helper.create_proxy_zip(proxy_string, proxy_user, proxy_pass)
-    else:
-        # Pytest multi-threaded test
-        lock = threading.Lock()
-        with lock:
-            time.sleep(random.uniform(0.02, 0.15))
-            if not os.path.exists(PROXY_ZIP_PATH):
-                proxy_helper.create_proxy_zip(
-                    proxy_string, proxy_user, proxy_pass)
-            time.sleep(random.uniform(0.1, 0.2))
-    proxy_zip = PROXY_ZIP_PATH
-    if not os.path.exists(PROXY_ZIP_PATH):
-        # Handle "Permission denied" on the default proxy.zip path
-        proxy_zip = PROXY_ZIP_PATH_2
+        proxy_zip = PROXY_ZIP_PATH
+        if not os.path.exists(PROXY_ZIP_PATH):
+            # Handle "Permission denied" on the default proxy.zip path
+            proxy_zip = PROXY_ZIP_PATH_2
     chrome_options.add_extension(proxy_zip)
     return chrome_options
 
@@ -93,9 +116,115 @@ def _add_chrome_disable_csp_extension(chrome_options):
     return chrome_options
 
 
+def _add_chrome_block_resources_extension(chrome_options, request_types):
+    """ Blocks requests for the given resource types with an extension.
+        (The zip is built once per machine, and kept in the artifact cache.)
+    """
+    background_js = (
+        """chrome.webRequest.onBeforeRequest.addListener(\n"""
+        """        function() { return {cancel: true}; },\n"""
+        """        {urls: ["<all_urls>"], types: %s},\n"""
+        """        ['blocking']\n"""
+        """);""" % json.dumps(list(request_types)))
+    manifest_json = (
+        '''{\n'''
+        '''"version": "1.0.0",\n'''
+        '''"manifest_version": 2,\n'''
+        '''"name": "Chrome Block Resources",\n'''
+        '''"permissions": [\n'''
+        '''    "webRequest",\n'''
+        '''    "webRequestBlocking",\n'''
+        '''    "<all_urls>"\n'''
+        '''],\n'''
+        '''"background": {\n'''
+        '''    "scripts": ["background.js"]\n'''
+        '''},\n'''
+        '''"minimum_chrome_version":"22.0.0"\n'''
+        '''}''')
+
+    def build_zip(zip_path):
+        zf = zipfile.ZipFile(zip_path, mode='w')
+        zf.writestr("background.js", background_js)
+        zf.writestr("manifest.json", manifest_json)
+        zf.close()
+    block_zip = artifact_cache.get_artifact(
+        "block_resources", (background_js, manifest_json), build_zip,
+        suffix=".zip")
+    chrome_options.add_extension(block_zip)
+    return chrome_options
+
+
+def _get_ad_host_patterns():
+    """ Returns the host patterns of AD_HOST_BLOCK_LIST.
+        ("*.example.com" also covers "example.com" itself.) """
+    patterns = []
+    for host in ad_block_list.AD_HOST_BLOCK_LIST:
+        patterns.append(host)
+        if host.startswith("*."):
+            patterns.append(host[2:])
+    return patterns
+
+
+def _get_ad_block_pac_url():
+    """ Returns a proxy auto-config script (as a data: URL) that sends
+        requests for ad hosts to a closed local port, so that they fail
+        right away. All other requests are sent directly. """
+    conditions = " ||\n        ".join(
+        ["shExpMatch(host, %s)" % json.dumps(pattern)
+         for pattern in _get_ad_host_patterns()])
+    pac_script = (
+        """function FindProxyForURL(url, host) {\n"""
+        """    if (%s) {\n"""
+        """        return "PROXY 127.0.0.1:9";\n"""
+        """    }\n"""
+        """    return "DIRECT";\n"""
+        """}""" % conditions)
+    return "data:application/x-ns-proxy-autoconfig," + quote(pac_script)
+
+
+def _has_system_proxy():
+    """ Returns True if a system proxy is configured (Ex: "https_proxy"
+        environment variables, or the macOS/Windows proxy settings). """
+    try:
+        proxies = getproxies()
+    except Exception:
+        return False
+    return any([scheme != "no" for scheme in proxies])
+
+
+def _display_warning_once(message):
+    if message in _shown_warnings:
+        return
+    _shown_warnings.add(message)
+    warnings.simplefilter('always', Warning)  # See Warnings
+    warnings.warn(message, category=Warning, stacklevel=2)
+    warnings.simplefilter('default', Warning)  # Set Default
+
+
+def _get_block_resources(block_resources):
+    """ Returns the resource types to block as a sorted tuple.
+        Accepts a comma-separated string (Ex: "images,fonts") or a list. """
+    if not block_resources:
+        return ()
+    if isinstance(block_resources, (list, tuple, set)):
+        resources = block_resources
+    else:
+        resources = block_resources.split(",")
+    resources = set([resource.strip().lower() for resource in resources])
+    resources.discard("")
+    for resource in resources:
+        if resource not in BLOCKABLE_RESOURCES:
+            raise Exception(
+                'Invalid resource type for "--block_resources": {%s}! '
+                'Valid options: %s' % (
+                    resource, ", ".join(BLOCKABLE_RESOURCES)))
+    return tuple(sorted(resources))
+
+
 def _set_chrome_options(
         downloads_path, headless, proxy_string, proxy_auth,
-        proxy_user, proxy_pass, user_agent, disable_csp):
+        proxy_user, proxy_pass, user_agent, disable_csp,
+        block_ads, block_resources):
     chrome_options = webdriver.ChromeOptions()
     prefs = {
         "download.default_directory": downloads_path,
@@ -105,6 +234,8 @@ def _set_chrome_options(
             "password_manager_enabled": False
         }
     }
+    if "images" in block_resources:
+        prefs["profile.managed_default_content_settings.images"] = 2
     chrome_options.add_experimental_option("prefs", prefs)
     chrome_options.add_argument("--test-type")
     chrome_options.add_argument("--log-level=3")
@@ -124,6 +255,25 @@ def _set_chrome_options(
         # Headless Chrome doesn't support extensions, which are required
         # for disabling the Content Security Policy on Chrome
         chrome_options = _add_chrome_disable_csp_extension(chrome_options)
+    request_types = [CHROME_REQUEST_TYPES[resource]
+                     for resource in block_resources
+                     if resource in CHROME_REQUEST_TYPES]
+    if request_types and not headless:
+        # Chrome has no preferences for blocking fonts or media, so those
+        # get blocked by an extension (Headless Chrome doesn't support them)
+        chrome_options = _add_chrome_block_resources_extension(
+            chrome_options, request_types)
+    elif request_types:
+        _display_warning_once(
+            '\n\nWARNING: Headless Chrome can only block "images" with '
+            '"--block_resources". *** "%s" will NOT be blocked! ***'
+            % ", ".join(sorted(set(block_resources) - set(["images"]))))
+    if block_ads and not proxy_string:
+        # Ad hosts fail to resolve, so ads never get downloaded.
+        # (Host resolver rules don't apply to requests sent to a proxy.)
+        chrome_options.add_argument("--host-resolver-rules=%s" % ", ".join(
+            ["MAP %s ~NOTFOUND" % pattern
+             for pattern in _get_ad_host_patterns()]))
     if proxy_string:
         if proxy_auth:
             chrome_options = _add_chrome_proxy_extension(
@@ -133,7 +283,46 @@ def _set_chrome_options(
 
 
 def _create_firefox_profile(
-        downloads_path, proxy_string, user_agent, disable_csp):
+        downloads_path, proxy_string, user_agent, disable_csp,
+        block_ads, block_resources):
+    """ Returns a new Firefox profile that's copied from a cached template.
+        (The template is built once per machine for the profile settings.)
+    """
+    disable_csp = bool(settings.DISABLE_CSP_ON_FIREFOX or disable_csp)
+    if block_ads and not proxy_string and _has_system_proxy():
+        # The ad-blocking proxy auto-config script would replace the system
+        # proxy. (Ads still get removed from pages by ad_block().)
+        block_ads = False
+    if "media" in block_resources:
+        _display_warning_once(
+            '\n\nWARNING: Firefox can only stop media from autoplaying '
+            'with "--block_resources=media". *** Media that a page loads '
+            'will still get downloaded! ***')
+
+    def build_profile_template(template_path):
+        profile = _build_firefox_profile(
+            downloads_path, proxy_string, user_agent, disable_csp,
+            block_ads, block_resources)
+        profile.update_preferences()  # Saves the preferences to user.js
+        shutil.copytree(profile.path, template_path)
+        shutil.rmtree(profile.path, ignore_errors=True)
+    try:
+        template_path = artifact_cache.get_artifact(
+            "firefox_profile",
+            (downloads_path, proxy_string, user_agent, disable_csp,
+             block_ads, block_resources),
+            build_profile_template)
+        # The preferences get loaded from the template's user.js file
+        return webdriver.FirefoxProfile(template_path)
+    except Exception:
+        return _build_firefox_profile(
+            downloads_path, proxy_string, user_agent, disable_csp,
+            block_ads, block_resources)
+
+
+def _build_firefox_profile(
+        downloads_path, proxy_string, user_agent, disable_csp,
+        block_ads, block_resources):
     profile = webdriver.FirefoxProfile()
     profile.accept_untrusted_certs = True
     profile.set_preference("reader.parse-on-load.enabled", False)
@@ -163,8 +352,21 @@ def _create_firefox_profile(
         profile.set_preference("general.useragent.override", user_agent)
     profile.set_preference(
         "security.mixed_content.block_active_content", False)
-    if settings.DISABLE_CSP_ON_FIREFOX or disable_csp:
+    if disable_csp:
         profile.set_preference("security.csp.enable", False)
+    if block_ads and not proxy_string:
+        # Ad hosts get sent to a closed port by a proxy auto-config script
+        profile.set_preference("network.proxy.type", 2)
+        profile.set_preference(
+            "network.proxy.autoconfig_url", _get_ad_block_pac_url())
+    if "images" in block_resources:
+        profile.set_preference("permissions.default.image", 2)
+    if "fonts" in block_resources:
+        profile.set_preference("browser.display.use_document_fonts", 0)
+        profile.set_preference("gfx.downloadable_fonts.enabled", False)
+    if "media" in block_resources:
+        # (Firefox can't block media downloads. This blocks autoplay.)
+        profile.set_preference("media.autoplay.default", 5)
     profile.set_preference(
         "browser.download.manager.showAlertOnComplete", False)
     profile.set_preference("browser.shell.checkDefaultBrowser", False)
@@ -185,6 +387,15 @@ def _create_firefox_profile(
     return profile
 
 
+def _set_firefox_cache_dir(profile, cache_dir):
+    """ Makes Firefox use the disk cache in cache_dir (a warm cache). """
+    # Private Browsing only uses a memory cache, so it has to be turned off.
+    # (Cookies and Web Storage still start clean, in the new profile.)
+    profile.set_preference("browser.privatebrowsing.autostart", False)
+    profile.set_preference("browser.cache.disk.enable", True)
+    profile.set_preference("browser.cache.disk.parent_directory", cache_dir)
+
+
 def display_proxy_warning(proxy_string):
     message = ('\n\nWARNING: Proxy String ["%s"] is NOT in the expected '
                '"ip_address:port" or "server:port" format, '
@@ -231,7 +442,9 @@ def validate_proxy_string(proxy_string):
 
 def get_driver(browser_name, headless=False, use_grid=False,
                servername='localhost', port=4444, proxy_string=None,
-               user_agent=None, cap_file=None, disable_csp=None):
+               user_agent=None, cap_file=None, disable_csp=None,
+               block_ads=False, block_resources=None,
+               warm_cache_profile=None):
     proxy_auth = False
     proxy_user = None
     proxy_pass = None
@@ -257,21 +470,137 @@ def get_driver(browser_name, headless=False, use_grid=False,
         proxy_string = validate_proxy_string(proxy_string)
         if proxy_string and proxy_user and proxy_pass:
             proxy_auth = True
-    if use_grid:
-        return get_remote_driver(
-            browser_name, headless, servername, port, proxy_string, proxy_auth,
-            proxy_user, proxy_pass, user_agent, cap_file, disable_csp)
-    else:
-        return get_local_driver(
-            browser_name, headless, proxy_string, proxy_auth,
-            proxy_user, proxy_pass, user_agent, disable_csp)
+    block_resources = _get_block_resources(block_resources)
+    launch_profiler.start_launch(browser_name)  # (If "--profile_launch")
+    driver = None
+    try:
+        if use_grid:
+            with launch_profiler.phase("remote_driver_start"):
+                driver = get_remote_driver(
+                    browser_name, headless, servername, port, proxy_string,
+                    proxy_auth, proxy_user, proxy_pass, user_agent, cap_file,
+                    disable_csp, block_ads, block_resources)
+        else:
+            cache_dir = None
+            if warm_cache_profile and browser_name in (
+                    constants.Browser.GOOGLE_CHROME,
+                    constants.Browser.FIREFOX):
+                # (Not used with a Selenium Grid, where browsers run on
+                # other machines that don't have the warm cache profile)
+                with launch_profiler.phase("warm_cache_snapshot"):
+                    cache_dir = warm_cache.create_snapshot(
+                        warm_cache_profile, browser_name)
+            driver = get_local_driver(
+                browser_name, headless, proxy_string, proxy_auth,
+                proxy_user, proxy_pass, user_agent, disable_csp,
+                block_ads, block_resources, cache_dir)
+            warm_cache.attach_snapshot(driver, cache_dir)
+    finally:
+        launch_profiler.stop_launch(driver)
+    # (Only when using "--max_driver_rss" or "--max_driver_commands")
+    driver_recycler.track_driver(driver)
+    # (So that any processes left running after the driver quits get killed)
+    process_tracker.track_process_tree(driver_reaper.get_service_pid(driver))
+    return driver
+
+
+class _PrelaunchedDriver(object):
+    """ A driver being launched in a background thread. """
+
+    def __init__(self, launch_args):
+        self.launch_args = launch_args
+        self.driver = None
+        self.launch_time = 0.0
+        self.thread = threading.Thread(target=self.__launch)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def __launch(self):
+        _launch_state.prelaunching = True
+        start = time.time()
+        try:
+            self.driver = get_driver(**self.launch_args)
+            launch_profile = launch_profiler.get_launch_profile(self.driver)
+            if launch_profile:
+                launch_profile.prelaunched = True
+        except Exception:
+            pass  # The next test will launch its driver normally
+        self.launch_time = time.time() - start
+
+    def quit(self):
+        self.thread.join()
+        if self.driver:
+            driver_reaper.quit_driver_async(self.driver)
+
+
+def prelaunch_driver(**launch_args):
+    """ Starts launching a driver (with the get_driver() args) in the
+        background for the next test, unless one is already pending. """
+    global _prelaunched
+    with _prelaunch_lock:
+        if _prelaunched is not None:
+            return
+        _prelaunched = _PrelaunchedDriver(launch_args)
+        _prelaunch_stats["launched"] += 1
+
+
+def get_prelaunched_driver(**launch_args):
+    """ Returns the pre-launched driver if it was launched with the same
+        get_driver() args (waiting for it to finish launching if needed).
+        Otherwise returns None, and the pre-launched driver gets quit. """
+    global _prelaunched
+    with _prelaunch_lock:
+        prelaunched = _prelaunched
+        _prelaunched = None
+    if prelaunched is None:
+        return None
+    if prelaunched.launch_args != launch_args:
+        _prelaunch_stats["discarded"] += 1
+        quit_thread = threading.Thread(target=prelaunched.quit)
+        quit_thread.daemon = True
+        quit_thread.start()
+        return None
+    start = time.time()
+    prelaunched.thread.join()
+    waited = time.time() - start
+    if not prelaunched.driver:
+        return None
+    download_helper.reset_downloads_folder()
+    _prelaunch_stats["adopted"] += 1
+    _prelaunch_stats["saved"] += max(prelaunched.launch_time - waited, 0)
+    return prelaunched.driver
+
+
+def quit_prelaunched_driver():
+    """ Quits the pre-launched driver if it never got used. """
+    global _prelaunched
+    with _prelaunch_lock:
+        prelaunched = _prelaunched
+        _prelaunched = None
+    if prelaunched is not None:
+        _prelaunch_stats["discarded"] += 1
+        prelaunched.quit()
+
+
+def get_prelaunch_report_lines():
+    """ Returns the lines of the pre-launch report (or [] if no data). """
+    if not _prelaunch_stats["launched"]:
+        return []
+    return [
+        "Pre-launched drivers: %s" % _prelaunch_stats["launched"],
+        "Adopted by tests:     %s" % _prelaunch_stats["adopted"],
+        "Discarded:            %s" % _prelaunch_stats["discarded"],
+        "setUp() time saved:   %.3fs" % _prelaunch_stats["saved"]]
 
 
 def get_remote_driver(
         browser_name, headless, servername, port, proxy_string, proxy_auth,
-        proxy_user, proxy_pass, user_agent, cap_file, disable_csp):
+        proxy_user, proxy_pass, user_agent, cap_file, disable_csp,
+        block_ads, block_resources):
     downloads_path = download_helper.get_downloads_folder()
-    download_helper.reset_downloads_folder()
+    if not getattr(_launch_state, "prelaunching", False):
+        # (A pre-launched driver resets the folder when it gets adopted)
+        download_helper.reset_downloads_folder()
     address = "http://%s:%s/wd/hub" % (servername, port)
     desired_caps = {}
     if cap_file:
@@ -279,7 +608,8 @@ def get_remote_driver(
     if browser_name == constants.Browser.GOOGLE_CHROME:
         chrome_options = _set_chrome_options(
             downloads_path, headless, proxy_string, proxy_auth,
-            proxy_user, proxy_pass, user_agent, disable_csp)
+            proxy_user, proxy_pass, user_agent, disable_csp,
+            block_ads, block_resources)
         if headless:
             if not proxy_auth:
                 # Headless Chrome doesn't support extensions, which are
@@ -300,7 +630,8 @@ def get_remote_driver(
         try:
             # Use Geckodriver for Firefox if it's on the PATH
             profile = _create_firefox_profile(
-                downloads_path, proxy_string, user_agent, disable_csp)
+                downloads_path, proxy_string, user_agent, disable_csp,
+                block_ads, block_resources)
             firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
             firefox_capabilities['marionette'] = True
             if headless:
@@ -317,7 +648,8 @@ def get_remote_driver(
         except WebDriverException:
             # Don't use Geckodriver: Only works for old versions of Firefox
             profile = _create_firefox_profile(
-                downloads_path, proxy_string, user_agent, disable_csp)
+                downloads_path, proxy_string, user_agent, disable_csp,
+                block_ads, block_resources)
             firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
             firefox_capabilities['marionette'] = False
             if headless:
@@ -397,41 +729,54 @@ def get_remote_driver(
 
 def get_local_driver(
         browser_name, headless, proxy_string, proxy_auth,
-        proxy_user, proxy_pass, user_agent, disable_csp):
+        proxy_user, proxy_pass, user_agent, disable_csp,
+        block_ads, block_resources, cache_dir=None):
     '''
     Spins up a new web browser and returns the driver.
     Can also be used to spin up additional browsers for the same test.
     '''
     downloads_path = download_helper.get_downloads_folder()
-    download_helper.reset_downloads_folder()
+    if not getattr(_launch_state, "prelaunching", False):
+        # (A pre-launched driver resets the folder when it gets adopted)
+        with launch_profiler.phase("downloads_folder"):
+            download_helper.reset_downloads_folder()
 
     if browser_name == constants.Browser.FIREFOX:
         try:
             try:
                 # Use Geckodriver for Firefox if it's on the PATH
-                profile = _create_firefox_profile(
-                    downloads_path, proxy_string, user_agent, disable_csp)
-                firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
-                firefox_capabilities['marionette'] = True
-                options = webdriver.FirefoxOptions()
-                if headless:
-                    options.add_argument('-headless')
-                if LOCAL_GECKODRIVER and os.path.exists(LOCAL_GECKODRIVER):
-                    make_driver_executable_if_not(LOCAL_GECKODRIVER)
-                    firefox_driver = webdriver.Firefox(
-                        firefox_profile=profile,
-                        capabilities=firefox_capabilities,
-                        options=options,
-                        executable_path=LOCAL_GECKODRIVER)
-                else:
-                    firefox_driver = webdriver.Firefox(
-                        firefox_profile=profile,
-                        capabilities=firefox_capabilities,
-                        options=options)
+                with launch_profiler.phase("options"):
+                    profile = _create_firefox_profile(
+                        downloads_path, proxy_string, user_agent, disable_csp,
+                        block_ads, block_resources)
+                    if cache_dir:
+                        _set_firefox_cache_dir(profile, cache_dir)
+                    firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
+                    firefox_capabilities['marionette'] = True
+                    options = webdriver.FirefoxOptions()
+                    if headless:
+                        options.add_argument('-headless')
+                with launch_profiler.phase("driver_start"):
+                    if LOCAL_GECKODRIVER and os.path.exists(
+                            LOCAL_GECKODRIVER):
+                        make_driver_executable_if_not(LOCAL_GECKODRIVER)
+                        firefox_driver = webdriver.Firefox(
+                            firefox_profile=profile,
+                            capabilities=firefox_capabilities,
+                            options=options,
+                            executable_path=LOCAL_GECKODRIVER)
+                    else:
+                        firefox_driver = webdriver.Firefox(
+                            firefox_profile=profile,
+                            capabilities=firefox_capabilities,
+                            options=options)
             except WebDriverException:
                 # Don't use Geckodriver: Only works for old versions of Firefox
                 profile = _create_firefox_profile(
-                    downloads_path, proxy_string, user_agent, disable_csp)
+                    downloads_path, proxy_string, user_agent, disable_csp,
+                    block_ads, block_resources)
+                if cache_dir:
+                    _set_firefox_cache_dir(profile, cache_dir)
                 firefox_capabilities = DesiredCapabilities.FIREFOX.copy()
                 firefox_capabilities['marionette'] = False
                 firefox_driver = webdriver.Firefox(
@@ -488,9 +833,14 @@ def get_local_driver(
             return webdriver.PhantomJS()
     elif browser_name == constants.Browser.GOOGLE_CHROME:
         try:
-            chrome_options = _set_chrome_options(
-                downloads_path, headless, proxy_string, proxy_auth,
-                proxy_user, proxy_pass, user_agent, disable_csp)
+            with launch_profiler.phase("options"):
+                chrome_options = _set_chrome_options(
+                    downloads_path, headless, proxy_string, proxy_auth,
+                    proxy_user, proxy_pass, user_agent, disable_csp,
+                    block_ads, block_resources)
+                if cache_dir:
+                    chrome_options.add_argument(
+                        "--disk-cache-dir=%s" % cache_dir)
             if headless:
                 # Headless Chrome doesn't support extensions, which are
                 # required when using a proxy server that has authentication.
@@ -501,12 +851,14 @@ def get_local_driver(
                     chrome_options.add_argument("--headless")
                 chrome_options.add_argument("--disable-gpu")
                 chrome_options.add_argument("--no-sandbox")
-            if LOCAL_CHROMEDRIVER and os.path.exists(LOCAL_CHROMEDRIVER):
-                make_driver_executable_if_not(LOCAL_CHROMEDRIVER)
-                return webdriver.Chrome(
-                    executable_path=LOCAL_CHROMEDRIVER, options=chrome_options)
-            else:
-                return webdriver.Chrome(options=chrome_options)
+            with launch_profiler.phase("driver_start"):
+                if LOCAL_CHROMEDRIVER and os.path.exists(LOCAL_CHROMEDRIVER):
+                    make_driver_executable_if_not(LOCAL_CHROMEDRIVER)
+                    return webdriver.Chrome(
+                        executable_path=LOCAL_CHROMEDRIVER,
+                        options=chrome_options)
+                else:
+                    return webdriver.Chrome(options=chrome_options)
         except Exception as e:
             if headless:
                 raise Exception(e)
@@ -0,0 +1,120 @@
+"""
+This module keeps a pool of running WebDrivers for reuse between tests
+(--reuse_session), so that every test doesn't pay for a browser launch.
+These helper methods SHOULD NOT be called directly from tests.
+
+Drivers are pooled by their launch parameters (browser, headless, Grid
+server, proxy, user agent, cap file, the CSP flag, resource blocking, and
+the warm cache profile). When a test is done with a driver, the browser
+state is reset (extra windows/tabs are closed, cookies and Web Storage are
+cleared, and it goes back to about:blank) before it's handed to the next
+test. A driver is quit instead of being reused after
+settings.REUSE_SESSION_MAX_USES tests, if the reset fails, or if it went
+over the driver recycling limits (See driver_recycler.py).
+(Web Storage is cleared for the last-visited origin only.)
+"""
+import threading
+import weakref
+from seleniumbase.config import settings
+from seleniumbase.core import driver_reaper
+from seleniumbase.core import driver_recycler
+from seleniumbase.core import element_cache
+
+_idle_drivers = {}  # A dict of pool_key -> list of idle drivers
+_driver_info = weakref.WeakKeyDictionary()  # driver -> [pool_key, uses]
+_pool_lock = threading.Lock()
+
+
+def get_pool_key(browser_name, headless, use_grid, servername, port,
+                 proxy_string, user_agent, cap_file, disable_csp,
+                 block_ads=False, block_resources=None,
+                 warm_cache_profile=None):
+    return (browser_name, bool(headless), bool(use_grid), servername,
+            str(port), proxy_string, user_agent, cap_file, bool(disable_csp),
+            bool(block_ads), block_resources, warm_cache_profile)
+
+
+def acquire_driver(pool_key, launch_driver):
+    """ Returns an idle driver from the pool for the pool key, or launches
+        a new one by calling launch_driver() if no healthy one is idle. """
+    while True:
+        with _pool_lock:
+            idle = _idle_drivers.get(pool_key)
+            driver = None
+            if idle:
+                driver = idle.pop()
+        if driver is None:
+            break
+        try:
+            driver.window_handles  # Make sure the browser is still alive
+            return driver
+        except Exception:
+            _quit_driver(driver)
+    driver = launch_driver()
+    with _pool_lock:
+        _driver_info[driver] = [pool_key, 0]
+    return driver
+
+
+def release_driver(driver):
+    """ Resets the driver and returns it to the pool.
+        Returns False if the driver should be quit instead
+        (not from the pool, used up, recycled, or the reset failed). """
+    with _pool_lock:
+        info = _driver_info.get(driver)
+        if info is None:
+            return False
+        info[1] += 1
+        pool_key, uses = info
+    if uses >= settings.REUSE_SESSION_MAX_USES:
+        return False
+    reason = driver_recycler.get_recycle_reason(driver)
+    if reason:
+        driver_recycler.log_event(driver, reason, "between tests")
+        return False
+    try:
+        reset_driver(driver)
+    except Exception:
+        return False
+    element_cache.clear_element_cache(driver)
+    with _pool_lock:
+        _idle_drivers.setdefault(pool_key, []).append(driver)
+    return True
+
+
+def reset_driver(driver):
+    """ Clears the browser state that could leak into the next test. """
+    try:
+        driver.switch_to.alert.dismiss()
+    except Exception:
+        pass  # No alert was open
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    driver.switch_to.default_content()
+    try:
+        driver.execute_script(
+            "window.localStorage.clear(); window.sessionStorage.clear();")
+    except Exception:
+        pass  # Web Storage isn't available on some pages (Ex: data: URLs)
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
+def _quit_driver(driver):
+    with _pool_lock:
+        _driver_info.pop(driver, None)
+    driver_reaper.quit_driver_async(driver)
+
+
+def quit_all_drivers():
+    """ Quits all idle drivers. (Called at the end of the test run.) """
+    with _pool_lock:
+        drivers = []
+        for idle in _idle_drivers.values():
+            drivers.extend(idle)
+        _idle_drivers.clear()
+    for driver in drivers:
+        _quit_driver(driver)
@@ -0,0 +1,104 @@
+"""
+This module quits WebDrivers in the background so that the next test
+doesn't have to wait for the previous test's browsers to close.
+These helper methods SHOULD NOT be called directly from tests.
+
+Each driver gets quit on its own reaper thread (so drivers are quit
+concurrently). If driver.quit() doesn't finish within
+settings.DRIVER_QUIT_TIMEOUT seconds, the driver's process tree gets killed.
+(Killing child processes such as the browser requires psutil. Without it,
+only the driver service process itself, Ex: chromedriver, gets killed.)
+The plugins call drain() at the end of the run to wait for pending quits.
+Processes that are still running after a quit get killed by
+process_tracker.py (which records the process tree of every launch).
+"""
+import os
+import signal
+import threading
+import time
+from seleniumbase.config import settings
+from seleniumbase.core import process_tracker
+from seleniumbase.core import warm_cache
+
+_reapers = []  # The reaper threads that may still be running
+_reapers_lock = threading.Lock()
+
+
+def get_service_pid(driver):
+    """ Returns the process id of the local driver service (or None). """
+    try:
+        return driver.service.process.pid
+    except Exception:
+        return None  # (Remote drivers don't have a local service)
+
+
+def kill_process_tree(pid):
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil:
+        try:
+            parent = psutil.Process(pid)
+            processes = parent.children(recursive=True) + [parent]
+        except psutil.Error:
+            return
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.Error:
+                pass
+    else:
+        kill_signal = getattr(signal, "SIGKILL", signal.SIGTERM)
+        try:
+            os.kill(pid, kill_signal)
+        except OSError:
+            pass
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _reap_driver(driver, pid):
+    # (Browsers start more processes while they run, so update the tree)
+    process_tracker.track_process_tree(pid)
+    quit_thread = threading.Thread(target=_quit_driver, args=(driver,))
+    quit_thread.daemon = True
+    quit_thread.start()
+    quit_thread.join(settings.DRIVER_QUIT_TIMEOUT)
+    if quit_thread.is_alive() and pid:
+        kill_process_tree(pid)
+    process_tracker.reap_process_tree(pid)  # Kills leftover processes
+    warm_cache.remove_snapshot(driver)  # (If using "--warm_cache_profile")
+
+
+def quit_driver_async(driver):
+    """ Quits the driver on a background reaper thread. """
+    if not settings.QUIT_DRIVERS_IN_BACKGROUND:
+        _reap_driver(driver, get_service_pid(driver))
+        return
+    reaper = threading.Thread(
+        target=_reap_driver, args=(driver, get_service_pid(driver)))
+    reaper.daemon = True
+    reaper.start()
+    with _reapers_lock:
+        _reapers[:] = [r for r in _reapers if r.is_alive()]
+        _reapers.append(reaper)
+
+
+def drain(timeout=None):
+    """ Waits for the pending quits to finish. The timeout defaults to
+        settings.DRIVER_QUIT_TIMEOUT plus a few seconds for killing. """
+    if timeout is None:
+        timeout = settings.DRIVER_QUIT_TIMEOUT + settings.MINI_TIMEOUT
+    with _reapers_lock:
+        reapers = list(_reapers)
+        del _reapers[:]
+    # All reapers run concurrently, so they share the same deadline
+    deadline = time.time() + timeout
+    for reaper in reapers:
+        reaper.join(max(deadline - time.time(), 0))
@@ -0,0 +1,173 @@
+"""
+This module replaces (recycles) WebDrivers that have been running for too
+long, based on the memory use (RSS) of the browser's process tree and the
+number of WebDriver commands sent, since long-lived browsers keep getting
+bigger and slower. These helper methods SHOULD NOT be called directly from
+tests. (Use "--max_driver_rss=MB" and/or "--max_driver_commands=COUNT".)
+
+Drivers are only checked at safe points:
+    Between tests - a pooled browser (--reuse_session) over a limit gets
+                    quit instead of going back to the pool.
+    On page loads - self.open() replaces a browser that's over a limit
+                    before navigating (the current URL and cookies carry
+                    over to the new browser).
+Every recycling event gets written to the driver recycling log file in the
+log folder, and the plugins print a summary at the end of the run.
+(Measuring memory use requires psutil. Without it, only commands count.)
+"""
+import codecs
+import os
+import re
+import threading
+import time
+import warnings
+import weakref
+from seleniumbase.core import driver_reaper
+
+_limits = {"max_rss_mb": 0, "max_commands": 0}
+_log_path = None
+_command_counters = weakref.WeakKeyDictionary()  # driver -> [count]
+_log_lock = threading.Lock()
+REASON_TYPES = ("memory", "commands")
+SAFE_POINTS = ("between tests", "on page load")
+
+
+def enable(max_rss_mb, max_commands, log_path, reset=True):
+    """ Sets the recycling limits. (A limit of 0 or None is turned off.)
+        (reset=True clears the log file.) """
+    global _log_path
+    _limits["max_rss_mb"] = float(max_rss_mb or 0)
+    _limits["max_commands"] = int(max_commands or 0)
+    _log_path = log_path
+    if _limits["max_rss_mb"]:
+        try:
+            import psutil  # noqa
+        except ImportError:
+            message = ('\n\nWARNING: "--max_driver_rss" requires psutil '
+                       '("pip install psutil"). *** Browsers will NOT be '
+                       'recycled based on memory use! ***')
+            warnings.simplefilter('always', Warning)  # See Warnings
+            warnings.warn(message, category=Warning, stacklevel=2)
+            warnings.simplefilter('default', Warning)  # Set Default
+    if reset and is_enabled() and os.path.exists(log_path):
+        os.remove(log_path)
+
+
+def is_enabled():
+    return bool(_limits["max_rss_mb"] or _limits["max_commands"])
+
+
+def track_driver(driver):
+    """ Counts the WebDriver commands sent by the driver from now on. """
+    if not is_enabled() or driver is None:
+        return
+    counter = [0]
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter[0] += 1
+        return execute(driver_command, params)
+    try:
+        _command_counters[driver] = counter
+    except TypeError:
+        return  # (Driver isn't weak-referenceable)
+    driver.execute = counting_execute
+
+
+def get_command_count(driver):
+    try:
+        counter = _command_counters.get(driver)
+    except TypeError:
+        counter = None
+    if counter is None:
+        return None
+    return counter[0]
+
+
+def get_rss_mb(driver):
+    """ Returns the total RSS of the driver's process tree in MB,
+        or None if it can't be measured (no psutil, or a remote driver). """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    pid = driver_reaper.get_service_pid(driver)
+    if not pid:
+        return None
+    try:
+        parent = psutil.Process(pid)
+        processes = parent.children(recursive=True) + [parent]
+    except psutil.Error:
+        return None
+    rss = 0
+    for process in processes:
+        try:
+            rss += process.memory_info().rss
+        except psutil.Error:
+            pass  # The process already exited
+    return rss / (1024.0 * 1024.0)
+
+
+def get_recycle_reason(driver):
+    """ Returns the reason that the driver should be recycled,
+        or None if it's within the limits. """
+    if not is_enabled() or driver is None:
+        return None
+    max_commands = _limits["max_commands"]
+    if max_commands:
+        command_count = get_command_count(driver)
+        if command_count is not None and command_count >= max_commands:
+            return ("commands", "%s commands sent (limit: %s)" % (
+                command_count, max_commands))
+    max_rss_mb = _limits["max_rss_mb"]
+    if max_rss_mb:
+        rss_mb = get_rss_mb(driver)
+        if rss_mb is not None and rss_mb >= max_rss_mb:
+            return ("memory", "%.1f MB RSS (limit: %s MB)" % (
+                rss_mb, max_rss_mb))
+    return None
+
+
+def log_event(driver, reason, where):
+    """ Writes a recycling event to the driver recycling log.
+        (where is one of SAFE_POINTS) """
+    if not _log_path:
+        return
+    reason_type, details = reason
+    browser_name = getattr(driver, "name", None) or "browser"
+    line = "%s  pid=%s  Recycled %s [%s] [%s]: %s\n" % (
+        time.strftime("%Y-%m-%d %H:%M:%S"), os.getpid(),
+        browser_name, reason_type, where, details)
+    folder = os.path.dirname(_log_path)
+    try:
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with _log_lock:
+            with codecs.open(_log_path, "a", "utf-8") as log_file:
+                log_file.write(line)
+    except (IOError, OSError):
+        pass  # Don't fail tests if the log can't be written
+
+
+def get_report_lines():
+    """ Returns the summary of the recycling log (or [] if it's empty).
+        (The log is shared by all processes, Ex: pytest -n 4) """
+    if not _log_path or not os.path.exists(_log_path):
+        return []
+    with codecs.open(_log_path, "r", "utf-8") as log_file:
+        events = re.findall(r"Recycled .*? \[(\w+)\] \[([\w ]+)\]:",
+                            log_file.read())
+    if not events:
+        return []
+    lines = []
+    lines.append("Drivers recycled: %s" % len(events))
+    for reason_type in REASON_TYPES:
+        count = len([e for e in events if e[0] == reason_type])
+        if count:
+            lines.append("  Over the %s limit: %s" % (reason_type, count))
+    for where in SAFE_POINTS:
+        count = len([e for e in events if e[1] == where])
+        if count:
+            lines.append("  Recycled %s: %s" % (where, count))
+    lines.append("(Recycling log: %s)" % _log_path)
+    return lines
@@ -0,0 +1,105 @@
+"""
+This module contains the per-driver element cache used by base_case.py
+(when settings.CACHE_ELEMENTS is True) to skip repeated element lookups.
+These helper methods SHOULD NOT be called directly from tests.
+
+Elements are cached by (by, selector, frame, window). A cached element is
+only returned after a single is_displayed() call confirms that it's still
+attached and visible. Stale elements are evicted, and the whole cache for a
+driver is cleared on page navigation (open, refresh, back, forward), and
+when the page readiness check sees a new URL (Ex: after a click() that
+changed pages, a JavaScript redirect, or a history.pushState() call).
+"""
+import collections
+import threading
+import weakref
+from seleniumbase.config import settings
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+class ElementCache(object):
+
+    def __init__(self, max_size=settings.ELEMENT_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.clears = 0
+        self.__elements = collections.OrderedDict()
+        self.__page_url = None
+
+    def get_visible_element(self, key):
+        """ Returns the cached element for the key if it's still visible.
+            Otherwise the entry is evicted, and None is returned. """
+        element = self.__elements.get(key)
+        if element is None:
+            self.misses += 1
+            return None
+        try:
+            if element.is_displayed():
+                self.hits += 1
+                # Mark as most recently used
+                del self.__elements[key]
+                self.__elements[key] = element
+                return element
+        except Exception:
+            # StaleElementReferenceException (or the window/frame is gone)
+            self.stale += 1
+        self.__elements.pop(key, None)
+        self.misses += 1
+        return None
+
+    def add(self, key, element):
+        self.__elements.pop(key, None)
+        self.__elements[key] = element
+        while len(self.__elements) > self.max_size:
+            self.__elements.popitem(last=False)
+
+    def remove(self, key):
+        self.__elements.pop(key, None)
+
+    def set_page_url(self, url):
+        """ Records the URL from the latest page readiness check.
+            If the URL changed, the cached elements are from an old page,
+            so the cache gets cleared. """
+        if url != self.__page_url:
+            self.__page_url = url
+            self.clear()
+
+    def clear(self):
+        if self.__elements:
+            self.clears += 1
+            self.__elements.clear()
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        hit_rate = 0.0
+        if lookups:
+            hit_rate = float(self.hits) / lookups
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "clears": self.clears,
+            "size": len(self.__elements),
+            "hit_rate": hit_rate,
+        }
+
+
+def get_element_cache(driver):
+    """ Returns the ElementCache for the driver (creating it if needed). """
+    with _caches_lock:
+        cache = _caches.get(driver)
+        if cache is None:
+            cache = ElementCache()
+            _caches[driver] = cache
+        return cache
+
+
+def clear_element_cache(driver):
+    with _caches_lock:
+        cache = _caches.get(driver)
+    if cache:
+        cache.clear()
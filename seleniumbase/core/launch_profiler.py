@@ -0,0 +1,183 @@
+"""
+This module records how long each phase of launching a browser takes
+(when using "--profile_launch"), to find out where slow setUp() time goes.
+These helper methods SHOULD NOT be called directly from tests.
+
+Phases recorded by browser_launcher.py:
+    downloads_folder - resetting the downloads folder
+    options - building browser options/profiles (and packing extensions)
+    driver_start - starting the driver service and the browser session
+    remote_driver_start - all of the above, for Selenium Grid launches
+    warm_cache_snapshot - copying the warm cache (--warm_cache_profile)
+Phases recorded by base_case.py:
+    set_window_size - the initial window sizing
+    wait_for_ready_state_complete - the first page readiness check
+
+Each launch is saved as one JSON line in the launch profile file, so that
+launches from multiple processes (Ex: pytest -n 4) end up in the same file.
+At the end of the run, the plugins print a summary table per browser type
+(with p50 / p95 / max per phase), built from that file.
+"""
+import codecs
+import collections
+import contextlib
+import json
+import os
+import threading
+import time
+import weakref
+
+_enabled = False
+_jsonl_path = None
+_current = threading.local()  # The launch that's running in this thread
+_launch_profiles = weakref.WeakKeyDictionary()  # driver -> LaunchProfile
+_write_lock = threading.Lock()
+
+
+class LaunchProfile(object):
+    """ The phase timings of a single browser launch. """
+
+    def __init__(self, browser_name):
+        self.browser_name = browser_name
+        self.start_time = time.time()
+        self.phases = collections.OrderedDict()
+        self.prelaunched = False
+        self.launch_time = None  # Set when get_driver() returns
+        self.post_launch_time = 0.0
+
+    def add_phase_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.launch_time is not None:
+            self.post_launch_time += seconds
+
+    def get_total_time(self):
+        # (A pre-launched driver may sit idle after launching, which isn't
+        # counted. Only the launch and the phases after it are counted.)
+        if self.launch_time is None:
+            return time.time() - self.start_time
+        return self.launch_time + self.post_launch_time
+
+    def to_dict(self):
+        return {
+            "browser": self.browser_name,
+            "start": self.start_time,
+            "total": self.get_total_time(),
+            "prelaunched": self.prelaunched,
+            "pid": os.getpid(),
+            "phases": self.phases,
+        }
+
+
+def enable(jsonl_path, reset=True):
+    """ Turns on launch profiling. (reset=True clears the output file.) """
+    global _enabled
+    global _jsonl_path
+    _enabled = True
+    _jsonl_path = jsonl_path
+    if reset and os.path.exists(jsonl_path):
+        os.remove(jsonl_path)
+
+
+def start_launch(browser_name):
+    """ Starts profiling a launch in the current thread. """
+    if not _enabled:
+        return None
+    _current.profile = LaunchProfile(browser_name)
+    return _current.profile
+
+
+def stop_launch(driver):
+    """ Stops profiling the launch in the current thread, and links it
+        to the driver (so that later phases can be added to it). """
+    launch_profile = getattr(_current, "profile", None)
+    _current.profile = None
+    if launch_profile is not None and driver is not None:
+        launch_profile.launch_time = time.time() - launch_profile.start_time
+        _launch_profiles[driver] = launch_profile
+
+
+def get_launch_profile(driver):
+    if not _enabled:
+        return None
+    try:
+        return _launch_profiles.get(driver)
+    except TypeError:
+        return None  # (Driver isn't weak-referenceable)
+
+
+@contextlib.contextmanager
+def phase(name, launch_profile=None):
+    """ Times a launch phase. (If no launch_profile is given, the one
+        running in the current thread is used. Does nothing if neither.) """
+    if launch_profile is None:
+        launch_profile = getattr(_current, "profile", None)
+    if launch_profile is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        launch_profile.add_phase_time(name, time.time() - start)
+
+
+def finish_launch(driver):
+    """ Saves the launch profile of the driver to the launch profile file.
+        (Drivers from the reuse pool don't have one, so nothing is saved.)
+    """
+    launch_profile = get_launch_profile(driver)
+    if launch_profile is None:
+        return
+    _launch_profiles.pop(driver, None)
+    line = json.dumps(launch_profile.to_dict())
+    folder = os.path.dirname(_jsonl_path)
+    if folder and not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except Exception:
+            pass  # Only reachable during multi-process test runs
+    with _write_lock:
+        with codecs.open(_jsonl_path, "a", "utf-8") as jsonl_file:
+            jsonl_file.write(line + "\n")
+
+
+def _get_percentile(sorted_values, percent):
+    # (Nearest-rank method)
+    index = int(round(percent / 100.0 * len(sorted_values) + 0.5)) - 1
+    index = min(max(index, 0), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def get_report_lines():
+    """ Returns the launch profile summary table (or [] if no data). """
+    if not _enabled or not os.path.exists(_jsonl_path):
+        return []
+    timings = collections.OrderedDict()  # browser -> phase -> [seconds]
+    with codecs.open(_jsonl_path, "r", "utf-8") as jsonl_file:
+        for line in jsonl_file:
+            try:
+                launch = json.loads(line)
+            except ValueError:
+                continue  # (A partially-written line)
+            browser_timings = timings.setdefault(
+                launch["browser"], collections.OrderedDict())
+            for name, seconds in launch["phases"].items():
+                browser_timings.setdefault(name, []).append(seconds)
+            browser_timings.setdefault("TOTAL", []).append(launch["total"])
+    if not timings:
+        return []
+    lines = []
+    lines.append("%-12s %-30s %6s %8s %8s %8s" % (
+        "Browser", "Phase", "Count", "p50 (s)", "p95 (s)", "Max (s)"))
+    for browser_name, browser_timings in timings.items():
+        # Show the TOTAL row last for each browser
+        total = browser_timings.pop("TOTAL")
+        browser_timings["TOTAL"] = total
+        for name, values in browser_timings.items():
+            values = sorted(values)
+            lines.append("%-12s %-30s %6d %8.3f %8.3f %8.3f" % (
+                browser_name, name, len(values),
+                _get_percentile(values, 50), _get_percentile(values, 95),
+                values[-1]))
+    lines.append("(Launch details: %s)" % _jsonl_path)
+    return lines
@@ -0,0 +1,72 @@
+"""
+This module keeps track of the wall time saved by lean mode (--lean),
+which replaces the short hard-coded sleeps in base_case.py with waiting
+for the DOM to settle. The plugins print a report at the end of the run.
+These helper methods SHOULD NOT be called directly from tests.
+
+The time saved by each test is saved as one JSON line in the lean mode
+report file (in the log folder), so that tests from multiple processes
+(Ex: pytest -n 4) end up in the same report.
+"""
+import codecs
+import json
+import os
+import threading
+
+_jsonl_path = None
+_write_lock = threading.Lock()
+
+
+def enable(jsonl_path, reset=True):
+    """ Sets the lean mode report file. (reset=True clears it.) """
+    global _jsonl_path
+    _jsonl_path = jsonl_path
+    if reset and os.path.exists(jsonl_path):
+        os.remove(jsonl_path)
+
+
+def record_time_saved(test_id, seconds_saved, settle_count):
+    if not _jsonl_path:
+        return
+    line = json.dumps({
+        "test": test_id, "saved": seconds_saved, "settles": settle_count,
+        "pid": os.getpid()})
+    folder = os.path.dirname(_jsonl_path)
+    if folder and not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except Exception:
+            pass  # Only reachable during multi-process test runs
+    with _write_lock:
+        with codecs.open(_jsonl_path, "a", "utf-8") as jsonl_file:
+            jsonl_file.write(line + "\n")
+
+
+def get_report_lines():
+    """ Returns the lines of the lean mode report (or [] if no data). """
+    if not _jsonl_path or not os.path.exists(_jsonl_path):
+        return []
+    time_saved = []
+    with codecs.open(_jsonl_path, "r", "utf-8") as jsonl_file:
+        for line in jsonl_file:
+            try:
+                test = json.loads(line)
+            except ValueError:
+                continue  # (A partially-written line)
+            time_saved.append((test["test"], test["saved"], test["settles"]))
+    if not time_saved:
+        return []
+    lines = []
+    lines.append("%-60s %8s %10s" % ("Test", "Settles", "Saved (s)"))
+    total_saved = 0.0
+    total_settles = 0
+    for test_id, seconds_saved, settle_count in time_saved:
+        if len(test_id) > 60:
+            test_id = "..." + test_id[-57:]
+        lines.append("%-60s %8d %10.3f" % (
+            test_id, settle_count, seconds_saved))
+        total_saved += seconds_saved
+        total_settles += settle_count
+    lines.append("%-60s %8d %10.3f" % (
+        "TOTAL (%s tests)" % len(time_saved), total_settles, total_saved))
+    return lines
@@ -0,0 +1,221 @@
+"""
+This module caches the status codes of page links, so that links shared by
+many pages (headers, footers, CSS, and JS) only get checked once in a while
+by assert_no_404_errors() and print_unique_links_with_status_codes().
+These helper methods SHOULD NOT be called directly from tests.
+
+Status codes are kept in memory (per test process), for LINK_CACHE_TTL
+seconds, or for LINK_CACHE_NEGATIVE_TTL seconds if the link was broken
+(Ex: 404), so that fixed links get checked again sooner. Timeouts and
+connection errors aren't cached, since those depend on the timeout of the
+check (and on the network at the time), not only on the link.
+With "--link_cache_db=FILE", status codes are also kept in a SQLite file,
+which is shared by all test processes (Ex: pytest -n 4) and by later test
+runs (until the entries expire).
+The number of cache hits of each test process gets written to a stats
+file in the log folder, and the plugins print the hit rates at the end.
+"""
+import codecs
+import json
+import os
+import sqlite3
+import threading
+import time
+from seleniumbase.config import settings
+from seleniumbase.core import link_checker
+
+MISS = object()  # (Returned by get() when the link isn't in the cache)
+_memory = {}  # (link, allow_redirects) -> [status_code, expires]
+_cache_lock = threading.Lock()
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+_db = {"path": None, "connection": None}
+_stats_path = None
+
+
+def enable(db_path=None, stats_path=None, reset=True):
+    """ Sets the shared SQLite file (or None for memory only), and the
+        stats file (reset=True clears it). Expired entries get removed. """
+    global _stats_path
+    _stats_path = stats_path
+    if reset and stats_path and os.path.exists(stats_path):
+        os.remove(stats_path)
+    with _cache_lock:
+        _close_db()
+        _db["path"] = db_path
+        connection = _get_db()
+        if connection:
+            try:
+                connection.execute(
+                    "DELETE FROM link_status WHERE expires < ?",
+                    (time.time(),))
+                connection.commit()
+            except sqlite3.Error:
+                pass  # (Another test process is writing. Expire later.)
+
+
+def _get_db():
+    """ Returns the SQLite connection (with _cache_lock held),
+        or None if there's no shared file (or it can't be opened). """
+    if not _db["path"]:
+        return None
+    if _db["connection"] is None:
+        try:
+            folder = os.path.dirname(_db["path"])
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            connection = sqlite3.connect(
+                _db["path"], timeout=settings.SMALL_TIMEOUT,
+                check_same_thread=False)
+            try:
+                # (Lets test processes read while another one writes)
+                connection.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error:
+                pass
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS link_status ("
+                "link TEXT, allow_redirects INTEGER, status_code INTEGER, "
+                "expires REAL, PRIMARY KEY (link, allow_redirects))")
+            connection.commit()
+            _db["connection"] = connection
+        except (sqlite3.Error, OSError):
+            _db["path"] = None  # Use the memory cache only
+            return None
+    return _db["connection"]
+
+
+def _close_db():
+    if _db["connection"] is not None:
+        try:
+            _db["connection"].close()
+        except sqlite3.Error:
+            pass
+        _db["connection"] = None
+
+
+def _get_ttl(status_code):
+    if status_code >= 400:
+        return settings.LINK_CACHE_NEGATIVE_TTL
+    return settings.LINK_CACHE_TTL
+
+
+def get(link, allow_redirects=False):
+    """ Returns the cached status code of the link, or MISS. """
+    if not settings.LINK_CACHE_TTL:
+        return MISS
+    key = (link, bool(allow_redirects))
+    now = time.time()
+    with _cache_lock:
+        entry = _memory.get(key)
+        if entry is not None and entry[1] > now:
+            _stats["memory_hits"] += 1
+            return entry[0]
+        connection = _get_db()
+        if connection:
+            try:
+                row = connection.execute(
+                    "SELECT status_code, expires FROM link_status "
+                    "WHERE link = ? AND allow_redirects = ? "
+                    "AND expires > ?", (key[0], int(key[1]), now)).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row:
+                _memory[key] = [row[0], row[1]]
+                _stats["db_hits"] += 1
+                return row[0]
+        _stats["misses"] += 1
+    return MISS
+
+
+def put_many(status_codes, allow_redirects=False):
+    """ Caches the status codes of the links ({link: status_code}).
+        (Links that weren't checked, with a None status code, and links
+        that timed out or couldn't connect, are skipped.) """
+    if not settings.LINK_CACHE_TTL:
+        return
+    now = time.time()
+    rows = []
+    with _cache_lock:
+        for link, status_code in status_codes.items():
+            if status_code in (link_checker.NOT_CHECKED,
+                               link_checker.TIMED_OUT,
+                               link_checker.CONNECTION_ERROR):
+                continue
+            expires = now + _get_ttl(status_code)
+            _memory[(link, bool(allow_redirects))] = [status_code, expires]
+            rows.append((link, int(bool(allow_redirects)), status_code,
+                         expires))
+        connection = _get_db()
+        if connection and rows:
+            try:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO link_status "
+                    "(link, allow_redirects, status_code, expires) "
+                    "VALUES (?, ?, ?, ?)", rows)
+                connection.commit()
+            except sqlite3.Error:
+                pass  # (The memory cache still has them)
+
+
+def put(link, allow_redirects, status_code):
+    put_many({link: status_code}, allow_redirects=allow_redirects)
+
+
+def clear():
+    """ Clears the memory cache. (The shared file keeps its entries.) """
+    with _cache_lock:
+        _memory.clear()
+
+
+def save_stats():
+    """ Writes the cache stats of this test process to the stats file.
+        (Call once, at the end of the test session.) """
+    with _cache_lock:
+        stats = dict(_stats)
+    if not _stats_path or not sum(stats.values()):
+        return
+    stats["worker"] = os.getpid()
+    folder = os.path.dirname(_stats_path)
+    try:
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with codecs.open(_stats_path, "a", "utf-8") as stats_file:
+            stats_file.write(json.dumps(stats) + "\n")
+    except (IOError, OSError):
+        pass  # Don't fail tests if the stats can't be written
+
+
+def _format_stats(name, stats):
+    lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+    hits = stats["memory_hits"] + stats["db_hits"]
+    return "%-10s %8d %8.1f%% %8.1f%% %8.1f%% %8d" % (
+        name, lookups, 100.0 * hits / lookups,
+        100.0 * stats["memory_hits"] / lookups,
+        100.0 * stats["db_hits"] / lookups, stats["misses"])
+
+
+def get_report_lines():
+    """ Returns the summary of the stats file (or [] if it's empty). """
+    if not _stats_path or not os.path.exists(_stats_path):
+        return []
+    workers = []
+    with codecs.open(_stats_path, "r", "utf-8") as stats_file:
+        for line in stats_file:
+            try:
+                workers.append(json.loads(line))
+            except ValueError:
+                continue  # (A partially-written line)
+    if not workers:
+        return []
+    lines = []
+    lines.append("%-10s %8s %9s %9s %9s %8s" % (
+        "Process", "Lookups", "Hit rate", "Memory", "Shared", "Checked"))
+    if len(workers) > 1:
+        for stats in workers:
+            lines.append(_format_stats(stats["worker"], stats))
+    totals = {}
+    for key in ("memory_hits", "db_hits", "misses"):
+        totals[key] = sum([stats[key] for stats in workers])
+    lines.append(_format_stats("Total", totals))
+    if _db["path"]:
+        lines.append("(Shared link cache: %s)" % _db["path"])
+    return lines
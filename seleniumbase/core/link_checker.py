@@ -0,0 +1,150 @@
+"""
+This module checks the status codes of page links, many at once, for
+assert_no_404_errors() and print_unique_links_with_status_codes().
+These helper methods SHOULD NOT be called directly from tests.
+
+Each host gets its own requests Session (a connection pool that's reused
+across pages). Links are checked with a HEAD request first, so that bodies
+(such as images) don't get downloaded, and with a GET request if the HEAD
+request fails (some servers don't support HEAD). The number of links that
+are checked at once is capped overall and for each host. If a time budget
+is given, links that haven't been checked by then are left as NOT_CHECKED.
+Instead of turning every failure into a 404, failed requests get their own
+(unofficial) status codes: TIMED_OUT and CONNECTION_ERROR.
+"""
+import collections
+import sys
+import threading
+import time
+import requests
+from seleniumbase.config import settings
+if sys.version_info[0] == 2:
+    from urlparse import urlparse
+else:
+    from urllib.parse import urlparse
+
+TIMED_OUT = 598  # (Unofficial "Network read timeout error" status code)
+CONNECTION_ERROR = 599  # (Unofficial "Network connect error" status code)
+NOT_CHECKED = None  # (The time budget ran out first)
+
+_sessions = {}  # "scheme://host" -> requests.Session
+_sessions_lock = threading.Lock()
+
+
+def _get_host(link):
+    parsed = urlparse(link)
+    return "%s://%s" % (parsed.scheme, parsed.netloc)
+
+
+def get_session(link):
+    """ Returns the shared requests Session for the host of the link. """
+    host = _get_host(link)
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.LINK_CHECK_MAX_PER_HOST)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[host] = session
+    return session
+
+
+def get_link_status_code(link, allow_redirects=False, timeout=5):
+    """ Returns the status code of the link (HEAD first, then GET),
+        or TIMED_OUT / CONNECTION_ERROR if the request failed. """
+    session = get_session(link)
+    try:
+        response = session.head(
+            link, allow_redirects=allow_redirects, timeout=timeout)
+        status_code = response.status_code
+        response.close()
+        if status_code < 400:
+            return status_code
+        # (Some servers answer HEAD requests with 403, 404, 405, or 501.)
+        # Use GET to be sure, without downloading the body.
+        response = session.get(
+            link, allow_redirects=allow_redirects, timeout=timeout,
+            stream=True)
+        status_code = response.status_code
+        response.close()
+        return status_code
+    except requests.exceptions.Timeout:
+        return TIMED_OUT
+    except Exception:
+        return CONNECTION_ERROR
+
+
+def check_links(links, allow_redirects=False, timeout=5, max_workers=None,
+                max_per_host=None, time_budget=None):
+    """ Checks the links concurrently (at most max_workers at once overall,
+        and max_per_host at once for each host), for up to time_budget
+        seconds (or without a limit if None).
+        Returns an OrderedDict of {link: status_code} in the original order.
+        (Links that weren't checked in time get NOT_CHECKED.) """
+    if max_workers is None:
+        max_workers = settings.LINK_CHECK_MAX_WORKERS
+    if max_per_host is None:
+        max_per_host = settings.LINK_CHECK_MAX_PER_HOST
+    if time_budget is None:
+        time_budget = settings.LINK_CHECK_TIME_BUDGET
+    results = collections.OrderedDict()
+    pending = collections.OrderedDict()  # host -> deque of links to check
+    for link in links:
+        if link not in results:
+            results[link] = NOT_CHECKED
+            pending.setdefault(
+                _get_host(link), collections.deque()).append(link)
+    active = {}  # host -> the number of links being checked
+    condition = threading.Condition()
+    deadline = None
+    if time_budget:
+        deadline = time.time() + time_budget
+
+    def get_next_link():
+        """ Returns the next (host, link) to check, waiting for a host to
+            be under its cap if needed, or None if there's nothing left. """
+        with condition:
+            while pending:
+                remaining = None
+                if deadline:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return None
+                for host, host_links in pending.items():
+                    if active.get(host, 0) < max_per_host:
+                        link = host_links.popleft()
+                        if not host_links:
+                            del pending[host]
+                        active[host] = active.get(host, 0) + 1
+                        return host, link
+                condition.wait(remaining)
+            return None
+
+    def check_next_links():
+        while True:
+            next_link = get_next_link()
+            if next_link is None:
+                return
+            host, link = next_link
+            link_timeout = timeout
+            if deadline:
+                link_timeout = max(0.1, min(timeout, deadline - time.time()))
+            status_code = get_link_status_code(
+                link, allow_redirects=allow_redirects, timeout=link_timeout)
+            with condition:
+                results[link] = status_code
+                active[host] -= 1
+                condition.notify_all()
+
+    threads = []
+    for x in range(max(1, min(max_workers, len(results)))):
+        thread = threading.Thread(target=check_next_links)
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return results
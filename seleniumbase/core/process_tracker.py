@@ -0,0 +1,258 @@
+"""
+This module keeps track of the processes of every local browser launch
+(the driver service, such as chromedriver, and the browser processes under
+it), so that processes that are left running get found and killed.
+These helper methods SHOULD NOT be called directly from tests.
+
+Leaked processes get reaped at three points:
+    after quit - processes still running after the driver was quit
+                 (Ex: driver.quit() failed, or the browser ignored it)
+    session end - processes of drivers that never got quit
+    earlier session - processes recorded by a test process that crashed,
+                      reaped when the next test session starts
+The process ids of each test process (each pytest-xdist worker has its own)
+are saved to a registry file in the temp folder, so that they're still
+known after a crash. Processes are matched by their creation time too, so a
+reused process id never gets killed by mistake. Every reaping gets written
+to the process reaper log, and the plugins print a summary per test process
+(the number of leaked processes and the memory reclaimed) at the end.
+(This requires psutil. Without it, nothing is tracked.)
+"""
+import codecs
+import collections
+import json
+import os
+import tempfile
+import threading
+
+_trees = {}  # service_pid -> {pid: [create_time, name]}
+_trees_lock = threading.Lock()
+_log_path = None
+REAP_POINTS = ("after quit", "session end", "earlier session")
+QUIT_GRACE_TIME = 3  # Seconds for processes to exit on their own after quit
+
+
+def _get_psutil():
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+def get_registry_dir():
+    return os.path.join(tempfile.gettempdir(), "seleniumbase_processes")
+
+
+def _get_registry_path(owner_pid):
+    return os.path.join(get_registry_dir(), "%s.json" % owner_pid)
+
+
+def _save_registry():
+    """ Saves the tracked processes of this test process (with _trees_lock
+        held). The file is replaced with a rename, so it's never partial. """
+    psutil = _get_psutil()
+    registry_dir = get_registry_dir()
+    registry_path = _get_registry_path(os.getpid())
+    if not _trees:
+        if os.path.exists(registry_path):
+            os.remove(registry_path)
+        return
+    if not os.path.exists(registry_dir):
+        try:
+            os.makedirs(registry_dir)
+        except OSError:
+            pass  # Only reachable during multi-process test runs
+    registry = {
+        "owner": os.getpid(),
+        "owner_create_time": psutil.Process(os.getpid()).create_time(),
+        "processes": [[pid, info[0], info[1]]
+                      for tree in _trees.values()
+                      for pid, info in tree.items()],
+    }
+    temp_path = "%s.%s.tmp" % (
+        registry_path, threading.current_thread().ident)
+    with codecs.open(temp_path, "w", "utf-8") as registry_file:
+        registry_file.write(json.dumps(registry))
+    if os.path.exists(registry_path):
+        os.remove(registry_path)  # (On Windows, renames can't overwrite)
+    os.rename(temp_path, registry_path)
+
+
+def track_process_tree(service_pid):
+    """ Records (or updates) the process tree of a driver service.
+        (Call after launching, and again before quitting, since browsers
+        start more processes while they run.) """
+    psutil = _get_psutil()
+    if not psutil or not service_pid:
+        return
+    try:
+        parent = psutil.Process(service_pid)
+        processes = [parent] + parent.children(recursive=True)
+    except psutil.Error:
+        return
+    with _trees_lock:
+        tree = _trees.setdefault(service_pid, {})
+        for process in processes:
+            try:
+                tree[process.pid] = [process.create_time(), process.name()]
+            except psutil.Error:
+                pass  # The process already exited
+        try:
+            _save_registry()
+        except (IOError, OSError):
+            pass  # Tracking still works for this process without the file
+
+
+def _kill_processes(processes, grace_time=0):
+    """ Kills the processes (a list of [pid, create_time, name]) that are
+        still running after grace_time seconds (for processes that are
+        already exiting). Returns (the number killed, the MB reclaimed). """
+    psutil = _get_psutil()
+    running = []
+    for pid, create_time, name in processes:
+        try:
+            process = psutil.Process(pid)
+            if abs(process.create_time() - create_time) < 0.01:
+                running.append(process)
+            # (Otherwise the process id was reused by another process)
+        except psutil.Error:
+            pass  # The process already exited
+    if running and grace_time:
+        running = psutil.wait_procs(running, timeout=grace_time)[1]
+    killed = 0
+    rss = 0
+    for process in running:
+        try:
+            process_rss = process.memory_info().rss
+            process.kill()
+        except psutil.Error:
+            continue  # The process exited
+        killed += 1
+        rss += process_rss
+    return killed, rss / (1024.0 * 1024.0)
+
+
+def reap_process_tree(service_pid):
+    """ Kills the processes of the driver service that are still running.
+        (Call after the driver was quit.) """
+    if not service_pid:
+        return
+    with _trees_lock:
+        tree = _trees.pop(service_pid, None)
+        if tree is None:
+            return
+        try:
+            _save_registry()
+        except (IOError, OSError):
+            pass
+    # (Browser processes may still be exiting right after a quit)
+    killed, rss_mb = _kill_processes(
+        [[pid, info[0], info[1]] for pid, info in tree.items()],
+        grace_time=QUIT_GRACE_TIME)
+    _log_reaping("after quit", killed, rss_mb)
+
+
+def reap_all_process_trees():
+    """ Kills the processes of all drivers that never got quit.
+        (Called at the end of the test run, after pending quits.) """
+    with _trees_lock:
+        trees = list(_trees.values())
+        _trees.clear()
+        try:
+            _save_registry()
+        except (IOError, OSError):
+            pass
+    if not trees:
+        return
+    killed, rss_mb = _kill_processes(
+        [[pid, info[0], info[1]] for tree in trees
+         for pid, info in tree.items()])
+    _log_reaping("session end", killed, rss_mb)
+
+
+def _reap_earlier_sessions():
+    """ Kills the recorded processes of test processes that are gone. """
+    psutil = _get_psutil()
+    registry_dir = get_registry_dir()
+    if not os.path.isdir(registry_dir):
+        return
+    for file_name in os.listdir(registry_dir):
+        if not file_name.endswith(".json"):
+            continue
+        registry_path = os.path.join(registry_dir, file_name)
+        try:
+            with codecs.open(registry_path, "r", "utf-8") as registry_file:
+                registry = json.loads(registry_file.read())
+        except (IOError, OSError, ValueError):
+            continue  # (Being replaced by its owner right now)
+        try:
+            owner = psutil.Process(registry["owner"])
+            if abs(owner.create_time() - registry["owner_create_time"]) < (
+                    0.01):
+                continue  # The owner is still running tests
+        except psutil.Error:
+            pass  # The owner is gone
+        try:
+            os.remove(registry_path)
+        except OSError:
+            continue  # Another test process is reaping this file
+        killed, rss_mb = _kill_processes(registry["processes"])
+        _log_reaping("earlier session", killed, rss_mb)
+
+
+def enable(log_path, reset=True):
+    """ Sets the process reaper log file (reset=True clears it), and reaps
+        the leftover processes of earlier test sessions that crashed. """
+    global _log_path
+    _log_path = log_path
+    if reset and os.path.exists(log_path):
+        os.remove(log_path)
+    if _get_psutil():
+        _reap_earlier_sessions()
+
+
+def _log_reaping(where, killed, rss_mb):
+    if not killed or not _log_path:
+        return
+    line = json.dumps({"worker": os.getpid(), "where": where,
+                       "processes": killed, "rss_mb": rss_mb})
+    folder = os.path.dirname(_log_path)
+    try:
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with _trees_lock:
+            with codecs.open(_log_path, "a", "utf-8") as log_file:
+                log_file.write(line + "\n")
+    except (IOError, OSError):
+        pass  # Don't fail tests if the log can't be written
+
+
+def get_report_lines():
+    """ Returns the summary of the process reaper log (or [] if empty). """
+    if not _log_path or not os.path.exists(_log_path):
+        return []
+    workers = collections.OrderedDict()  # worker -> where -> [count, MB]
+    with codecs.open(_log_path, "r", "utf-8") as log_file:
+        for line in log_file:
+            try:
+                reaping = json.loads(line)
+            except ValueError:
+                continue  # (A partially-written line)
+            totals = workers.setdefault(reaping["worker"], {}).setdefault(
+                reaping["where"], [0, 0.0])
+            totals[0] += reaping["processes"]
+            totals[1] += reaping["rss_mb"]
+    if not workers:
+        return []
+    lines = []
+    lines.append("%-10s %-16s %10s %14s" % (
+        "Process", "Reaped", "Leaked", "Reclaimed (MB)"))
+    for worker, worker_totals in workers.items():
+        for where in REAP_POINTS:
+            if where in worker_totals:
+                lines.append("%-10s %-16s %10d %14.1f" % (
+                    worker, where, worker_totals[where][0],
+                    worker_totals[where][1]))
+    lines.append("(Reaping details: %s)" % _log_path)
+    return lines
@@ -1,6 +1,7 @@
 import os
 import threading
 import zipfile
+from seleniumbase.core import artifact_cache
 from seleniumbase.fixtures import constants
 from seleniumbase import drivers
 DRIVER_DIR = os.path.dirname(os.path.realpath(drivers.__file__))
@@ -9,12 +10,13 @@ DOWNLOADS_DIR = constants.Files.DOWNLOADS_FOLDER
 PROXY_ZIP_PATH_2 = "%s/%s" % (DOWNLOADS_DIR, "proxy.zip")
 
 
-def create_proxy_zip(proxy_string, proxy_user, proxy_pass):
+def create_proxy_zip(proxy_string, proxy_user, proxy_pass, zip_path=None):
     """ Implementation of https://stackoverflow.com/a/35293284 for
         https://stackoverflow.com/questions/12848327/
         (Run Selenium on a proxy server that requires authentication.)
         Solution involves creating & adding a Chrome extension on the fly.
         * CHROME-ONLY for now! *
+        (If zip_path isn't specified, PROXY_ZIP_PATH is used.)
     """
     proxy_host = proxy_string.split(':')[0]
     proxy_port = proxy_string.split(':')[1]
@@ -64,6 +66,12 @@ def create_proxy_zip(proxy_string, proxy_user, proxy_pass):
         '''},\n'''
         '''"minimum_chrome_version":"22.0.0"\n'''
         '''}''')
+    if zip_path:
+        zf = zipfile.ZipFile(zip_path, mode='w')
+        zf.writestr("background.js", background_js)
+        zf.writestr("manifest.json", manifest_json)
+        zf.close()
+        return
     lock = threading.RLock()  # Support multi-threaded test runs with Pytest
     with lock:
         try:
@@ -80,6 +88,18 @@ def create_proxy_zip(proxy_string, proxy_user, proxy_pass):
         zf.close()
 
 
+def get_proxy_zip(proxy_string, proxy_user, proxy_pass):
+    """ Returns the path of the proxy extension zip for the proxy settings.
+        The zip is built once per test process, in the private artifact
+        directory (since it has the proxy password), and then reused. """
+
+    def build_proxy_zip(zip_path):
+        create_proxy_zip(proxy_string, proxy_user, proxy_pass, zip_path)
+    return artifact_cache.get_artifact(
+        "proxy", (proxy_string, proxy_user, proxy_pass),
+        build_proxy_zip, suffix=".zip", private=True)
+
+
 def remove_proxy_zip_if_present():
     """ Remove Chrome extension zip file used for proxy server authentication.
         Used in the implementation of https://stackoverflow.com/a/35293284
@@ -92,3 +112,4 @@ def remove_proxy_zip_if_present():
             os.remove(PROXY_ZIP_PATH_2)
     except Exception:
         pass
+    artifact_cache.remove_private_dir()
@@ -30,27 +30,17 @@ def activate_bootstrap(driver):
     bootstrap_tour_css = constants.BootstrapTour.MIN_CSS
     bootstrap_tour_js = constants.BootstrapTour.MIN_JS
 
-    verify_script = ("""// Verify Bootstrap Tour activated
-                     var tour2 = new Tour({
-                     });""")
-
     backdrop_style = style_sheet.bt_backdrop_style
     js_utils.add_css_style(driver, backdrop_style)
-    js_utils.wait_for_ready_state_complete(driver)
-    js_utils.wait_for_angularjs(driver)
-    for x in range(4):
-        js_utils.activate_jquery(driver)
-        js_utils.add_css_link(driver, bootstrap_tour_css)
-        js_utils.add_js_link(driver, bootstrap_tour_js)
-        time.sleep(0.1)
-        for x in range(int(settings.MINI_TIMEOUT * 2.0)):
-            # Bootstrap needs a small amount of time to load & activate.
-            try:
-                driver.execute_script(verify_script)
-                time.sleep(0.05)
-                return
-            except Exception:
-                time.sleep(0.15)
+    js_utils.activate_jquery(driver)
+    if js_utils.add_assets_inline(
+            driver, [bootstrap_tour_js], [bootstrap_tour_css]):
+        if is_bootstrap_activated(driver):
+            return
+    js_utils.load_scripts_async(
+        driver, [bootstrap_tour_css, bootstrap_tour_js])
+    if is_bootstrap_activated(driver):
+        return
     raise_unable_to_load_jquery_exception(driver)
 
 
@@ -73,29 +63,14 @@ def activate_hopscotch(driver):
     hopscotch_js = constants.Hopscotch.MIN_JS
     backdrop_style = style_sheet.hops_backdrop_style
 
-    verify_script = ("""// Verify Hopscotch activated
-                     var hops = hopscotch.isActive;
-                     """)
-
     activate_bootstrap(driver)
-    js_utils.wait_for_ready_state_complete(driver)
-    js_utils.wait_for_angularjs(driver)
     js_utils.add_css_style(driver, backdrop_style)
-    for x in range(4):
-        js_utils.activate_jquery(driver)
-        js_utils.add_css_link(driver, hopscotch_css)
-        js_utils.add_js_link(driver, hopscotch_js)
-        time.sleep(0.1)
-        for x in range(int(settings.MINI_TIMEOUT * 2.0)):
-            # Hopscotch needs a small amount of time to load & activate.
-            try:
-                driver.execute_script(verify_script)
-                js_utils.wait_for_ready_state_complete(driver)
-                js_utils.wait_for_angularjs(driver)
-                time.sleep(0.05)
-                return
-            except Exception:
-                time.sleep(0.15)
+    if js_utils.add_assets_inline(driver, [hopscotch_js], [hopscotch_css]):
+        if is_hopscotch_activated(driver):
+            return
+    js_utils.load_scripts_async(driver, [hopscotch_css, hopscotch_js])
+    if is_hopscotch_activated(driver):
+        return
     raise_unable_to_load_jquery_exception(driver)
 
 
@@ -117,28 +92,13 @@ def activate_introjs(driver):
     intro_css = constants.IntroJS.MIN_CSS
     intro_js = constants.IntroJS.MIN_JS
 
-    verify_script = ("""// Verify IntroJS activated
-                     var intro2 = introJs();
-                     """)
-
     activate_bootstrap(driver)
-    js_utils.wait_for_ready_state_complete(driver)
-    js_utils.wait_for_angularjs(driver)
-    for x in range(4):
-        js_utils.activate_jquery(driver)
-        js_utils.add_css_link(driver, intro_css)
-        js_utils.add_js_link(driver, intro_js)
-        time.sleep(0.1)
-        for x in range(int(settings.MINI_TIMEOUT * 2.0)):
-            # IntroJS needs a small amount of time to load & activate.
-            try:
-                driver.execute_script(verify_script)
-                js_utils.wait_for_ready_state_complete(driver)
-                js_utils.wait_for_angularjs(driver)
-                time.sleep(0.05)
-                return
-            except Exception:
-                time.sleep(0.15)
+    if js_utils.add_assets_inline(driver, [intro_js], [intro_css]):
+        if is_introjs_activated(driver):
+            return
+    js_utils.load_scripts_async(driver, [intro_css, intro_js])
+    if is_introjs_activated(driver):
+        return
     raise_unable_to_load_jquery_exception(driver)
 
 
@@ -170,35 +130,24 @@ def activate_shepherd(driver):
     backdrop_style = style_sheet.sh_backdrop_style
 
     activate_bootstrap(driver)
-    js_utils.wait_for_ready_state_complete(driver)
-    js_utils.wait_for_angularjs(driver)
     js_utils.add_css_style(driver, backdrop_style)
-    js_utils.wait_for_ready_state_complete(driver)
-    js_utils.wait_for_angularjs(driver)
-    for x in range(4):
-        js_utils.add_css_link(driver, spinner_css)
-        js_utils.add_css_link(driver, sh_theme_arrows_css)
-        js_utils.add_css_link(driver, sh_theme_arrows_fix_css)
-        js_utils.add_css_link(driver, sh_theme_default_css)
-        js_utils.add_css_link(driver, sh_theme_dark_css)
-        js_utils.add_css_link(driver, sh_theme_sq_css)
-        js_utils.add_css_link(driver, sh_theme_sq_dark_css)
-        js_utils.add_js_link(driver, tether_js)
-        js_utils.add_js_link(driver, shepherd_js)
-        time.sleep(0.1)
-        for x in range(int(settings.MINI_TIMEOUT * 2.0)):
-            # Shepherd needs a small amount of time to load & activate.
-            try:
-                driver.execute_script(sh_style)  # Verify Shepherd has loaded
-                js_utils.wait_for_ready_state_complete(driver)
-                js_utils.wait_for_angularjs(driver)
-                driver.execute_script(sh_style)  # Need it twice for ordering
-                js_utils.wait_for_ready_state_complete(driver)
-                js_utils.wait_for_angularjs(driver)
-                time.sleep(0.05)
-                return
-            except Exception:
-                time.sleep(0.15)
+    css_links = [spinner_css, sh_theme_arrows_css, sh_theme_arrows_fix_css,
+                 sh_theme_default_css, sh_theme_dark_css, sh_theme_sq_css,
+                 sh_theme_sq_dark_css]
+    if js_utils.add_assets_inline(driver, [tether_js, shepherd_js], css_links):
+        try:
+            driver.execute_script(sh_style)  # Verify Shepherd has loaded
+            driver.execute_script(sh_style)  # Need it twice for ordering
+            return
+        except Exception:
+            pass  # (Inline scripts may be blocked by the CSP) Use links.
+    js_utils.load_scripts_async(driver, css_links + [tether_js, shepherd_js])
+    try:
+        driver.execute_script(sh_style)  # Verify Shepherd has loaded
+        driver.execute_script(sh_style)  # Need it twice for ordering
+        return
+    except Exception:
+        pass
     raise_unable_to_load_jquery_exception(driver)
 
 
@@ -0,0 +1,157 @@
+"""
+This module seeds new Chrome and Firefox browsers with a pre-warmed HTTP
+cache (when using "--warm_cache_profile=DIR"), so that tests don't have to
+re-download the same JS/CSS bundles and fonts in every new browser.
+These helper methods SHOULD NOT be called directly from tests.
+
+The warm cache profile folder has one cache template per browser type.
+Templates are built by "seleniumbase warm-cache URL...", which visits the
+URLs with a new browser and then keeps that browser's HTTP cache folder.
+Every new browser gets its own snapshot (copy) of the template, so that
+tests never change the template, and parallel tests don't share a cache.
+(On file systems that support copy-on-write clones, such as Btrfs, XFS, and
+APFS, snapshots are cloned instead of copied, which makes them nearly free.)
+Only the HTTP cache is kept. Cookies and Web Storage live in the browser
+profile, which is still new for every browser, so they always start clean.
+Snapshots are deleted when their driver gets quit, or at the end of the run.
+"""
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import weakref
+
+_snapshots = set()  # The paths of all snapshots that haven't been deleted
+_driver_snapshots = weakref.WeakKeyDictionary()  # driver -> snapshot path
+_snapshots_lock = threading.Lock()
+
+
+def get_template_path(warm_cache_profile, browser_name):
+    return os.path.join(os.path.abspath(warm_cache_profile), browser_name)
+
+
+def _copy_tree(source, destination):
+    """ Copies a folder, cloning files with copy-on-write where the file
+        system supports it. Falls back to a regular copy otherwise. """
+    command = None
+    if "linux" in sys.platform:
+        command = ["cp", "-R", "--reflink=auto", source, destination]
+    elif "darwin" in sys.platform:
+        command = ["cp", "-R", "-c", source, destination]
+    if command:
+        try:
+            with open(os.devnull, "w") as devnull:
+                subprocess.check_call(
+                    command, stdout=devnull, stderr=devnull)
+            return
+        except (OSError, subprocess.CalledProcessError):
+            shutil.rmtree(destination, ignore_errors=True)
+    shutil.copytree(source, destination)
+
+
+def create_snapshot(warm_cache_profile, browser_name):
+    """ Returns the path of a new snapshot of the browser's cache template.
+        (If the template hasn't been built yet, the snapshot is empty.) """
+    snapshot_parent = tempfile.mkdtemp(prefix="seleniumbase_cache_")
+    snapshot_path = os.path.join(snapshot_parent, "cache")
+    with _snapshots_lock:
+        _snapshots.add(snapshot_parent)
+    template_path = get_template_path(warm_cache_profile, browser_name)
+    if os.path.isdir(template_path):
+        _copy_tree(template_path, snapshot_path)
+    else:
+        os.makedirs(snapshot_path)
+    return snapshot_path
+
+
+def attach_snapshot(driver, snapshot_path):
+    """ Links the snapshot to the driver, so that it gets deleted when
+        the driver gets quit. (See remove_snapshot()) """
+    if driver is not None and snapshot_path:
+        with _snapshots_lock:
+            _driver_snapshots[driver] = snapshot_path
+
+
+def get_snapshot(driver):
+    try:
+        return _driver_snapshots.get(driver)
+    except TypeError:
+        return None  # (Driver isn't weak-referenceable)
+
+
+def remove_snapshot(driver):
+    """ Deletes the driver's snapshot. (Call after the driver quits.) """
+    try:
+        with _snapshots_lock:
+            snapshot_path = _driver_snapshots.pop(driver, None)
+    except TypeError:
+        return  # (Driver isn't weak-referenceable)
+    if snapshot_path:
+        _remove_snapshot_path(snapshot_path)
+
+
+def _remove_snapshot_path(snapshot_path):
+    snapshot_parent = os.path.dirname(snapshot_path)
+    with _snapshots_lock:
+        _snapshots.discard(snapshot_parent)
+    shutil.rmtree(snapshot_parent, ignore_errors=True)
+
+
+def save_snapshot_as_template(driver, warm_cache_profile, browser_name):
+    """ Replaces the browser's cache template with the driver's snapshot.
+        (The driver must already be quit, so that the cache is complete.)
+        The old template is swapped out with renames, so that tests that
+        are creating snapshots at the same time see one or the other. """
+    with _snapshots_lock:
+        snapshot_path = _driver_snapshots.pop(driver)
+    template_path = get_template_path(warm_cache_profile, browser_name)
+    if not os.path.exists(os.path.dirname(template_path)):
+        os.makedirs(os.path.dirname(template_path))
+    # Move the snapshot next to the template first (renames only work
+    # within the same file system, and the temp folder may be elsewhere)
+    new_template_path = "%s.new.%s" % (template_path, os.getpid())
+    old_template_path = "%s.old.%s" % (template_path, os.getpid())
+    shutil.move(snapshot_path, new_template_path)
+    _remove_snapshot_path(snapshot_path)
+    if os.path.exists(template_path):
+        os.rename(template_path, old_template_path)
+    os.rename(new_template_path, template_path)
+    shutil.rmtree(old_template_path, ignore_errors=True)
+    return template_path
+
+
+def warm_cache(urls, warm_cache_profile, browser_name, headless=False):
+    """ Builds (or refreshes) the cache template of the browser by visiting
+        the URLs with a new browser that starts from the current template.
+        Returns the path of the new template. """
+    from seleniumbase.core import browser_launcher
+    from seleniumbase.fixtures import js_utils
+    driver = browser_launcher.get_driver(
+        browser_name, headless=headless,
+        warm_cache_profile=warm_cache_profile)
+    try:
+        for url in urls:
+            print("* Warming the %s cache with: %s" % (browser_name, url))
+            driver.get(url)
+            js_utils.wait_for_page_ready(driver)
+    except Exception:
+        driver.quit()
+        remove_snapshot(driver)
+        raise
+    # The browser must exit normally, so that the whole cache gets saved
+    driver.quit()
+    return save_snapshot_as_template(driver, warm_cache_profile, browser_name)
+
+
+def remove_all_snapshots():
+    with _snapshots_lock:
+        snapshot_parents = list(_snapshots)
+        _snapshots.clear()
+    for snapshot_parent in snapshot_parents:
+        shutil.rmtree(snapshot_parent, ignore_errors=True)
+
+
+atexit.register(remove_all_snapshots)
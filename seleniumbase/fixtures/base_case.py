@@ -45,6 +45,12 @@ from seleniumbase.config import settings
 from seleniumbase.core.testcase_manager import TestcaseDataPayload
 from seleniumbase.core.testcase_manager import TestcaseManager
 from seleniumbase.core import download_helper
+from seleniumbase.core import driver_pool
+from seleniumbase.core import driver_reaper
+from seleniumbase.core import driver_recycler
+from seleniumbase.core import element_cache
+from seleniumbase.core import launch_profiler
+from seleniumbase.core import lean_mode_helper
 from seleniumbase.core import log_helper
 from seleniumbase.core import tour_helper
 from seleniumbase.core import visual_helper
@@ -52,6 +58,8 @@ from seleniumbase.fixtures import constants
 from seleniumbase.fixtures import js_utils
 from seleniumbase.fixtures import page_actions
 from seleniumbase.fixtures import page_utils
+from seleniumbase.fixtures import poll_utils
+from seleniumbase.fixtures import selector_utils
 from seleniumbase.fixtures import xpath_to_css
 ENI_Exception = selenium_exceptions.ElementNotInteractableException
 
@@ -78,9 +86,22 @@ class BaseCase(unittest.TestCase):
         self._default_driver = None
         self._drivers_list = []
         self._tour_steps = {}
+        # The frame/window context of cached elements (settings.CACHE_ELEMENTS)
+        self.__frame_path = []
+        self.__window_key = None
+        self.lean_mode = False
+        self.test_budget = None
+        self.reuse_session = False
+        self.prelaunch = False
+        self.block_resources = None
+        self.warm_cache_profile = None
+        self.__lean_time_saved = 0.0
+        self.__lean_settle_count = 0
 
     def open(self, url):
+        self.__recycle_driver_if_needed()  # (A safe point for recycling)
         self.__last_page_load_url = None
+        element_cache.clear_element_cache(self.driver)
         self.driver.get(url)
         if settings.WAIT_FOR_RSC_ON_PAGE_LOADS:
             self.wait_for_ready_state_complete()
@@ -95,17 +116,14 @@ class BaseCase(unittest.TestCase):
               timeout=settings.SMALL_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
+        if by == By.LINK_TEXT:
             if not self.is_link_text_visible(selector):
                 # Handle a special case of links hidden in dropdowns
                 self.click_link_text(selector, timeout=timeout)
                 return
-        element = page_actions.wait_for_element_visible(
-            self.driver, selector, by, timeout=timeout)
+        element = self.wait_for_element_visible(
+            selector, by=by, timeout=timeout)
         self.__demo_mode_highlight_if_active(selector, by)
         if not self.demo_mode:
             self.__scroll_to_element(element)
@@ -119,9 +137,9 @@ class BaseCase(unittest.TestCase):
                 element.click()
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.05)
-            element = page_actions.wait_for_element_visible(
-                self.driver, selector, by, timeout=timeout)
+            self.__settle(0.05)
+            element = self.wait_for_element_visible(
+                selector, by=by, timeout=timeout)
             element.click()
         except (WebDriverException, MoveTargetOutOfBoundsException):
             self.wait_for_ready_state_complete()
@@ -132,8 +150,8 @@ class BaseCase(unittest.TestCase):
                     self.__jquery_click(selector, by=by)
                 except Exception:
                     # One more attempt to click on the element
-                    element = page_actions.wait_for_element_visible(
-                        self.driver, selector, by, timeout=timeout)
+                    element = self.wait_for_element_visible(
+                        selector, by=by, timeout=timeout)
                     element.click()
         if settings.WAIT_FOR_RSC_ON_CLICKS:
             self.wait_for_ready_state_complete()
@@ -148,10 +166,9 @@ class BaseCase(unittest.TestCase):
         from selenium.webdriver import ActionChains
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        element = page_actions.wait_for_element_visible(
-            self.driver, selector, by, timeout=timeout)
+        selector, by = self.__recalculate_selector(selector, by)
+        element = self.wait_for_element_visible(
+            selector, by=by, timeout=timeout)
         self.__demo_mode_highlight_if_active(selector, by)
         if not self.demo_mode:
             self.__scroll_to_element(element)
@@ -163,9 +180,9 @@ class BaseCase(unittest.TestCase):
             actions.perform()
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.05)
-            element = page_actions.wait_for_element_visible(
-                self.driver, selector, by, timeout=timeout)
+            self.__settle(0.05)
+            element = self.wait_for_element_visible(
+                selector, by=by, timeout=timeout)
             actions = ActionChains(self.driver)
             actions.move_to_element(element)
             actions.double_click(element)
@@ -224,19 +241,10 @@ class BaseCase(unittest.TestCase):
 
     def wait_for_link_text_present(self, link_text,
                                    timeout=settings.SMALL_TIMEOUT):
-        start_ms = time.time() * 1000.0
-        stop_ms = start_ms + (timeout * 1000.0)
-        for x in range(int(timeout * 5)):
-            try:
-                if not self.is_link_text_present(link_text):
-                    raise Exception(
-                        "Link text {%s} was not found!" % link_text)
-                return
-            except Exception:
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
-                    break
-                time.sleep(0.2)
+        if poll_utils.wait_until(
+                lambda: self.is_link_text_present(link_text), timeout,
+                name="wait_for_link_text_present"):
+            return
         raise Exception(
             "Link text {%s} was not present after %s seconds!" % (
                 link_text, timeout))
@@ -265,7 +273,7 @@ class BaseCase(unittest.TestCase):
                 element.click()
             except (StaleElementReferenceException, ENI_Exception):
                 self.wait_for_ready_state_complete()
-                time.sleep(0.05)
+                self.__settle(0.05)
                 element = self.wait_for_link_text_visible(
                     link_text, timeout=timeout)
                 element.click()
@@ -365,7 +373,7 @@ class BaseCase(unittest.TestCase):
             element.click()
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.05)
+            self.__settle(0.05)
             element = self.wait_for_partial_link_text(
                 partial_link_text, timeout=timeout)
             element.click()
@@ -381,19 +389,18 @@ class BaseCase(unittest.TestCase):
                  timeout=settings.SMALL_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         self.wait_for_ready_state_complete()
-        time.sleep(0.01)
-        element = page_actions.wait_for_element_visible(
-            self.driver, selector, by, timeout)
+        self.__settle(0.01)
+        element = self.wait_for_element_visible(
+            selector, by=by, timeout=timeout)
         try:
             element_text = element.text
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.06)
-            element = page_actions.wait_for_element_visible(
-                self.driver, selector, by, timeout)
+            self.__settle(0.06)
+            element = self.wait_for_element_visible(
+                selector, by=by, timeout=timeout)
             element_text = element.text
         return element_text
 
@@ -402,20 +409,16 @@ class BaseCase(unittest.TestCase):
         """ This method uses JavaScript to get the value of an attribute. """
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         self.wait_for_ready_state_complete()
-        time.sleep(0.01)
+        self.__settle(0.01)
         element = page_actions.wait_for_element_present(
             self.driver, selector, by, timeout)
         try:
             attribute_value = element.get_attribute(attribute)
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.06)
+            self.__settle(0.06)
             element = page_actions.wait_for_element_present(
                 self.driver, selector, by, timeout)
             attribute_value = element.get_attribute(attribute)
@@ -430,8 +433,7 @@ class BaseCase(unittest.TestCase):
         """ This method uses JavaScript to set/update an attribute. """
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         if self.is_element_visible(selector, by=by):
             self.scroll_to(selector, by=by, timeout=timeout)
         attribute = re.escape(attribute)
@@ -439,8 +441,7 @@ class BaseCase(unittest.TestCase):
         value = re.escape(value)
         value = self.__escape_quotes_if_needed(value)
         css_selector = self.convert_to_css_selector(selector, by=by)
-        css_selector = re.escape(css_selector)
-        css_selector = self.__escape_quotes_if_needed(css_selector)
+        css_selector = selector_utils.escape_selector_for_js(css_selector)
         script = ("""document.querySelector('%s').setAttribute('%s','%s');"""
                   % (css_selector, attribute, value))
         self.execute_script(script)
@@ -450,15 +451,13 @@ class BaseCase(unittest.TestCase):
         """ This method uses JavaScript to remove an attribute. """
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         if self.is_element_visible(selector, by=by):
             self.scroll_to(selector, by=by, timeout=timeout)
         attribute = re.escape(attribute)
         attribute = self.__escape_quotes_if_needed(attribute)
         css_selector = self.convert_to_css_selector(selector, by=by)
-        css_selector = re.escape(css_selector)
-        css_selector = self.__escape_quotes_if_needed(css_selector)
+        css_selector = selector_utils.escape_selector_for_js(css_selector)
         script = ("""document.querySelector('%s').removeAttribute('%s');"""
                   % (css_selector, attribute))
         self.execute_script(script)
@@ -471,11 +470,7 @@ class BaseCase(unittest.TestCase):
                 self.assertTrue(float(opacity) > 0, "Element not visible!") """
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         self.wait_for_ready_state_complete()
         page_actions.wait_for_element_present(
             self.driver, selector, by, timeout)
@@ -486,8 +481,7 @@ class BaseCase(unittest.TestCase):
             raise Exception(
                 "Exception: Could not convert {%s}(by=%s) to CSS_SELECTOR!" % (
                     selector, by))
-        selector = re.escape(selector)
-        selector = self.__escape_quotes_if_needed(selector)
+        selector = selector_utils.escape_selector_for_js(selector)
         script = ("""var $elm = document.querySelector('%s');
                   $val = window.getComputedStyle($elm).getPropertyValue('%s');
                   return $val;"""
@@ -500,6 +494,7 @@ class BaseCase(unittest.TestCase):
 
     def refresh_page(self):
         self.__last_page_load_url = None
+        element_cache.clear_element_cache(self.driver)
         self.driver.refresh()
         self.wait_for_ready_state_complete()
 
@@ -525,11 +520,13 @@ class BaseCase(unittest.TestCase):
 
     def go_back(self):
         self.__last_page_load_url = None
+        element_cache.clear_element_cache(self.driver)
         self.driver.back()
         self.wait_for_ready_state_complete()
 
     def go_forward(self):
         self.__last_page_load_url = None
+        element_cache.clear_element_cache(self.driver)
         self.driver.forward()
         self.wait_for_ready_state_complete()
 
@@ -547,8 +544,7 @@ class BaseCase(unittest.TestCase):
             Similar to update_text(), but won't clear the text field first. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         element = self.wait_for_element_visible(
             selector, by=by, timeout=timeout)
         self.__demo_mode_highlight_if_active(selector, by)
@@ -566,7 +562,7 @@ class BaseCase(unittest.TestCase):
                     self.wait_for_ready_state_complete()
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.06)
+            self.__settle(0.06)
             element = self.wait_for_element_visible(
                 selector, by=by, timeout=timeout)
             if not new_value.endswith('\n'):
@@ -591,8 +587,7 @@ class BaseCase(unittest.TestCase):
         """ Same as add_text() -> more reliable, but less name confusion. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         self.add_text(selector, new_value, by=by, timeout=timeout)
 
     def update_text_value(self, selector, new_value, by=By.CSS_SELECTOR,
@@ -607,8 +602,7 @@ class BaseCase(unittest.TestCase):
         """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         element = self.wait_for_element_visible(
             selector, by=by, timeout=timeout)
         self.__demo_mode_highlight_if_active(selector, by)
@@ -618,7 +612,7 @@ class BaseCase(unittest.TestCase):
             element.clear()
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.06)
+            self.__settle(0.06)
             element = self.wait_for_element_visible(
                 selector, by=by, timeout=timeout)
             element.clear()
@@ -639,7 +633,7 @@ class BaseCase(unittest.TestCase):
                     self.wait_for_ready_state_complete()
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.06)
+            self.__settle(0.06)
             element = self.wait_for_element_visible(
                 selector, by=by, timeout=timeout)
             element.clear()
@@ -671,58 +665,41 @@ class BaseCase(unittest.TestCase):
             We want to keep the old version for backward compatibility. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         self.update_text_value(selector, new_value, by=by,
                                timeout=timeout, retry=retry)
 
     def is_element_present(self, selector, by=By.CSS_SELECTOR):
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.is_element_present(self.driver, selector, by)
 
     def is_element_visible(self, selector, by=By.CSS_SELECTOR):
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.is_element_visible(self.driver, selector, by)
 
     def is_link_text_visible(self, link_text):
         self.wait_for_ready_state_complete()
-        time.sleep(0.01)
+        self.__settle(0.01)
         return page_actions.is_element_visible(self.driver, link_text,
                                                by=By.LINK_TEXT)
 
     def is_partial_link_text_visible(self, partial_link_text):
         self.wait_for_ready_state_complete()
-        time.sleep(0.01)
+        self.__settle(0.01)
         return page_actions.is_element_visible(self.driver, partial_link_text,
                                                by=By.PARTIAL_LINK_TEXT)
 
     def is_text_visible(self, text, selector="html", by=By.CSS_SELECTOR):
         self.wait_for_ready_state_complete()
-        time.sleep(0.01)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        self.__settle(0.01)
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.is_text_visible(self.driver, text, selector, by)
 
     def find_elements(self, selector, by=By.CSS_SELECTOR, limit=0):
         """ Returns a list of matching WebElements.
             If "limit" is set and > 0, will only return that many elements. """
         self.wait_for_ready_state_complete()
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         elements = self.driver.find_elements(by=by, value=selector)
         if limit and limit > 0 and len(elements) > limit:
             elements = elements[:limit]
@@ -732,11 +709,7 @@ class BaseCase(unittest.TestCase):
         """ Returns a list of matching WebElements that are visible.
             If "limit" is set and > 0, will only return that many elements. """
         self.wait_for_ready_state_complete()
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         v_elems = page_actions.find_visible_elements(self.driver, selector, by)
         if limit and limit > 0 and len(v_elems) > limit:
             v_elems = v_elems[:limit]
@@ -769,7 +742,7 @@ class BaseCase(unittest.TestCase):
                         click_count += 1
                 except (StaleElementReferenceException, ENI_Exception):
                     self.wait_for_ready_state_complete()
-                    time.sleep(0.05)
+                    self.__settle(0.05)
                     try:
                         if element.is_displayed():
                             self.__scroll_to_element(element)
@@ -1044,7 +1017,7 @@ class BaseCase(unittest.TestCase):
         """
         if not selector:
             selector = "html"
-        if page_utils.is_xpath_selector(selector):
+        if selector_utils.resolve_selector(selector).by == By.XPATH:
             selector = self.convert_to_css_selector(selector, By.XPATH)
         selector = self.__escape_quotes_if_needed(selector)
 
@@ -1376,16 +1349,14 @@ class BaseCase(unittest.TestCase):
             Useful when getting a WebDriverException, such as the one below:
                 { Element is not clickable at point (#, #).
                   Other element would receive the click: ... } """
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         self.find_element(selector, by=by, timeout=settings.SMALL_TIMEOUT)
         try:
             selector = self.convert_to_css_selector(selector, by=by)
         except Exception:
             # Don't run action if can't convert to CSS_Selector for JavaScript
             return
-        selector = re.escape(selector)
-        selector = self.__escape_quotes_if_needed(selector)
+        selector = selector_utils.escape_selector_for_js(selector)
         script = ("""document.querySelector('%s').style.zIndex = '9999';"""
                   % selector)
         self.execute_script(script)
@@ -1440,18 +1411,16 @@ class BaseCase(unittest.TestCase):
                 o_bs = original_box_shadow
 
         if ":contains" not in selector and ":first" not in selector:
-            selector = re.escape(selector)
-            selector = self.__escape_quotes_if_needed(selector)
+            selector = selector_utils.escape_selector_for_js(selector)
             self.__highlight_with_js(selector, loops, o_bs)
         else:
             selector = self.__make_css_match_first_element_only(selector)
-            selector = re.escape(selector)
-            selector = self.__escape_quotes_if_needed(selector)
+            selector = selector_utils.escape_selector_for_js(selector)
             try:
                 self.__highlight_with_jquery(selector, loops, o_bs)
             except Exception:
                 pass  # JQuery probably couldn't load. Skip highlighting.
-        time.sleep(0.065)
+        self.__settle(0.065)
 
     def __highlight_with_js(self, selector, loops, o_bs):
         js_utils.highlight_with_js(self.driver, selector, loops, o_bs)
@@ -1473,7 +1442,7 @@ class BaseCase(unittest.TestCase):
             self.__scroll_to_element(element)
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.05)
+            self.__settle(0.05)
             element = self.wait_for_element_visible(
                 selector, by=by, timeout=timeout)
             self.__scroll_to_element(element)
@@ -1517,8 +1486,7 @@ class BaseCase(unittest.TestCase):
             if not self.demo_mode:
                 self.__scroll_to_element(element)
         css_selector = self.convert_to_css_selector(selector, by=by)
-        css_selector = re.escape(css_selector)
-        css_selector = self.__escape_quotes_if_needed(css_selector)
+        css_selector = selector_utils.escape_selector_for_js(css_selector)
         self.__js_click(selector, by=by)  # The real "magic" happens here
         self.__demo_mode_pause_if_active()
 
@@ -1537,8 +1505,7 @@ class BaseCase(unittest.TestCase):
 
     def submit(self, selector, by=By.CSS_SELECTOR):
         """ Alternative to self.driver.find_element_by_*(SELECTOR).submit() """
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         element = self.wait_for_element_visible(
             selector, by=by, timeout=settings.SMALL_TIMEOUT)
         element.submit()
@@ -1590,19 +1557,13 @@ class BaseCase(unittest.TestCase):
         self.safe_execute_script(remove_script)
 
     def ad_block(self):
+        """ Removes the ads of ad_block_list.AD_BLOCK_LIST from the page
+            (in one script call), and keeps removing ads that load later. """
         from seleniumbase.config import ad_block_list
-        for css_selector in ad_block_list.AD_BLOCK_LIST:
-            css_selector = re.escape(css_selector)
-            css_selector = self.__escape_quotes_if_needed(css_selector)
-            script = ("""var $elements = document.querySelectorAll('%s');
-                      var index = 0, length = $elements.length;
-                      for(; index < length; index++){
-                      $elements[index].remove();}"""
-                      % css_selector)
-            try:
-                self.execute_script(script)
-            except Exception:
-                pass  # Don't fail test if ad_blocking fails
+        try:
+            js_utils.remove_ads(self.driver, ad_block_list.AD_BLOCK_LIST)
+        except Exception:
+            pass  # Don't fail test if ad_blocking fails
 
     @decorators.deprecated("Use re.escape() instead! It does what you want!")
     def jq_format(self, code):
@@ -1633,7 +1594,8 @@ class BaseCase(unittest.TestCase):
 
     def get_link_status_code(self, link, allow_redirects=False, timeout=5):
         """ Get the status code of a link.
-            If the timeout is exceeded, will return a 404.
+            If the timeout is exceeded, will return a 598. (TIMED_OUT)
+            If the connection fails, will return a 599. (CONNECTION_ERROR)
             For a list of available status codes, see:
             https://en.wikipedia.org/wiki/List_of_HTTP_status_codes """
         status_code = page_utils._get_link_status_code(
@@ -1641,23 +1603,31 @@ class BaseCase(unittest.TestCase):
         return status_code
 
     def assert_link_status_code_is_not_404(self, link):
-        status_code = str(self.get_link_status_code(link))
-        bad_link_str = 'Error: "%s" returned a 404!' % link
-        self.assert_not_equal(status_code, "404", bad_link_str)
+        """ (Links that time out or can't connect also fail the assert.) """
+        status_code = self.get_link_status_code(link)
+        error = page_utils._get_link_error_message(link, status_code)
+        if error:
+            self.fail("Error: %s" % error)
 
     def assert_no_404_errors(self, multithreaded=True):
         """ Assert no 404 errors from page links obtained from:
-            "a"->"href", "img"->"src", "link"->"href", and "script"->"src". """
+            "a"->"href", "img"->"src", "link"->"href", and "script"->"src".
+            (Links that time out or can't connect also fail the assert,
+            as do links not checked within settings.LINK_CHECK_TIME_BUDGET)
+        """
         links = self.get_unique_links()
-        if multithreaded:
-            from multiprocessing.dummy import Pool as ThreadPool
-            pool = ThreadPool(10)
-            pool.map(self.assert_link_status_code_is_not_404, links)
-            pool.close()
-            pool.join()
-        else:
-            for link in links:
-                self.assert_link_status_code_is_not_404(link)
+        max_workers = None  # (Use settings.LINK_CHECK_MAX_WORKERS)
+        if not multithreaded:
+            max_workers = 1
+        status_codes = page_utils._get_link_status_codes(
+            links, max_workers=max_workers)
+        errors = []
+        for link, status_code in status_codes.items():
+            error = page_utils._get_link_error_message(link, status_code)
+            if error:
+                errors.append(error)
+        if errors:
+            self.fail("Error: %s" % "\nError: ".join(errors))
 
     def print_unique_links_with_status_codes(self):
         """ Finds all unique links in the html of the page source
@@ -1827,34 +1797,14 @@ class BaseCase(unittest.TestCase):
             jQuery commands require a CSS_SELECTOR for finding elements.
             This method should only be used for jQuery/JavaScript actions.
             Pure JavaScript doesn't support using a:contains("LINK_TEXT"). """
-        if by == By.CSS_SELECTOR:
-            return selector
-        elif by == By.ID:
-            return '#%s' % selector
-        elif by == By.CLASS_NAME:
-            return '.%s' % selector
-        elif by == By.NAME:
-            return '[name="%s"]' % selector
-        elif by == By.TAG_NAME:
-            return selector
-        elif by == By.XPATH:
-            return self.convert_xpath_to_css(selector)
-        elif by == By.LINK_TEXT:
-            return 'a:contains("%s")' % selector
-        elif by == By.PARTIAL_LINK_TEXT:
-            return 'a:contains("%s")' % selector
-        else:
-            raise Exception(
-                "Exception: Could not convert {%s}(by=%s) to CSS_SELECTOR!" % (
-                    selector, by))
+        return selector_utils.convert_to_css_selector(selector, by)
 
     def set_value(self, selector, new_value, by=By.CSS_SELECTOR,
                   timeout=settings.LARGE_TIMEOUT):
         """ This method uses JavaScript to update a text field. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         orginal_selector = selector
         css_selector = self.convert_to_css_selector(selector, by=by)
         self.__demo_mode_highlight_if_active(orginal_selector, by)
@@ -1862,8 +1812,7 @@ class BaseCase(unittest.TestCase):
             self.scroll_to(orginal_selector, by=by, timeout=timeout)
         value = re.escape(new_value)
         value = self.__escape_quotes_if_needed(value)
-        css_selector = re.escape(css_selector)
-        css_selector = self.__escape_quotes_if_needed(css_selector)
+        css_selector = selector_utils.escape_selector_for_js(css_selector)
         script = ("""document.querySelector('%s').value='%s';"""
                   % (css_selector, value))
         self.execute_script(script)
@@ -1891,8 +1840,7 @@ class BaseCase(unittest.TestCase):
             {Enter/Return} after the text is entered. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         element = self.wait_for_element_visible(
             selector, by=by, timeout=timeout)
         self.__demo_mode_highlight_if_active(selector, by)
@@ -1919,17 +1867,15 @@ class BaseCase(unittest.TestCase):
             selector, new_value, by=by, timeout=timeout)
 
     def hover_on_element(self, selector, by=By.CSS_SELECTOR):
-        if page_utils.is_xpath_selector(selector):
+        selector, by = self.__recalculate_selector(selector, by)
+        if by == By.XPATH:
             selector = self.convert_to_css_selector(selector, By.XPATH)
             by = By.CSS_SELECTOR
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
         self.wait_for_element_visible(
             selector, by=by, timeout=settings.SMALL_TIMEOUT)
         self.__demo_mode_highlight_if_active(selector, by)
         self.scroll_to(selector, by=by)
-        time.sleep(0.05)  # Settle down from scrolling before hovering
+        self.__settle(0.05)  # Settle down from scrolling before hovering
         return page_actions.hover_on_element(self.driver, selector)
 
     def hover_and_click(self, hover_selector, click_selector,
@@ -1937,20 +1883,14 @@ class BaseCase(unittest.TestCase):
                         timeout=settings.SMALL_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(hover_selector):
+        hover_selector, hover_by = self.__recalculate_selector(
+            hover_selector, hover_by)
+        if hover_by == By.XPATH:
             hover_selector = self.convert_to_css_selector(
                 hover_selector, By.XPATH)
             hover_by = By.CSS_SELECTOR
-        if page_utils.is_xpath_selector(click_selector):
-            click_by = By.XPATH
-        if page_utils.is_link_text_selector(hover_selector):
-            hover_selector = page_utils.get_link_text_from_selector(
-                hover_selector)
-            hover_by = By.LINK_TEXT
-        if page_utils.is_link_text_selector(click_selector):
-            click_selector = page_utils.get_link_text_from_selector(
-                click_selector)
-            click_by = By.LINK_TEXT
+        click_selector, click_by = self.__recalculate_selector(
+            click_selector, click_by)
         self.wait_for_element_visible(
             hover_selector, by=hover_by, timeout=timeout)
         self.__demo_mode_highlight_if_active(hover_selector, hover_by)
@@ -1972,8 +1912,8 @@ class BaseCase(unittest.TestCase):
         """ Selects an HTML <select> option by specification.
             Option specifications are by "text", "index", or "value".
             Defaults to "text" if option_by is unspecified or unknown. """
-        if page_utils.is_xpath_selector(dropdown_selector):
-            dropdown_by = By.XPATH
+        dropdown_selector, dropdown_by = self.__recalculate_selector(
+            dropdown_selector, dropdown_by)
         element = self.find_element(
             dropdown_selector, by=dropdown_by, timeout=timeout)
         self.__demo_mode_highlight_if_active(dropdown_selector, dropdown_by)
@@ -1987,7 +1927,7 @@ class BaseCase(unittest.TestCase):
                 Select(element).select_by_visible_text(option)
         except (StaleElementReferenceException, ENI_Exception):
             self.wait_for_ready_state_complete()
-            time.sleep(0.05)
+            self.__settle(0.05)
             element = self.find_element(
                 dropdown_selector, by=dropdown_by, timeout=timeout)
             if option_by == "index":
@@ -2118,11 +2058,7 @@ class BaseCase(unittest.TestCase):
             The element does not need be visible (it may be hidden). """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.wait_for_element_present(
             self.driver, selector, by, timeout)
 
@@ -2146,13 +2082,25 @@ class BaseCase(unittest.TestCase):
                                  timeout=settings.LARGE_TIMEOUT):
         """ Waits for an element to appear in the HTML of a page.
             The element must be visible (it cannot be hidden). """
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
-        return page_actions.wait_for_element_visible(
-            self.driver, selector, by, timeout)
+        selector, by = self.__recalculate_selector(selector, by)
+        if settings.CACHE_ELEMENTS:
+            cache = element_cache.get_element_cache(self.driver)
+            cache_key = (by, selector,
+                         tuple(self.__frame_path), self.__window_key)
+            element = cache.get_visible_element(cache_key)
+            if element:
+                return element
+        element = page_actions.wait_for_element_visible(
+            self.driver, selector, by, timeout,
+            in_page=settings.WAIT_FOR_ELEMENTS_IN_PAGE)
+        if settings.CACHE_ELEMENTS:
+            cache.add(cache_key, element)
+        return element
+
+    def get_element_cache_stats(self):
+        """ Returns the hit/miss counters of the element cache for the
+            current driver. (Requires settings.CACHE_ELEMENTS = True) """
+        return element_cache.get_element_cache(self.driver).get_stats()
 
     def wait_for_element(self, selector, by=By.CSS_SELECTOR,
                          timeout=settings.LARGE_TIMEOUT):
@@ -2178,11 +2126,7 @@ class BaseCase(unittest.TestCase):
         self.wait_for_element_visible(selector, by=by, timeout=timeout)
 
         if self.demo_mode:
-            if page_utils.is_xpath_selector(selector):
-                by = By.XPATH
-            if page_utils.is_link_text_selector(selector):
-                selector = page_utils.get_link_text_from_selector(selector)
-                by = By.LINK_TEXT
+            selector, by = self.__recalculate_selector(selector, by)
             messenger_post = "ASSERT %s: %s" % (by, selector)
             self.__highlight_with_assert_success(messenger_post, selector, by)
         return True
@@ -2196,6 +2140,41 @@ class BaseCase(unittest.TestCase):
         self.assert_element(selector, by=by, timeout=timeout)
         return True
 
+    def __get_selectors_and_bys(self, selectors):
+        if not isinstance(selectors, (list, tuple)) or not selectors:
+            raise Exception(
+                "Expecting a list of selectors! Received: {%s}" % selectors)
+        selectors_and_bys = []
+        for selector in selectors:
+            by = By.CSS_SELECTOR
+            selector, by = self.__recalculate_selector(selector, by)
+            selectors_and_bys.append((selector, by))
+        return selectors_and_bys
+
+    def wait_for_any(self, selectors, timeout=settings.LARGE_TIMEOUT):
+        """ Waits for any one of the selectors to be visible on the page.
+            All selectors are checked together in one script call per poll,
+            which is faster than chaining multiple wait/is_visible calls.
+            Selectors can be CSS Selectors, XPaths, or "link=LINK_TEXT".
+            Returns the selector that matched first (in list order). """
+        if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
+            timeout = self.__get_new_timeout(timeout)
+        selectors_and_bys = self.__get_selectors_and_bys(selectors)
+        index, element = page_actions.wait_for_any_element_visible(
+            self.driver, selectors_and_bys, timeout)
+        return selectors[index]
+
+    def wait_for_all(self, selectors, timeout=settings.LARGE_TIMEOUT):
+        """ Waits for all of the selectors to be visible on the page.
+            All selectors are checked together in one script call per poll.
+            Selectors can be CSS Selectors, XPaths, or "link=LINK_TEXT".
+            Returns the list of elements (in the same order as selectors). """
+        if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
+            timeout = self.__get_new_timeout(timeout)
+        selectors_and_bys = self.__get_selectors_and_bys(selectors)
+        return page_actions.wait_for_all_elements_visible(
+            self.driver, selectors_and_bys, timeout)
+
     # For backwards compatibility, earlier method names of the next
     # four methods have remained even though they do the same thing,
     # with the exception of assert_*, which won't return the element,
@@ -2205,11 +2184,7 @@ class BaseCase(unittest.TestCase):
                               timeout=settings.LARGE_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.wait_for_text_visible(
             self.driver, text, selector, by, timeout)
 
@@ -2218,11 +2193,7 @@ class BaseCase(unittest.TestCase):
                                     timeout=settings.LARGE_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.wait_for_exact_text_visible(
             self.driver, text, selector, by, timeout)
 
@@ -2259,11 +2230,7 @@ class BaseCase(unittest.TestCase):
         self.wait_for_text_visible(text, selector, by=by, timeout=timeout)
 
         if self.demo_mode:
-            if page_utils.is_xpath_selector(selector):
-                by = By.XPATH
-            if page_utils.is_link_text_selector(selector):
-                selector = page_utils.get_link_text_from_selector(selector)
-                by = By.LINK_TEXT
+            selector, by = self.__recalculate_selector(selector, by)
             messenger_post = ("ASSERT TEXT {%s} in %s: %s"
                               % (text, by, selector))
             self.__highlight_with_assert_success(messenger_post, selector, by)
@@ -2282,11 +2249,7 @@ class BaseCase(unittest.TestCase):
             text, selector, by=by, timeout=timeout)
 
         if self.demo_mode:
-            if page_utils.is_xpath_selector(selector):
-                by = By.XPATH
-            if page_utils.is_link_text_selector(selector):
-                selector = page_utils.get_link_text_from_selector(selector)
-                by = By.LINK_TEXT
+            selector, by = self.__recalculate_selector(selector, by)
             messenger_post = ("ASSERT TEXT {%s} in %s: %s"
                               % (text, by, selector))
             self.__highlight_with_assert_success(messenger_post, selector, by)
@@ -2369,10 +2332,10 @@ class BaseCase(unittest.TestCase):
             use wait_for_element_not_visible() instead. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.wait_for_element_absent(
-            self.driver, selector, by, timeout)
+            self.driver, selector, by, timeout,
+            in_page=settings.WAIT_FOR_ELEMENTS_IN_PAGE)
 
     def assert_element_absent(self, selector, by=By.CSS_SELECTOR,
                               timeout=settings.SMALL_TIMEOUT):
@@ -2393,11 +2356,7 @@ class BaseCase(unittest.TestCase):
             to qualify as not visible. """
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
+        selector, by = self.__recalculate_selector(selector, by)
         return page_actions.wait_for_element_not_visible(
             self.driver, selector, by, timeout)
 
@@ -2416,26 +2375,44 @@ class BaseCase(unittest.TestCase):
     def wait_for_ready_state_complete(self, timeout=settings.EXTREME_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.EXTREME_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
-        is_ready = js_utils.wait_for_ready_state_complete(self.driver, timeout)
-        self.wait_for_angularjs(timeout=settings.MINI_TIMEOUT)
+        # (Also waits for AngularJS/Angular, and for jQuery AJAX if that's
+        # turned on in settings.py, in the same call)
+        page_state = js_utils.wait_for_page_ready(self.driver, timeout)
+        if settings.CACHE_ELEMENTS and page_state["url"]:
+            # (Clears the cached elements if the URL changed)
+            element_cache.get_element_cache(self.driver).set_page_url(
+                page_state["url"])
         if self.js_checking_on:
             self.assert_no_js_errors()
         if self.ad_block_on:
             # If the ad_block feature is enabled, then block ads for new URLs
-            current_url = self.get_current_url()
+            current_url = page_state["url"] or self.get_current_url()
             if not current_url == self.__last_page_load_url:
-                time.sleep(0.02)
+                # (Slower-loading ads, such as iframe ads, get removed by
+                # the MutationObserver that ad_block() leaves on the page)
                 self.ad_block()
-                time.sleep(0.01)
-                if self.is_element_present("iframe"):
-                    time.sleep(0.07)  # iframe ads take slightly longer to load
-                    self.ad_block()  # Do ad_block on slower-loading iframes
                 self.__last_page_load_url = current_url
-        return is_ready
+        return True
 
     def wait_for_angularjs(self, timeout=settings.LARGE_TIMEOUT, **kwargs):
         js_utils.wait_for_angularjs(self.driver, timeout, **kwargs)
 
+    def wait_for_network_idle(self, idle_ms=settings.NETWORK_IDLE_MS,
+                              timeout=settings.LARGE_TIMEOUT):
+        """ Waits until no fetch/XHR/WebSocket-connect requests have been
+            in flight for idle_ms milliseconds. (Requests are counted by a
+            small shim that's injected into the page on the first call, so
+            requests made before that first call can't be seen.)
+            Useful for single-page apps that load data after readyState. """
+        if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
+            timeout = self.__get_new_timeout(timeout)
+        result = js_utils.wait_for_network_idle(self.driver, idle_ms, timeout)
+        if not result["idle"]:
+            raise Exception(
+                "Network was still busy after %s seconds! "
+                "(%s requests in flight)" % (timeout, result["inflight"]))
+        return True
+
     def wait_for_and_accept_alert(self, timeout=settings.LARGE_TIMEOUT):
         if self.timeout_multiplier and timeout == settings.LARGE_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
@@ -2456,6 +2433,7 @@ class BaseCase(unittest.TestCase):
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
         page_actions.switch_to_frame(self.driver, frame, timeout)
+        self.__frame_path.append(getattr(frame, "id", frame))
 
     def switch_to_default_content(self):
         """ Brings driver control outside the current iframe.
@@ -2463,11 +2441,12 @@ class BaseCase(unittest.TestCase):
             will be set to one level above the current frame. If the driver
             control is not currenly in an iframe, nothing will happen.) """
         self.driver.switch_to.default_content()
+        self.__frame_path = []
 
     def open_new_window(self, switch_to=True):
         """ Opens a new browser tab/window and switches to it by default. """
         self.driver.execute_script("window.open('');")
-        time.sleep(0.01)
+        self.__settle(0.01)
         if switch_to:
             self.switch_to_window(len(self.driver.window_handles) - 1)
 
@@ -2475,6 +2454,8 @@ class BaseCase(unittest.TestCase):
         if self.timeout_multiplier and timeout == settings.SMALL_TIMEOUT:
             timeout = self.__get_new_timeout(timeout)
         page_actions.switch_to_window(self.driver, window, timeout)
+        self.__frame_path = []
+        self.__window_key = window
 
     def switch_to_default_window(self):
         self.switch_to_window(0)
@@ -2690,6 +2671,108 @@ class BaseCase(unittest.TestCase):
             proxy - if using a proxy server, specify the "host:port" combo here
             switch_to - the option to switch to the new driver (default = True)
         """
+        new_driver = self.__launch_driver(browser=browser,
+                                          headless=headless,
+                                          servername=servername,
+                                          port=port,
+                                          proxy=proxy,
+                                          agent=agent,
+                                          cap_file=cap_file,
+                                          disable_csp=disable_csp)
+        self._drivers_list.append(new_driver)
+        # (Only set when profiling browser launches with "--profile_launch")
+        launch_profile = launch_profiler.get_launch_profile(new_driver)
+        if switch_to:
+            self.driver = new_driver
+            if self.headless:
+                # Make sure the invisible browser window is big enough
+                try:
+                    with launch_profiler.phase(
+                            "set_window_size", launch_profile):
+                        self.set_window_size(1440, 1080)
+                    with launch_profiler.phase(
+                            "wait_for_ready_state_complete", launch_profile):
+                        self.wait_for_ready_state_complete()
+                except Exception:
+                    # This shouldn't fail, but in case it does,
+                    # get safely through setUp() so that
+                    # WebDrivers can get closed during tearDown().
+                    pass
+            else:
+                if self.browser == 'chrome' or self.browser == 'opera':
+                    try:
+                        with launch_profiler.phase(
+                                "set_window_size", launch_profile):
+                            self.driver.set_window_size(1250, 840)
+                        with launch_profiler.phase(
+                                "wait_for_ready_state_complete",
+                                launch_profile):
+                            self.wait_for_ready_state_complete()
+                    except Exception:
+                        pass  # Keep existing browser resolution
+                elif self.browser == 'edge':
+                    try:
+                        with launch_profiler.phase(
+                                "set_window_size", launch_profile):
+                            self.driver.maximize_window()
+                        with launch_profiler.phase(
+                                "wait_for_ready_state_complete",
+                                launch_profile):
+                            self.wait_for_ready_state_complete()
+                    except Exception:
+                        pass  # Keep existing browser resolution
+        launch_profiler.finish_launch(new_driver)
+        return new_driver
+
+    def get_new_drivers(self, count, browser=None, headless=None,
+                        servername=None, port=None, proxy=None, agent=None,
+                        cap_file=None, disable_csp=None):
+        """ Launches multiple browsers at the same time, for tests that need
+            several (Ex: chat, multi-user, or admin/customer flows).
+            Returns the list of new drivers (in launch order). The current
+            driver stays the same. (Use self.switch_to_driver(driver).)
+            @Params
+            count - the number of browsers to launch
+            (The other parameters are the same as in get_new_driver().) """
+        from multiprocessing.pool import ThreadPool
+        if not isinstance(count, int) or count < 1:
+            raise Exception(
+                'Invalid count {%s} for get_new_drivers()! '
+                'Must be an integer of at least 1.' % count)
+        launch_args = dict(browser=browser,
+                           headless=headless,
+                           servername=servername,
+                           port=port,
+                           proxy=proxy,
+                           agent=agent,
+                           cap_file=cap_file,
+                           disable_csp=disable_csp)
+        thread_pool = ThreadPool(count)
+        try:
+            results = [thread_pool.apply_async(
+                self.__launch_driver, kwds=launch_args) for x in range(count)]
+            new_drivers = []
+            launch_error = None
+            for result in results:
+                try:
+                    new_drivers.append(result.get())
+                except Exception as e:
+                    if not launch_error:
+                        launch_error = e
+        finally:
+            thread_pool.close()
+            thread_pool.join()
+        # Drivers that did launch get quit in tearDown() (even after errors)
+        self._drivers_list.extend(new_drivers)
+        for new_driver in new_drivers:
+            launch_profiler.finish_launch(new_driver)
+        if launch_error:
+            raise launch_error
+        return new_drivers
+
+    def __launch_driver(self, browser=None, headless=None, servername=None,
+                        port=None, proxy=None, agent=None, cap_file=None,
+                        disable_csp=None):
         if self.browser == "remote" and self.servername == "localhost":
             raise Exception('Cannot use "remote" browser driver on localhost!'
                             ' Did you mean to connect to a remote Grid server'
@@ -2742,42 +2825,84 @@ class BaseCase(unittest.TestCase):
                             "Valid options = {%s}" % (browser, valid_browsers))
         # Launch a web browser
         from seleniumbase.core import browser_launcher
-        new_driver = browser_launcher.get_driver(browser_name=browser_name,
-                                                 headless=headless,
-                                                 use_grid=use_grid,
-                                                 servername=servername,
-                                                 port=port,
-                                                 proxy_string=proxy_string,
-                                                 user_agent=user_agent,
-                                                 cap_file=cap_file,
-                                                 disable_csp=disable_csp)
-        self._drivers_list.append(new_driver)
-        if switch_to:
-            self.driver = new_driver
-            if self.headless:
-                # Make sure the invisible browser window is big enough
+
+        launch_args = dict(browser_name=browser_name,
+                           headless=headless,
+                           use_grid=use_grid,
+                           servername=servername,
+                           port=port,
+                           proxy_string=proxy_string,
+                           user_agent=user_agent,
+                           cap_file=cap_file,
+                           disable_csp=disable_csp,
+                           block_ads=self.ad_block_on,
+                           block_resources=self.block_resources,
+                           warm_cache_profile=self.warm_cache_profile)
+
+        def launch_driver():
+            driver = None
+            if self.prelaunch:
+                # Adopt the driver that was launched in the background
+                driver = browser_launcher.get_prelaunched_driver(**launch_args)
+            if not driver:
+                driver = browser_launcher.get_driver(**launch_args)
+            if self.prelaunch:
+                # Start launching the next driver while this test runs
+                browser_launcher.prelaunch_driver(**launch_args)
+            return driver
+        if self.reuse_session:
+            # Use an already-running browser from the pool if there is one
+            pool_key = driver_pool.get_pool_key(
+                browser_name, headless, use_grid, servername, port,
+                proxy_string, user_agent, cap_file, disable_csp,
+                self.ad_block_on, self.block_resources,
+                self.warm_cache_profile)
+            return driver_pool.acquire_driver(pool_key, launch_driver)
+        return launch_driver()
+
+    def __recycle_driver_if_needed(self):
+        """ Replaces the default driver with a new one if it went over the
+            driver recycling limits (--max_driver_rss/--max_driver_commands).
+            The current URL, its cookies, and the window size carry over.
+            (Skipped while extra windows/tabs are open, which can't carry
+            over. The driver is checked again at the next safe point.) """
+        if not driver_recycler.is_enabled():
+            return
+        old_driver = self.driver
+        if old_driver is None or old_driver is not self._default_driver:
+            return
+        reason = driver_recycler.get_recycle_reason(old_driver)
+        if not reason:
+            return
+        try:
+            if len(old_driver.window_handles) != 1:
+                return
+            current_url = old_driver.current_url
+            cookies = old_driver.get_cookies()
+            window_size = old_driver.get_window_size()
+        except Exception:
+            return  # The browser is in a bad state. Leave it for tearDown()
+        new_driver = self.__launch_driver()
+        driver_recycler.log_event(old_driver, reason, "on page load")
+        self._drivers_list[self._drivers_list.index(old_driver)] = new_driver
+        self._default_driver = new_driver
+        self.driver = new_driver
+        launch_profiler.finish_launch(new_driver)
+        element_cache.clear_element_cache(old_driver)
+        driver_reaper.quit_driver_async(old_driver)
+        try:
+            new_driver.set_window_size(
+                window_size["width"], window_size["height"])
+        except Exception:
+            pass  # Keep the new browser's window size
+        if cookies and current_url.startswith("http"):
+            # Cookies can only be added for the domain of the current page
+            new_driver.get(current_url)
+            for cookie in cookies:
                 try:
-                    self.set_window_size(1440, 1080)
-                    self.wait_for_ready_state_complete()
+                    new_driver.add_cookie(cookie)
                 except Exception:
-                    # This shouldn't fail, but in case it does,
-                    # get safely through setUp() so that
-                    # WebDrivers can get closed during tearDown().
-                    pass
-            else:
-                if self.browser == 'chrome' or self.browser == 'opera':
-                    try:
-                        self.driver.set_window_size(1250, 840)
-                        self.wait_for_ready_state_complete()
-                    except Exception:
-                        pass  # Keep existing browser resolution
-                elif self.browser == 'edge':
-                    try:
-                        self.driver.maximize_window()
-                        self.wait_for_ready_state_complete()
-                    except Exception:
-                        pass  # Keep existing browser resolution
-        return new_driver
+                    pass  # Some browsers reject some cookie fields
 
     def switch_to_driver(self, driver):
         """ Sets self.driver to the specified driver.
@@ -2920,8 +3045,7 @@ class BaseCase(unittest.TestCase):
         """ Clicks an element using pure JS. Does not use jQuery. """
         selector, by = self.__recalculate_selector(selector, by)
         css_selector = self.convert_to_css_selector(selector, by=by)
-        css_selector = re.escape(css_selector)
-        css_selector = self.__escape_quotes_if_needed(css_selector)
+        css_selector = selector_utils.escape_selector_for_js(css_selector)
         script = ("""var simulateClick = function (elem) {
                          var evt = new MouseEvent('click', {
                              bubbles: true,
@@ -2993,17 +3117,31 @@ class BaseCase(unittest.TestCase):
 
     def __recalculate_selector(self, selector, by):
         # Try to determine the type of selector automatically
-        if page_utils.is_xpath_selector(selector):
-            by = By.XPATH
-        if page_utils.is_link_text_selector(selector):
-            selector = page_utils.get_link_text_from_selector(selector)
-            by = By.LINK_TEXT
-        return (selector, by)
+        # (The result is cached for each selector in selector_utils.py)
+        descriptor = selector_utils.resolve_selector(selector, by)
+        return (descriptor.selector, descriptor.by)
 
     def __make_css_match_first_element_only(self, selector):
         # Only get the first match
         return page_utils.make_css_match_first_element_only(selector)
 
+    def __settle(self, seconds):
+        """ Gives the page a moment to settle after an action.
+            Normally this sleeps for the given number of seconds.
+            In lean mode (--lean), this only waits while the DOM is still
+            changing (up to the same number of seconds). """
+        if not self.lean_mode:
+            time.sleep(seconds)
+            return
+        start = time.time()
+        try:
+            js_utils.wait_for_dom_to_settle(
+                self.driver, settings.LEAN_MODE_QUIET_TIME, seconds)
+        except Exception:
+            pass  # The page may be navigating, which is settled enough
+        self.__lean_time_saved += seconds - (time.time() - start)
+        self.__lean_settle_count += 1
+
     def __demo_mode_pause_if_active(self, tiny=False):
         if self.demo_mode:
             if self.demo_sleep:
@@ -3053,18 +3191,16 @@ class BaseCase(unittest.TestCase):
                 o_bs = original_box_shadow
 
         if ":contains" not in selector and ":first" not in selector:
-            selector = re.escape(selector)
-            selector = self.__escape_quotes_if_needed(selector)
+            selector = selector_utils.escape_selector_for_js(selector)
             self.__highlight_with_js_2(message, selector, o_bs)
         else:
             selector = self.__make_css_match_first_element_only(selector)
-            selector = re.escape(selector)
-            selector = self.__escape_quotes_if_needed(selector)
+            selector = selector_utils.escape_selector_for_js(selector)
             try:
                 self.__highlight_with_jquery_2(message, selector, o_bs)
             except Exception:
                 pass  # JQuery probably couldn't load. Skip highlighting.
-        time.sleep(0.065)
+        self.__settle(0.065)
 
     def __highlight_with_js_2(self, message, selector, o_bs):
         js_utils.highlight_with_js_2(
@@ -3126,6 +3262,15 @@ class BaseCase(unittest.TestCase):
             self.save_screenshot_after_test = sb_config.save_screenshot
             self.visual_baseline = sb_config.visual_baseline
             self.timeout_multiplier = sb_config.timeout_multiplier
+            self.lean_mode = sb_config.lean_mode
+            self.test_budget = sb_config.test_budget
+            self.reuse_session = sb_config.reuse_session
+            self.prelaunch = sb_config.prelaunch
+            self.block_resources = sb_config.block_resources
+            self.warm_cache_profile = sb_config.warm_cache_profile
+            if sb_config.marked_test_budget:
+                # "@pytest.mark.budget(SECONDS)" overrides "--test_budget"
+                self.test_budget = sb_config.marked_test_budget
             self.pytest_html_report = sb_config.pytest_html_report
             self.report_on = False
             if self.pytest_html_report:
@@ -3183,6 +3328,12 @@ class BaseCase(unittest.TestCase):
                     # Chrome and Firefox now have built-in headless displays
                     pass
 
+        if self.test_budget:
+            # Waits will be capped at the time left in the test's budget
+            poll_utils.start_test_budget(float(self.test_budget))
+        else:
+            poll_utils.stop_test_budget()  # (If a past setUp() had failed)
+
         # Launch WebDriver for both Pytest and Nosetests
         if not hasattr(self, "browser"):
             raise Exception("""SeleniumBase plugins did not load! """
@@ -3274,12 +3425,9 @@ class BaseCase(unittest.TestCase):
         # Close all open browser windows
         self._drivers_list.reverse()  # Last In, First Out
         for driver in self._drivers_list:
-            try:
-                driver.quit()
-            except AttributeError:
-                pass
-            except Exception:
-                pass
+            if self.reuse_session and driver_pool.release_driver(driver):
+                continue  # The browser was reset and went back to the pool
+            driver_reaper.quit_driver_async(driver)
         self.driver = None
         self._drivers_list = []
 
@@ -3304,6 +3452,15 @@ class BaseCase(unittest.TestCase):
                 self.process_delayed_asserts()
             else:
                 self.process_delayed_asserts(print_only=True)
+        budget = poll_utils.stop_test_budget()
+        if budget and has_exception:
+            print("\n" + "\n".join(budget.get_report_lines()))
+        if self.lean_mode:
+            test_id = "%s.%s.%s" % (self.__class__.__module__,
+                                    self.__class__.__name__,
+                                    self._testMethodName)
+            lean_mode_helper.record_time_saved(
+                test_id, self.__lean_time_saved, self.__lean_settle_count)
         self.is_pytest = None
         try:
             # This raises an exception if the test is not coming from pytest
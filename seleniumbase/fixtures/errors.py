@@ -18,3 +18,8 @@ class SkipTest(Exception):
 class DeprecatedTest(Exception):
     """Raise this to mark a test as Deprecated."""
     pass
+
+
+class TimeBudgetExceeded(Exception):
+    """Raised when a test runs out of its time budget (--test_budget)."""
+    pass
@@ -2,13 +2,343 @@
 This module contains useful Javascript utility methods for base_case.py
 These helper methods SHOULD NOT be called directly from tests.
 """
+import collections
 import re
 import requests
 import time
+import weakref
 from selenium.common.exceptions import WebDriverException
 from seleniumbase.common import decorators
 from seleniumbase.config import settings
+from seleniumbase.core import asset_store
 from seleniumbase.fixtures import constants
+from seleniumbase.fixtures import poll_utils
+
+# (Lowercase) parts of the WebDriver errors from scripts that were running
+# when the page was unloaded or navigated away
+NAVIGATION_ERROR_MARKERS = (
+    "unloaded", "navigated", "navigation", "cannot determine loading status",
+    "no such execution context", "execution context was destroyed")
+
+# The last script timeout that was set on each driver
+_script_timeouts = weakref.WeakKeyDictionary()
+
+# A JavaScript function that approximates WebElement.is_displayed()
+IS_VISIBLE_JS = (
+    """function isVisible(el) {
+        if (!el || !document.documentElement.contains(el)) {
+            return false;
+        }
+        var style = window.getComputedStyle(el);
+        if (style.visibility === 'hidden' || style.display === 'none') {
+            return false;
+        }
+        return el.getClientRects().length > 0;
+    }""")
+
+# Counts in-flight fetch() / XMLHttpRequest / WebSocket-connect operations
+# in window.__sbNetwork.inflight (and the time of the last network activity
+# in window.__sbNetwork.lastActive). Requests that started before the shim
+# was installed aren't counted. (Installing it twice does nothing.)
+NETWORK_SHIM_JS = (
+    """(function() {
+        if (window.__sbNetwork) {
+            return;
+        }
+        var state = window.__sbNetwork = {inflight: 0, lastActive: Date.now()};
+        function begin() {
+            state.inflight++;
+            state.lastActive = Date.now();
+        }
+        function track() {
+            var ended = false;
+            begin();
+            return function() {
+                if (!ended) {
+                    ended = true;
+                    state.inflight = Math.max(0, state.inflight - 1);
+                    state.lastActive = Date.now();
+                }
+            };
+        }
+        if (window.fetch) {
+            var originalFetch = window.fetch;
+            window.fetch = function() {
+                var end = track();
+                try {
+                    return originalFetch.apply(this, arguments).then(
+                        function(response) { end(); return response; },
+                        function(error) { end(); throw error; });
+                } catch (e) {
+                    end();
+                    throw e;
+                }
+            };
+        }
+        if (window.XMLHttpRequest) {
+            var originalSend = XMLHttpRequest.prototype.send;
+            XMLHttpRequest.prototype.send = function() {
+                var end = track();
+                this.addEventListener('loadend', end);
+                try {
+                    return originalSend.apply(this, arguments);
+                } catch (e) {
+                    end();
+                    throw e;
+                }
+            };
+        }
+        if (window.WebSocket) {
+            var OriginalWebSocket = window.WebSocket;
+            var WebSocketShim = function(url, protocols) {
+                var ws = (protocols === undefined) ?
+                    new OriginalWebSocket(url) :
+                    new OriginalWebSocket(url, protocols);
+                var end = track();
+                ws.addEventListener('open', end);
+                ws.addEventListener('error', end);
+                ws.addEventListener('close', end);
+                return ws;
+            };
+            WebSocketShim.prototype = OriginalWebSocket.prototype;
+            ['CONNECTING', 'OPEN', 'CLOSING', 'CLOSED'].forEach(function(k) {
+                WebSocketShim[k] = OriginalWebSocket[k];
+            });
+            window.WebSocket = WebSocketShim;
+        }
+    })();""")
+
+
+# Page readiness detectors, checked together by wait_for_page_ready().
+# Each detector is the source of a JavaScript function that takes a "done"
+# callback. A poll(condition, done) helper is available inside detectors.
+_readiness_detectors = collections.OrderedDict()
+
+
+def register_readiness_detector(name, script, required=False,
+                                timeout=settings.MINI_TIMEOUT, enabled=None):
+    """
+    Adds a detector to the page readiness check (wait_for_page_ready()).
+    @Params
+    name - a unique name for the detector (replaces an existing one)
+    script - the source of a JavaScript function that takes a "done" callback,
+             Ex: "function(done) { poll(function() { return !window.busy; },
+                 done); }"
+             (Or a Python function that returns the source when called.)
+    required - if True, the page readiness check fails if this never finishes
+    timeout - the max seconds to wait for a detector that isn't required
+    enabled - an optional function that returns False to skip the detector
+    """
+    _readiness_detectors[name] = (script, required, timeout, enabled)
+
+
+def unregister_readiness_detector(name):
+    _readiness_detectors.pop(name, None)
+
+
+register_readiness_detector(
+    "readyState",
+    """function(done) {
+        poll(function() { return document.readyState === 'complete'; }, done);
+    }""",
+    required=True)
+
+register_readiness_detector(
+    "angularjs",
+    """function(done) {
+        if (!window.angular) {
+            return done();
+        }
+        var $elm = document.querySelector(
+            '[data-ng-app],[ng-app],.ng-scope') || document;
+        if (angular.getTestability) {
+            angular.getTestability($elm).whenStable(done);
+        } else {
+            var $inj;
+            try {
+                $inj = angular.element($elm).injector() ||
+                    angular.injector(['ng']);
+            } catch (ex) {
+                $inj = angular.injector(['ng']);
+            }
+            $inj.get = $inj.get || $inj;
+            $inj.get('$browser').notifyWhenNoOutstandingRequests(done);
+        }
+    }""",
+    enabled=lambda: settings.WAIT_FOR_ANGULARJS)
+
+register_readiness_detector(
+    "angular",
+    """function(done) {
+        if (!window.getAllAngularTestabilities) {
+            return done();
+        }
+        var testabilities = window.getAllAngularTestabilities();
+        var count = testabilities.length;
+        if (!count) {
+            return done();
+        }
+        for (var i = 0; i < testabilities.length; i++) {
+            testabilities[i].whenStable(function() {
+                if (--count === 0) {
+                    done();
+                }
+            });
+        }
+    }""",
+    enabled=lambda: settings.WAIT_FOR_ANGULARJS)
+
+register_readiness_detector(
+    "jQuery.active",
+    """function(done) {
+        poll(function() {
+            return !window.jQuery || !window.jQuery.active;
+        }, done);
+    }""",
+    enabled=lambda: settings.WAIT_FOR_JQUERY_AJAX)
+
+register_readiness_detector(
+    "networkIdle",
+    lambda: (
+        """function(done) {
+            %s
+            poll(function() {
+                var state = window.__sbNetwork;
+                return state.inflight === 0 &&
+                    Date.now() - state.lastActive >= %s;
+            }, done);
+        }""" % (NETWORK_SHIM_JS, int(settings.NETWORK_IDLE_MS))),
+    enabled=lambda: settings.WAIT_FOR_NETWORK_IDLE)
+
+
+def _get_readiness_script():
+    detectors = []
+    for name, detector in _readiness_detectors.items():
+        script, required, timeout, enabled = detector
+        if enabled and not enabled():
+            continue
+        if callable(script):
+            script = script()
+        detectors.append('["%s", %s, %s, %s]' % (
+            name, str(bool(required)).lower(), int(timeout * 1000), script))
+    return (
+        """var maxMs = arguments[0],
+        callback = arguments[arguments.length - 1];
+        var finished = false, doneList = [], timedOut = [];
+        function poll(condition, done) {
+            (function check() {
+                var result;
+                try {
+                    result = condition();
+                } catch (e) {
+                    result = true;
+                }
+                if (result) {
+                    done();
+                } else if (!finished) {
+                    setTimeout(check, 10);
+                }
+            })();
+        }
+        var detectors = [%s];
+        var remaining = detectors.length;
+        function finish(ready) {
+            if (finished) {
+                return;
+            }
+            finished = true;
+            var pending = [];
+            for (var i = 0; i < detectors.length; i++) {
+                if (!doneList[i]) {
+                    pending.push(detectors[i][0]);
+                }
+            }
+            callback({ready: ready, pending: pending, timedOut: timedOut,
+                      url: document.location.href});
+        }
+        function complete(i, expired) {
+            if (finished || doneList[i]) {
+                return;
+            }
+            doneList[i] = true;
+            if (expired) {
+                timedOut.push(detectors[i][0]);
+            }
+            if (--remaining === 0) {
+                finish(true);
+            }
+        }
+        setTimeout(function() { finish(false); }, maxMs);
+        for (var i = 0; i < detectors.length; i++) {
+            (function(i) {
+                if (!detectors[i][1]) {
+                    setTimeout(function() { complete(i, true); },
+                               detectors[i][2]);
+                }
+                try {
+                    detectors[i][3](function() { complete(i, false); });
+                } catch (e) {
+                    complete(i, false);
+                }
+            })(i);
+        }
+        if (!detectors.length) {
+            finish(true);
+        }""" % ",\n".join(detectors))
+
+
+def wait_for_page_ready(driver, timeout=settings.EXTREME_TIMEOUT):
+    """
+    Waits for document.readyState == "complete", AngularJS / Angular
+    testabilities, and pending jQuery AJAX requests (if
+    settings.WAIT_FOR_JQUERY_AJAX is on), all with a single
+    async script call. (See register_readiness_detector() for adding more.)
+    Detectors that aren't required stop waiting after their own timeout.
+    @Returns
+    A dict: {"ready": bool, "pending": [names], "timedOut": [names],
+             "url": the current URL (or None if the script couldn't run)}
+    """
+    timeout = poll_utils.cap_timeout(timeout)  # (If the test has a budget)
+    script = _get_readiness_script()
+    deadline = poll_utils.monotonic() + timeout
+    while True:
+        remaining = max(deadline - poll_utils.monotonic(), 0)
+        try:
+            result = execute_async_script(
+                driver, script, _get_script_timeout(timeout),
+                int(remaining * 1000))
+            break
+        except WebDriverException as e:
+            if not _is_navigation_error(e):
+                # Bug fix for: [Permission denied to access property
+                # "document"]
+                time.sleep(0.03)
+                return {"ready": True, "pending": [], "timedOut": [],
+                        "url": None}
+            # The page navigated away while the script was running.
+            # Wait for the next page (with the time that's left).
+            if poll_utils.monotonic() >= deadline:
+                raise Exception(
+                    "Page elements never fully loaded after %s seconds!"
+                    "" % timeout)
+            time.sleep(0.05)
+    if not result["ready"]:
+        for name in result["pending"]:
+            detector = _readiness_detectors.get(name)
+            if detector and detector[1]:
+                raise Exception(
+                    "Page elements never fully loaded after %s seconds!"
+                    "" % timeout)
+    return result
+
+
+def _is_navigation_error(exception):
+    """ Returns True if the script failed because the page was unloaded
+        or navigated away (Ex: "document unloaded while waiting for
+        result"), in which case running it again on the next page works.
+    """
+    message = str(getattr(exception, "msg", None) or exception).lower()
+    return any(marker in message for marker in NAVIGATION_ERROR_MARKERS)
 
 
 def wait_for_ready_state_complete(driver, timeout=settings.EXTREME_TIMEOUT):
@@ -17,32 +347,282 @@ def wait_for_ready_state_complete(driver, timeout=settings.EXTREME_TIMEOUT):
     When the value of this becomes "complete", page resources are considered
     fully loaded (although AJAX and other loads might still be happening).
     This method will wait until document.readyState == "complete".
+    (The other page readiness detectors are checked in the same call.)
     """
+    wait_for_page_ready(driver, timeout)
+    return True
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            ready_state = driver.execute_script("return document.readyState")
-        except WebDriverException:
-            # Bug fix for: [Permission denied to access property "document"]
-            time.sleep(0.03)
-            return True
-        if ready_state == u'complete':
-            time.sleep(0.01)  # Better be sure everything is done loading
-            return True
-        else:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-    raise Exception(
-        "Page elements never fully loaded after %s seconds!" % timeout)
 
+def _get_script_timeout(timeout):
+    # Using the same script timeout for most async scripts saves the extra
+    # "set script timeout" command. (Scripts enforce their own time limits.)
+    return max(timeout, settings.EXTREME_TIMEOUT) + settings.MINI_TIMEOUT
 
-def execute_async_script(driver, script, timeout=settings.EXTREME_TIMEOUT):
-    driver.set_script_timeout(timeout)
-    return driver.execute_async_script(script)
+
+def execute_async_script(driver, script, timeout=settings.EXTREME_TIMEOUT,
+                         *args):
+    # Only send the "set script timeout" command when the value changes
+    try:
+        if _script_timeouts.get(driver) != timeout:
+            driver.set_script_timeout(timeout)
+            _script_timeouts[driver] = timeout
+    except TypeError:
+        driver.set_script_timeout(timeout)  # (Driver isn't weak-referenceable)
+    return driver.execute_async_script(script, *args)
+
+
+def wait_for_element_in_page(driver, selector, using="css",
+                             condition="visible",
+                             timeout=settings.LARGE_TIMEOUT):
+    """
+    Waits inside the browser for an element condition to become true,
+    using a MutationObserver with requestAnimationFrame checks, so that
+    the entire wait only takes a single WebDriver round trip.
+    @Params
+    driver - the webdriver object (required)
+    selector - the CSS Selector or XPath to wait for (required)
+    using - "css" or "xpath" (Default: "css")
+    condition - "visible" or "absent" (Default: "visible")
+    timeout - the time to wait in seconds
+    @Returns
+    A dictionary: {"done": Boolean, "element": WebElement or None,
+                   "error": String or None}
+    """
+    script = (
+        """var selector = arguments[0], using = arguments[1],
+        condition = arguments[2], timeout = arguments[3],
+        callback = arguments[arguments.length - 1];
+        var done = false, observer = null, timer = null, poll = null;
+        var frameRequested = false;
+        function find() {
+            if (using === 'xpath') {
+                return document.evaluate(selector, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE,
+                    null).singleNodeValue;
+            }
+            return document.querySelector(selector);
+        }
+        %s        function finish(result) {
+            if (done) { return; }
+            done = true;
+            if (observer) { observer.disconnect(); }
+            clearTimeout(timer);
+            clearInterval(poll);
+            callback(result);
+        }
+        function check() {
+            frameRequested = false;
+            if (done) { return; }
+            var el = null;
+            try {
+                el = find();
+            } catch (e) {
+                finish({done: false, element: null, error: String(e)});
+                return;
+            }
+            if (condition === 'absent' && !el) {
+                finish({done: true, element: null, error: null});
+            } else if (condition === 'visible' && isVisible(el)) {
+                finish({done: true, element: el, error: null});
+            }
+        }
+        function schedule() {
+            if (!frameRequested && !done) {
+                frameRequested = true;
+                window.requestAnimationFrame(check);
+            }
+        }
+        check();
+        if (!done) {
+            observer = new MutationObserver(schedule);
+            observer.observe(document.documentElement, {
+                childList: true, subtree: true,
+                attributes: true, characterData: true});
+            /* Style changes (CSS animations, media queries) don't mutate the
+               DOM, and background tabs may throttle requestAnimationFrame. */
+            poll = setInterval(check, 100);
+            timer = setTimeout(function() {
+                check();
+                finish({done: false, element: null, error: null});
+            }, timeout);
+        }""" % IS_VISIBLE_JS)
+    return execute_async_script(
+        driver, script, _get_script_timeout(timeout),
+        selector, using, condition, int(timeout * 1000))
+
+
+def wait_for_network_idle(driver, idle_ms=500,
+                          timeout=settings.LARGE_TIMEOUT):
+    """
+    Waits until there haven't been any in-flight fetch() / XMLHttpRequest /
+    WebSocket-connect operations for idle_ms milliseconds.
+    (Uses NETWORK_SHIM_JS, which gets installed on the first call for a page.
+    Requests that started before that aren't counted, so on a fresh shim the
+    full idle_ms is waited to give them a chance to finish.)
+    @Returns
+    A dict: {"idle": bool, "inflight": int, "elapsed": ms spent waiting}
+    """
+    timeout = poll_utils.cap_timeout(timeout)  # (If the test has a budget)
+    script = (
+        """var idleMs = arguments[0], maxMs = arguments[1],
+        callback = arguments[arguments.length - 1];
+        %s
+        var start = Date.now();
+        (function check() {
+            var state = window.__sbNetwork, now = Date.now();
+            if (state.inflight === 0 && now - state.lastActive >= idleMs) {
+                callback({idle: true, inflight: 0, elapsed: now - start});
+            } else if (now - start >= maxMs) {
+                callback({idle: false, inflight: state.inflight,
+                          elapsed: now - start});
+            } else {
+                setTimeout(check, 20);
+            }
+        })();""" % NETWORK_SHIM_JS)
+    return execute_async_script(
+        driver, script, _get_script_timeout(timeout),
+        int(idle_ms), int(timeout * 1000))
+
+
+def wait_for_dom_to_settle(driver, quiet_time=0.03, timeout=0.1):
+    """
+    Waits until the DOM hasn't changed for quiet_time seconds,
+    or until the timeout is reached (whichever comes first).
+    A MutationObserver records the time of the last DOM change, so if the
+    page is already quiet, this returns right away. (On a new page, the
+    observer gets installed by the first call, which then waits for
+    quiet_time, since DOM changes before that weren't observed.)
+    @Returns
+    The number of milliseconds spent waiting inside the browser.
+    """
+    script = (
+        """var quietMs = arguments[0], maxMs = arguments[1],
+        callback = arguments[arguments.length - 1];
+        var start = Date.now();
+        if (!window.__sbDomSettle) {
+            window.__sbDomSettle = {lastMutation: Date.now()};
+            try {
+                new MutationObserver(function() {
+                    window.__sbDomSettle.lastMutation = Date.now();
+                }).observe(document.documentElement, {
+                    childList: true, subtree: true,
+                    attributes: true, characterData: true});
+            } catch (e) {}
+        }
+        function check() {
+            var now = Date.now();
+            var quiet = now - window.__sbDomSettle.lastMutation >= quietMs;
+            if ((quiet && document.readyState === 'complete') ||
+                    now - start >= maxMs) {
+                callback(now - start);
+            } else {
+                setTimeout(check, 5);
+            }
+        }
+        check();""")
+    return execute_async_script(
+        driver, script, _get_script_timeout(timeout),
+        int(quiet_time * 1000), int(timeout * 1000))
+
+
+def remove_ads(driver, selectors):
+    """
+    Removes all elements that match any of the ad selectors, in a single
+    script call. A MutationObserver stays on the page afterwards to remove
+    matching elements that get added later (Ex: slower-loading iframe ads),
+    so there's no need to call this again for the same page.
+    (Invalid selectors are skipped instead of breaking the whole list.)
+    @Returns
+    The number of elements that were removed by this call.
+    """
+    script = (
+        """var selectors = arguments[0], valid = [];
+        for (var i = 0; i < selectors.length; i++) {
+            try {
+                document.querySelector(selectors[i]);
+                valid.push(selectors[i]);
+            } catch (e) {}
+        }
+        if (valid.length === 0) {
+            return 0;
+        }
+        window.__sbAdBlockSelector = valid.join(', ');
+        function removeAds(root) {
+            var adSelector = window.__sbAdBlockSelector, removed = 0;
+            if (root.matches && root.matches(adSelector)) {
+                root.remove();
+                return 1;
+            }
+            var ads = root.querySelectorAll(adSelector);
+            for (var j = 0; j < ads.length; j++) {
+                ads[j].remove();
+                removed++;
+            }
+            return removed;
+        }
+        if (!window.__sbAdBlockObserver && window.MutationObserver) {
+            window.__sbAdBlockObserver = new MutationObserver(
+                function(mutations) {
+                    for (var m = 0; m < mutations.length; m++) {
+                        var nodes = mutations[m].addedNodes;
+                        for (var n = 0; n < nodes.length; n++) {
+                            if (nodes[n].nodeType === 1 &&
+                                    nodes[n].parentNode) {
+                                removeAds(nodes[n]);
+                            }
+                        }
+                    }
+                });
+            window.__sbAdBlockObserver.observe(document.documentElement, {
+                childList: true, subtree: true});
+        }
+        return removeAds(document);""")
+    return driver.execute_script(script, list(selectors))
+
+
+def get_visible_elements_in_page(driver, conditions):
+    """
+    Checks a list of element conditions with a single script call.
+    @Params
+    driver - the webdriver object (required)
+    conditions - a list of [using, selector] pairs, where "using" is
+                 "css", "xpath", or "link" (for exact link text)
+    @Returns
+    A list with the first matching element for each condition if that
+    element is visible, or None if it isn't.
+    """
+    script = (
+        """var conditions = arguments[0];
+        %s
+        function find(using, selector) {
+            if (using === 'xpath') {
+                return document.evaluate(selector, document, null,
+                    XPathResult.FIRST_ORDERED_NODE_TYPE,
+                    null).singleNodeValue;
+            } else if (using === 'link') {
+                var links = document.getElementsByTagName('a');
+                for (var i = 0; i < links.length; i++) {
+                    var text = links[i].innerText || links[i].textContent;
+                    if (text && text.trim() === selector) {
+                        return links[i];
+                    }
+                }
+                return null;
+            }
+            return document.querySelector(selector);
+        }
+        var results = [];
+        for (var i = 0; i < conditions.length; i++) {
+            var el = null;
+            try {
+                el = find(conditions[i][0], conditions[i][1]);
+            } catch (e) {
+                el = null;
+            }
+            results.push(isVisible(el) ? el : null);
+        }
+        return results;""" % IS_VISIBLE_JS)
+    return driver.execute_script(script, conditions)
 
 
 def wait_for_angularjs(driver, timeout=settings.LARGE_TIMEOUT, **kwargs):
@@ -83,19 +663,164 @@ def is_jquery_activated(driver):
 
 
 def wait_for_jquery_active(driver, timeout=None):
+    """ Waits for jQuery to be defined (checked inside the page, with a
+        single async script call). Returns True if jQuery is defined. """
     if not timeout:
-        timeout = int(settings.MINI_TIMEOUT * 10.0)
-    else:
-        timeout = int(timeout * 10.0)
-    for x in range(timeout):
-        # jQuery needs a small amount of time to activate.
-        try:
-            driver.execute_script("jQuery('html')")
-            wait_for_ready_state_complete(driver)
-            wait_for_angularjs(driver)
-            return
-        except Exception:
-            time.sleep(0.1)
+        timeout = settings.MINI_TIMEOUT
+    script = (
+        """var timeoutMs = arguments[0];
+        var callback = arguments[arguments.length - 1];
+        var deadline = Date.now() + timeoutMs;
+        (function check() {
+            if (window.jQuery) {
+                return callback(true);
+            }
+            if (Date.now() >= deadline) {
+                return callback(false);
+            }
+            setTimeout(check, 20);
+        })();""")
+    try:
+        return execute_async_script(
+            driver, script, _get_script_timeout(timeout), int(timeout * 1000))
+    except WebDriverException:
+        return False
+
+
+# Adds all the script and stylesheet tags at once, and calls back when
+# every one of them has fired "onload" (or "onerror"). Scripts from links
+# still run in order (async = false). An inline script runs once all the
+# tags above it have loaded, since it might depend on them.
+LOAD_SCRIPTS_JS = (
+    """var items = arguments[0], timeoutMs = arguments[1];
+    var callback = arguments[arguments.length - 1];
+    var head = document.head || document.documentElement;
+    var result = {loaded: [], failed: [], pending: []};
+    var pending = [], index = 0, finished = false;
+    function finish() {
+        if (!finished) {
+            finished = true;
+            clearTimeout(timer);
+            result.pending = pending.slice();
+            callback(result);
+        }
+    }
+    var timer = setTimeout(finish, timeoutMs);
+    function settle(name, loaded) {
+        var i = pending.indexOf(name);
+        if (i !== -1) {
+            pending.splice(i, 1);
+            (loaded ? result.loaded : result.failed).push(name);
+            if (!pending.length) {
+                next();
+            }
+        }
+    }
+    function addTag(item) {
+        var tag;
+        if (item.type === 'css') {
+            tag = document.createElement('link');
+            tag.rel = 'stylesheet';
+            tag.type = 'text/css';
+            tag.href = item.source;
+        } else {
+            tag = document.createElement('script');
+            tag.type = 'text/javascript';
+            tag.async = false;
+            tag.src = item.source;
+        }
+        tag.crossOrigin = 'anonymous';
+        pending.push(item.name);
+        tag.onload = function() { settle(item.name, true); };
+        tag.onerror = function() { settle(item.name, false); };
+        head.appendChild(tag);
+    }
+    function next() {
+        while (index < items.length) {
+            var item = items[index];
+            if (item.type === 'inline') {
+                if (pending.length) {
+                    return;  // Continues once the tags above have loaded
+                }
+                var script = document.createElement('script');
+                script.type = 'text/javascript';
+                script.text = item.source;
+                head.appendChild(script);
+                result.loaded.push(item.name);
+            } else {
+                addTag(item);
+            }
+            index++;
+        }
+        if (!pending.length) {
+            finish();
+        }
+    }
+    next();""")
+
+
+def _is_asset_link(url_or_body):
+    return bool(re.match(r"^((https?:)?//\S+|\S+\.(js|css)(\?\S*)?)$",
+                         url_or_body.strip()))
+
+
+def load_scripts_async(driver, urls_or_bodies,
+                       timeout=settings.SMALL_TIMEOUT):
+    """
+    Adds JS/CSS links (and inline JS code) to the page all at once, and
+    waits for every one of them to load, with a single async script call.
+    (Links ending in ".css" are added as stylesheets.)
+    @Returns
+    A dict: {"loaded": [names], "failed": [names], "pending": [names]}
+    ("failed" ones fired "onerror". "pending" ones never finished loading.
+     Links are named by their URL, and inline code by "inline script #N".)
+    """
+    items = []
+    for url_or_body in urls_or_bodies:
+        if _is_asset_link(url_or_body):
+            url = url_or_body.strip()
+            if url.split("?")[0].endswith(".css"):
+                item_type = "css"
+            else:
+                item_type = "js"
+            items.append({"type": item_type, "source": url, "name": url})
+        else:
+            items.append({"type": "inline", "source": url_or_body,
+                          "name": "inline script #%s" % (len(items) + 1)})
+    try:
+        return execute_async_script(
+            driver, LOAD_SCRIPTS_JS, _get_script_timeout(timeout),
+            items, int(timeout * 1000))
+    except WebDriverException:
+        # (Ex: The page navigated away while loading)
+        return {"loaded": [], "failed": [],
+                "pending": [item["name"] for item in items]}
+
+
+def _get_load_failure_details(result):
+    details = ""
+    if result["failed"]:
+        details += " (Failed to load: %s)" % ", ".join(result["failed"])
+    if result["pending"]:
+        details += " (Never loaded: %s)" % ", ".join(result["pending"])
+    return details
+
+
+def add_assets_inline(driver, js_links=(), css_links=()):
+    """ Adds JS/CSS libraries to the page inline, with a single script call,
+        using the local copies from the asset store. (See asset_store.py)
+        Returns False if that isn't possible (Ex: INLINE_ASSETS is False,
+        or an asset isn't available), so that links can be used instead. """
+    if not settings.INLINE_ASSETS:
+        return False
+    script = asset_store.get_inline_script(js_links, css_links)
+    if not script:
+        return False
+    try:
+        driver.execute_script(script)
+        return True
+    except Exception:
+        return False
 
 
 def activate_jquery(driver):
@@ -110,24 +835,20 @@ def activate_jquery(driver):
         # jQuery is not currently defined. Let's proceed by defining it.
         pass
     jquery_js = constants.JQuery.MIN_JS
-    activate_jquery_script = (
-        '''var script = document.createElement('script');'''
-        '''script.src = "%s";document.getElementsByTagName('head')[0]'''
-        '''.appendChild(script);''' % jquery_js)
-    driver.execute_script(activate_jquery_script)
-    for x in range(int(settings.MINI_TIMEOUT * 10.0)):
-        # jQuery needs a small amount of time to activate.
-        try:
-            driver.execute_script("jQuery('html')")
+    if add_assets_inline(driver, js_links=[jquery_js]):
+        # (Inline scripts may be blocked by the Content Security Policy)
+        if is_jquery_activated(driver):
             return
-        except Exception:
-            time.sleep(0.1)
+    result = load_scripts_async(driver, [jquery_js])
+    if is_jquery_activated(driver):
+        return
     # Since jQuery still isn't activating, give up and raise an exception
     raise Exception(
         '''Unable to load jQuery on "%s" due to a possible violation '''
         '''of the website's Content Security Policy directive. '''
         '''To override this policy, add "--disable_csp" on the '''
-        '''command-line when running your tests.''' % driver.current_url)
+        '''command-line when running your tests.%s''' % (
+            driver.current_url, _get_load_failure_details(result)))
 
 
 def are_quotes_escaped(string):
@@ -175,103 +896,114 @@ def safe_execute_script(driver, script):
 
 def wait_for_css_query_selector(
         driver, selector, timeout=settings.SMALL_TIMEOUT):
-    element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            selector = re.escape(selector)
-            selector = escape_quotes_if_needed(selector)
-            element = driver.execute_script(
-                """return document.querySelector('%s')""" % selector)
-            if element:
-                return element
-        except Exception:
-            element = None
-        if not element:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-
+    css_selector = re.escape(selector)
+    css_selector = escape_quotes_if_needed(css_selector)
+    element = poll_utils.wait_until(
+        lambda: driver.execute_script(
+            """return document.querySelector('%s')""" % css_selector),
+        timeout, name="wait_for_css_query_selector")
+    if element:
+        return element
     raise Exception(
         "Element {%s} was not present after %s seconds!" % (
             selector, timeout))
 
 
+# Shows each box-shadow color for about stepMs (and at least one frame),
+# and then sets the "restore" value (unless it's null), all inside the page,
+# so that the animation timing doesn't depend on WebDriver round trips.
+# (The "%s" gets replaced with the code that finds the elements.)
+ANIMATE_BOX_SHADOW_JS = (
+    """var colors = arguments[0], stepMs = arguments[1];
+    var restore = arguments[2];
+    var callback = arguments[arguments.length - 1];
+    var elements = %s;
+    if (!elements) {
+        return callback('jQuery is not defined');
+    }
+    if (!elements.length) {
+        return callback('Element not found');
+    }
+    function setBoxShadow(value) {
+        for (var i = 0; i < elements.length; i++) {
+            elements[i].style.boxShadow = value;
+        }
+    }
+    var schedule = function(step) {
+        setTimeout(function() { step(Date.now()); }, 16);
+    };
+    if (window.requestAnimationFrame && !document.hidden) {
+        schedule = function(step) {
+            window.requestAnimationFrame(function() { step(Date.now()); });
+        };
+    }
+    var index = -1, start = Date.now();
+    function step(now) {
+        if (index === -1 || index < Math.floor((now - start) / stepMs)) {
+            index++;  // (One color per frame at most, so none get skipped)
+            if (index >= colors.length) {
+                if (restore !== null) {
+                    setBoxShadow(restore);
+                }
+                return callback(true);
+            }
+            setBoxShadow(colors[index]);
+        }
+        schedule(step);
+    }
+    step(Date.now());""")
+
+HIGHLIGHT_COLORS = (
+    "rgba(255, 0, 0, 1)", "rgba(128, 0, 128, 1)", "rgba(0, 0, 255, 1)",
+    "rgba(0, 255, 0, 1)", "rgba(128, 128, 0, 1)", "rgba(128, 0, 128, 1)")
+HIGHLIGHT_2_COLORS = (
+    "rgba(128, 128, 128, 0.5)", "rgba(205, 30, 0, 1)", "rgba(128, 0, 128, 1)",
+    "rgba(50, 50, 128, 1)", "rgba(50, 205, 50, 1)")
+
+
+def _get_box_shadow_value(o_bs):
+    """ "box-shadow: X;" (the original box shadow) => "X" """
+    value = o_bs.strip()
+    if value.startswith("box-shadow:"):
+        value = value[len("box-shadow:"):]
+    return value.strip().rstrip(";").strip()
+
+
+def _animate_box_shadow(driver, selector, colors, restore=None,
+                        use_jquery=False):
+    """ Runs the box-shadow animation with a single async script call.
+        (The selector must already be escaped for a quoted JS string.) """
+    colors = ["0px 0px 6px 6px %s" % color for color in colors]
+    if use_jquery:
+        find_script = "window.jQuery ? jQuery('%s').get() : null" % selector
+    else:
+        find_script = (
+            "[document.querySelector('%s')].filter(Boolean)" % selector)
+    step_ms = 18.1
+    timeout = _get_script_timeout(len(colors) * step_ms / 1000.0)
+    script = ANIMATE_BOX_SHADOW_JS % find_script
+    result = execute_async_script(
+        driver, script, timeout, colors, step_ms, restore)
+    if result == 'jQuery is not defined':
+        activate_jquery(driver)
+        result = execute_async_script(
+            driver, script, timeout, colors, step_ms, restore)
+    if result is not True:
+        raise Exception(
+            "Unable to highlight {%s}: %s" % (selector, result))
+
+
 def highlight_with_js(driver, selector, loops, o_bs):
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(128, 128, 128, 0.5)';"""
-              % selector)
-    driver.execute_script(script)
-    for n in range(loops):
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(255, 0, 0, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(128, 0, 128, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(0, 0, 255, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(0, 255, 0, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(128, 128, 0, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = ("""document.querySelector('%s').style =
-                  'box-shadow: 0px 0px 6px 6px rgba(128, 0, 128, 1)';"""
-                  % selector)
-        driver.execute_script(script)
-        time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: %s';"""
-              % (selector, o_bs))
-    driver.execute_script(script)
+    colors = ["rgba(128, 128, 128, 0.5)"] + list(HIGHLIGHT_COLORS) * loops
+    _animate_box_shadow(
+        driver, selector, colors, restore=_get_box_shadow_value(o_bs))
 
 
 def highlight_with_jquery(driver, selector, loops, o_bs):
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(128, 128, 128, 0.5)');""" % selector
-    safe_execute_script(driver, script)
-    for n in range(loops):
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(255, 0, 0, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(128, 0, 128, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(0, 0, 255, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(0, 255, 0, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(128, 128, 0, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-        script = """jQuery('%s').css('box-shadow',
-            '0px 0px 6px 6px rgba(128, 0, 128, 1)');""" % selector
-        driver.execute_script(script)
-        time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow', '%s');""" % (selector, o_bs)
-    driver.execute_script(script)
+    colors = ["rgba(128, 128, 128, 0.5)"] + list(HIGHLIGHT_COLORS) * loops
+    _animate_box_shadow(
+        driver, selector, colors, restore=_get_box_shadow_value(o_bs),
+        use_jquery=True)
 
 
 def add_css_link(driver, css_link):
@@ -368,21 +1100,13 @@ def activate_jquery_confirm(driver):
     jq_confirm_css = constants.JqueryConfirm.MIN_CSS
     jq_confirm_js = constants.JqueryConfirm.MIN_JS
 
+    js_links = [jq_confirm_js]
     if not is_jquery_activated(driver):
-        add_js_link(driver, jquery_js)
-        wait_for_jquery_active(driver, timeout=0.6)
-    add_css_link(driver, jq_confirm_css)
-    add_js_link(driver, jq_confirm_js)
-
-    for x in range(7):
-        # jQuery-Confirm needs a small amount of time to load & activate.
-        try:
-            driver.execute_script("jconfirm")
-            wait_for_ready_state_complete(driver)
-            wait_for_angularjs(driver)
+        js_links.insert(0, jquery_js)
+    if add_assets_inline(driver, js_links, [jq_confirm_css]):
+        if is_jquery_confirm_activated(driver):
             return
-        except Exception:
-            time.sleep(0.1)
+    load_scripts_async(driver, [jq_confirm_css] + js_links)
 
 
 def activate_messenger(driver):
@@ -405,29 +1129,22 @@ def activate_messenger(driver):
                  "messenger-on-bottom messenger-on-right', "
                  "theme: 'future'}")
 
-    add_js_link(driver, jquery_js)
-    add_css_link(driver, messenger_css)
-    add_css_link(driver, msgr_theme_flat_css)
-    add_css_link(driver, msgr_theme_future_css)
-    add_css_link(driver, msgr_theme_block_css)
-    add_css_link(driver, msgr_theme_air_css)
-    add_css_link(driver, msgr_theme_ice_css)
-    add_js_link(driver, underscore_js)
-    add_js_link(driver, backbone_js)
-    add_css_link(driver, spinner_css)
-    add_js_link(driver, messenger_js)
-    add_js_link(driver, msgr_theme_flat_js)
-    add_js_link(driver, msgr_theme_future_js)
-
-    for x in range(int(settings.MINI_TIMEOUT * 10.0)):
-        # Messenger needs a small amount of time to load & activate.
+    js_links = [underscore_js, backbone_js, messenger_js,
+                msgr_theme_flat_js, msgr_theme_future_js]
+    if not is_jquery_activated(driver):
+        js_links.insert(0, jquery_js)
+    css_links = [messenger_css, msgr_theme_flat_css, msgr_theme_future_css,
+                 msgr_theme_block_css, msgr_theme_air_css, msgr_theme_ice_css,
+                 spinner_css]
+    if add_assets_inline(driver, js_links, css_links):
         try:
             driver.execute_script(msg_style)
-            wait_for_ready_state_complete(driver)
-            wait_for_angularjs(driver)
             return
         except Exception:
-            time.sleep(0.1)
+            pass  # (Inline scripts may be blocked by the CSP) Use links.
+
+    # (Setting the options runs once all the libraries have loaded)
+    load_scripts_async(driver, css_links + js_links + [msg_style])
 
 
 def set_messenger_theme(driver, theme="default", location="default",
@@ -526,65 +1243,23 @@ def post_messenger_error_message(driver, message, msg_dur):
 
 
 def highlight_with_js_2(driver, message, selector, o_bs, msg_dur):
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(128, 128, 128, 0.5)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(205, 30, 0, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(128, 0, 128, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(50, 50, 128, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: 0px 0px 6px 6px rgba(50, 205, 50, 1)';"""
-              % selector)
-    driver.execute_script(script)
-    time.sleep(0.0181)
+    _animate_box_shadow(driver, selector, HIGHLIGHT_2_COLORS)
 
     post_messenger_success_message(driver, message, msg_dur)
 
-    script = ("""document.querySelector('%s').style =
-              'box-shadow: %s';""" % (selector, o_bs))
-    driver.execute_script(script)
+    _animate_box_shadow(
+        driver, selector, [], restore=_get_box_shadow_value(o_bs))
 
 
 def highlight_with_jquery_2(driver, message, selector, o_bs, msg_dur):
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(128, 128, 128, 0.5)');""" % selector
-    safe_execute_script(driver, script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(205, 30, 0, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(128, 0, 128, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(50, 50, 200, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
-    script = """jQuery('%s').css('box-shadow',
-        '0px 0px 6px 6px rgba(50, 205, 50, 1)');""" % selector
-    driver.execute_script(script)
-    time.sleep(0.0181)
+    _animate_box_shadow(
+        driver, selector, HIGHLIGHT_2_COLORS, use_jquery=True)
 
     post_messenger_success_message(driver, message, msg_dur)
 
-    script = """jQuery('%s').css('box-shadow', '%s');""" % (selector, o_bs)
-    driver.execute_script(script)
+    _animate_box_shadow(
+        driver, selector, [], restore=_get_box_shadow_value(o_bs),
+        use_jquery=True)
 
 
 def scroll_to_element(driver, element):
@@ -601,30 +1276,40 @@ def scroll_to_element(driver, element):
         pass  # Older versions of Firefox experienced issues here
 
 
+# Scrolls the window to the element (minus 130px) in steps of about 50px,
+# one step per animation frame, and calls back when it's done.
+SLOW_SCROLL_JS = (
+    """var element = arguments[0], frameMs = arguments[1];
+    var callback = arguments[arguments.length - 1];
+    var start = window.pageYOffset;
+    var target = Math.max(0, Math.round(
+        element.getBoundingClientRect().top + start - 130));
+    var distance = target - start;
+    var totalSteps = Math.floor(Math.abs(distance) / 50.0) + 2;
+    var schedule = function(step) { setTimeout(step, frameMs); };
+    if (window.requestAnimationFrame && !document.hidden) {
+        schedule = function(step) { window.requestAnimationFrame(step); };
+    }
+    var stepCount = 0;
+    function step() {
+        stepCount++;
+        if (distance === 0 || stepCount >= totalSteps) {
+            window.scrollTo(0, target);
+            return callback(distance);
+        }
+        window.scrollTo(0, start + distance * stepCount / totalSteps);
+        schedule(step);
+    }
+    step();""")
+
+
 def slow_scroll_to_element(driver, element, browser):
     if browser == 'ie':
         # IE breaks on slow-scrolling. Do a fast scroll instead.
         scroll_to_element(driver, element)
         return
-    scroll_position = driver.execute_script("return window.scrollY;")
-    element_location = element.location['y']
-    element_location = element_location - 130
-    if element_location < 0:
-        element_location = 0
-    distance = element_location - scroll_position
-    if distance != 0:
-        total_steps = int(abs(distance) / 50.0) + 2.0
-        step_value = float(distance) / total_steps
-        new_position = scroll_position
-        for y in range(int(total_steps)):
-            time.sleep(0.0114)
-            new_position += step_value
-            scroll_script = "window.scrollTo(0, %s);" % new_position
-            driver.execute_script(scroll_script)
-    time.sleep(0.01)
-    scroll_script = "window.scrollTo(0, %s);" % element_location
-    driver.execute_script(scroll_script)
-    time.sleep(0.01)
+    distance = execute_async_script(
+        driver, SLOW_SCROLL_JS, _get_script_timeout(0), element, 16)
     if distance > 430 or distance < -300:
         # Add small recovery time for long-distance slow-scrolling
         time.sleep(0.162)
@@ -22,7 +22,6 @@ By.PARTIAL_LINK_TEXT
 import codecs
 import os
 import sys
-import time
 import traceback
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
@@ -32,6 +31,8 @@ from selenium.webdriver.remote.errorhandler import NoAlertPresentException
 from selenium.webdriver.remote.errorhandler import NoSuchFrameException
 from selenium.webdriver.remote.errorhandler import NoSuchWindowException
 from seleniumbase.config import settings
+from seleniumbase.fixtures import js_utils
+from seleniumbase.fixtures import poll_utils
 
 
 def is_element_present(driver, selector, by=By.CSS_SELECTOR):
@@ -113,24 +114,9 @@ def hover_and_click(driver, hover_selector, click_selector,
     click_by - the method to search by (Default: By.CSS_SELECTOR)
     timeout - number of seconds to wait for click element to appear after hover
     """
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
     element = driver.find_element(by=hover_by, value=hover_selector)
-    hover = ActionChains(driver).move_to_element(element)
-    hover.perform()
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=click_by, value=click_selector)
-            element.click()
-            return element
-        except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-    raise NoSuchElementException(
-        "Element {%s} was not present after %s seconds!" %
-        (click_selector, timeout))
+    return hover_element_and_click(
+        driver, element, click_selector, click_by=click_by, timeout=timeout)
 
 
 def hover_element_and_click(driver, element, click_selector,
@@ -139,23 +125,21 @@ def hover_element_and_click(driver, element, click_selector,
     """
     Similar to hover_and_click(), but assumes top element is already found.
     """
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
     hover = ActionChains(driver).move_to_element(element)
     hover.perform()
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=click_by, value=click_selector)
-            element.click()
-            return element
-        except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-    raise NoSuchElementException(
-        "Element {%s} was not present after %s seconds!" %
-        (click_selector, timeout))
+
+    def _click_element():
+        element = driver.find_element(by=click_by, value=click_selector)
+        element.click()
+        return element
+
+    element = poll_utils.wait_until(
+        _click_element, timeout, name="hover_and_click")
+    if not element:
+        raise NoSuchElementException(
+            "Element {%s} was not present after %s seconds!" %
+            (click_selector, timeout))
+    return element
 
 
 def wait_for_element_present(driver, selector, by=By.CSS_SELECTOR,
@@ -174,26 +158,63 @@ def wait_for_element_present(driver, selector, by=By.CSS_SELECTOR,
     A web element object
     """
 
-    element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=by, value=selector)
-            return element
-        except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
+    element = poll_utils.wait_until(
+        lambda: driver.find_element(by=by, value=selector),
+        timeout, name="wait_for_element_present")
     if not element:
         raise NoSuchElementException(
             "Element {%s} was not present after %s seconds!" % (
                 selector, timeout))
+    return element
+
+
+def _get_visible_element(driver, selector, by):
+    element = driver.find_element(by=by, value=selector)
+    if element.is_displayed():
+        return element
+    return None
+
+
+def _wait_in_page(driver, selector, by, condition, timeout):
+    """
+    Runs the wait inside the browser (see js_utils.wait_for_element_in_page)
+    when the selector type allows it.
+    @Returns
+    The element (or True for "absent") if the condition was met,
+    False if the condition was still unmet when the time ran out,
+    or None if the in-page wait couldn't be used (fall back to polling).
+    """
+    timeout = poll_utils.cap_timeout(timeout)  # (If the test has a budget)
+    if by == By.CSS_SELECTOR:
+        using = "css"
+    elif by == By.XPATH:
+        using = "xpath"
+    else:
+        return None
+    try:
+        result = js_utils.wait_for_element_in_page(
+            driver, selector, using, condition, timeout)
+    except Exception:
+        # The page may have navigated away during the wait
+        return None
+    if not isinstance(result, dict) or result.get("error"):
+        return None
+    if not result.get("done"):
+        return False
+    if condition == "absent":
+        return True
+    element = result.get("element")
+    try:
+        # Confirm once that WebDriver agrees with the in-page check
+        if element and element.is_displayed():
+            return element
+    except Exception:
+        pass
+    return None
 
 
 def wait_for_element_visible(driver, selector, by=By.CSS_SELECTOR,
-                             timeout=settings.LARGE_TIMEOUT):
+                             timeout=settings.LARGE_TIMEOUT, in_page=False):
     """
     Searches for the specified element by the given selector. Returns the
     element object if the element is present and visible on the page.
@@ -204,40 +225,134 @@ def wait_for_element_visible(driver, selector, by=By.CSS_SELECTOR,
     selector - the locator that is used (required)
     by - the method to search for the locator (Default: By.CSS_SELECTOR)
     timeout - the time to wait for elements in seconds
+    in_page - if True, wait inside the browser with one WebDriver call
 
     @Returns
     A web element object
     """
 
     element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=by, value=selector)
-            if element.is_displayed():
-                return element
-            else:
-                element = None
-                raise Exception()
-        except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
+    remaining = timeout
+    if in_page:
+        start = poll_utils.monotonic()
+        element = _wait_in_page(driver, selector, by, "visible", timeout)
+        remaining = max(timeout - (poll_utils.monotonic() - start), 0)
+    if element is None:
+        element = poll_utils.wait_until(
+            lambda: _get_visible_element(driver, selector, by),
+            remaining, name="wait_for_element_visible")
+    if element:
+        return element
     plural = "s"
     if timeout == 1:
         plural = ""
-    if not element and by != By.LINK_TEXT:
+    if by != By.LINK_TEXT:
         raise ElementNotVisibleException(
             "Element {%s} was not visible after %s second%s!" % (
                 selector, timeout, plural))
-    if not element and by == By.LINK_TEXT:
+    else:
         raise ElementNotVisibleException(
             "Link text {%s} was not visible after %s second%s!" % (
                 selector, timeout, plural))
 
 
+def _get_in_page_conditions(selectors_and_bys):
+    conditions = []
+    for selector, by in selectors_and_bys:
+        if by == By.CSS_SELECTOR:
+            conditions.append(["css", selector])
+        elif by == By.XPATH:
+            conditions.append(["xpath", selector])
+        elif by == By.LINK_TEXT:
+            conditions.append(["link", selector])
+        else:
+            raise Exception(
+                'Unsupported "by" for multi-element waits: {%s}! '
+                "(Use a CSS Selector, XPath, or Link Text.)" % by)
+    return conditions
+
+
+def wait_for_any_element_visible(driver, selectors_and_bys,
+                                 timeout=settings.LARGE_TIMEOUT):
+    """
+    Waits for any one of several elements to be visible on the page.
+    All conditions are checked together with one script call per poll.
+    Raises an exception if none of the elements appear in the
+    specified timeout.
+    @Params
+    driver - the webdriver object (required)
+    selectors_and_bys - a list of (selector, by) tuples (required)
+                        ("by" can be CSS_SELECTOR, XPATH, or LINK_TEXT)
+    timeout - the time to wait for elements in seconds
+    @Returns
+    A tuple: (the index of the condition that matched, the web element)
+    """
+    conditions = _get_in_page_conditions(selectors_and_bys)
+
+    def _get_any_visible_element():
+        elements = js_utils.get_visible_elements_in_page(driver, conditions)
+        for index, element in enumerate(elements):
+            # Confirm the first in-page match with WebDriver
+            if element and element.is_displayed():
+                return (index, element)
+        return None
+
+    match = poll_utils.wait_until(
+        _get_any_visible_element, timeout,
+        name="wait_for_any_element_visible")
+    if match:
+        return match
+    plural = "s"
+    if timeout == 1:
+        plural = ""
+    raise ElementNotVisibleException(
+        "None of the elements {%s} were visible after %s second%s!" % (
+            ", ".join([c[1] for c in conditions]), timeout, plural))
+
+
+def wait_for_all_elements_visible(driver, selectors_and_bys,
+                                  timeout=settings.LARGE_TIMEOUT):
+    """
+    Waits for all of several elements to be visible on the page.
+    All conditions are checked together with one script call per poll.
+    Raises an exception if any of the elements do not appear in the
+    specified timeout.
+    @Params
+    driver - the webdriver object (required)
+    selectors_and_bys - a list of (selector, by) tuples (required)
+                        ("by" can be CSS_SELECTOR, XPATH, or LINK_TEXT)
+    timeout - the time to wait for elements in seconds
+    @Returns
+    A list of web element objects (in the same order as the selectors)
+    """
+    conditions = _get_in_page_conditions(selectors_and_bys)
+    missing = [c[1] for c in conditions]
+
+    def _get_all_visible_elements():
+        elements = js_utils.get_visible_elements_in_page(driver, conditions)
+        missing[:] = [conditions[i][1] for i, element in enumerate(elements)
+                      if not element]
+        if not missing:
+            # Confirm the in-page matches with WebDriver
+            missing[:] = [conditions[i][1] for i, element
+                          in enumerate(elements) if not element.is_displayed()]
+        if missing:
+            return None
+        return elements
+
+    elements = poll_utils.wait_until(
+        _get_all_visible_elements, timeout,
+        name="wait_for_all_elements_visible")
+    if elements:
+        return elements
+    plural = "s"
+    if timeout == 1:
+        plural = ""
+    raise ElementNotVisibleException(
+        "Elements {%s} were not visible after %s second%s!" % (
+            ", ".join(missing), timeout, plural))
+
+
 def wait_for_text_visible(driver, text, selector, by=By.CSS_SELECTOR,
                           timeout=settings.LARGE_TIMEOUT):
     """
@@ -255,29 +370,22 @@ def wait_for_text_visible(driver, text, selector, by=By.CSS_SELECTOR,
     A web element object that contains the text searched for
     """
 
-    element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=by, value=selector)
-            if element.is_displayed() and text in element.text:
-                return element
-            else:
-                element = None
-                raise Exception()
-        except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
+    def _get_element_with_text():
+        element = driver.find_element(by=by, value=selector)
+        if element.is_displayed() and text in element.text:
+            return element
+        return None
+
+    element = poll_utils.wait_until(
+        _get_element_with_text, timeout, name="wait_for_text_visible")
+    if element:
+        return element
     plural = "s"
     if timeout == 1:
         plural = ""
-    if not element:
-        raise ElementNotVisibleException(
-            "Expected text {%s} for {%s} was not visible after %s second%s!" %
-            (text, selector, timeout, plural))
+    raise ElementNotVisibleException(
+        "Expected text {%s} for {%s} was not visible after %s second%s!" %
+        (text, selector, timeout, plural))
 
 
 def wait_for_exact_text_visible(driver, text, selector, by=By.CSS_SELECTOR,
@@ -298,33 +406,27 @@ def wait_for_exact_text_visible(driver, text, selector, by=By.CSS_SELECTOR,
     A web element object that contains the text searched for
     """
 
-    element = None
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=by, value=selector)
-            if element.is_displayed() and text.strip() == element.text.strip():
-                return element
-            else:
-                element = None
-                raise Exception()
-        except Exception:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
+    def _get_element_with_exact_text():
+        element = driver.find_element(by=by, value=selector)
+        if element.is_displayed() and text.strip() == element.text.strip():
+            return element
+        return None
+
+    element = poll_utils.wait_until(
+        _get_element_with_exact_text, timeout,
+        name="wait_for_exact_text_visible")
+    if element:
+        return element
     plural = "s"
     if timeout == 1:
         plural = ""
-    if not element:
-        raise ElementNotVisibleException(
-            "Expected exact text {%s} for {%s} was not visible "
-            "after %s second%s!" % (text, selector, timeout, plural))
+    raise ElementNotVisibleException(
+        "Expected exact text {%s} for {%s} was not visible "
+        "after %s second%s!" % (text, selector, timeout, plural))
 
 
 def wait_for_element_absent(driver, selector, by=By.CSS_SELECTOR,
-                            timeout=settings.LARGE_TIMEOUT):
+                            timeout=settings.LARGE_TIMEOUT, in_page=False):
     """
     Searches for the specified element by the given selector.
     Raises an exception if the element is still present after the
@@ -334,19 +436,21 @@ def wait_for_element_absent(driver, selector, by=By.CSS_SELECTOR,
     selector - the locator that is used (required)
     by - the method to search for the locator (Default: By.CSS_SELECTOR)
     timeout - the time to wait for elements in seconds
-    """
-
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            driver.find_element(by=by, value=selector)
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-        except Exception:
-            return True
+    in_page - if True, wait inside the browser with one WebDriver call
+    """
+
+    is_absent = None
+    remaining = timeout
+    if in_page:
+        start = poll_utils.monotonic()
+        is_absent = _wait_in_page(driver, selector, by, "absent", timeout)
+        remaining = max(timeout - (poll_utils.monotonic() - start), 0)
+    if is_absent is None:
+        is_absent = poll_utils.wait_until(
+            lambda: not is_element_present(driver, selector, by),
+            remaining, name="wait_for_element_absent")
+    if is_absent:
+        return True
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -367,20 +471,10 @@ def wait_for_element_not_visible(driver, selector, by=By.CSS_SELECTOR,
     timeout - the time to wait for the element in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            element = driver.find_element(by=by, value=selector)
-            if element.is_displayed():
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
-                    break
-                time.sleep(0.1)
-            else:
-                return True
-        except Exception:
-            return True
+    if poll_utils.wait_until(
+            lambda: not is_element_visible(driver, selector, by),
+            timeout, name="wait_for_element_not_visible"):
+        return True
     plural = "s"
     if timeout == 1:
         plural = ""
@@ -502,20 +596,18 @@ def wait_for_and_switch_to_alert(driver, timeout=settings.LARGE_TIMEOUT):
     timeout - the time to wait for the alert in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            alert = driver.switch_to.alert
-            # Raises exception if no alert present
-            dummy_variable = alert.text  # noqa
-            return alert
-        except NoAlertPresentException:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-    raise Exception("Alert was not present after %s seconds!" % timeout)
+    def _switch_to_alert():
+        alert = driver.switch_to.alert
+        # Raises exception if no alert present
+        dummy_variable = alert.text  # noqa
+        return alert
+
+    alert = poll_utils.wait_until(
+        _switch_to_alert, timeout, name="wait_for_and_switch_to_alert",
+        ignored_exceptions=(NoAlertPresentException,))
+    if not alert:
+        raise Exception("Alert was not present after %s seconds!" % timeout)
+    return alert
 
 
 def switch_to_frame(driver, frame, timeout=settings.SMALL_TIMEOUT):
@@ -528,18 +620,15 @@ def switch_to_frame(driver, frame, timeout=settings.SMALL_TIMEOUT):
     timeout - the time to wait for the alert in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
-    for x in range(int(timeout * 10)):
-        try:
-            driver.switch_to.frame(frame)
-            return True
-        except NoSuchFrameException:
-            now_ms = time.time() * 1000.0
-            if now_ms >= stop_ms:
-                break
-            time.sleep(0.1)
-    raise Exception("Frame was not present after %s seconds!" % timeout)
+    def _switch_to_frame():
+        driver.switch_to.frame(frame)
+        return True
+
+    if not poll_utils.wait_until(
+            _switch_to_frame, timeout, name="switch_to_frame",
+            ignored_exceptions=(NoSuchFrameException,)):
+        raise Exception("Frame was not present after %s seconds!" % timeout)
+    return True
 
 
 def switch_to_window(driver, window, timeout=settings.SMALL_TIMEOUT):
@@ -552,29 +641,22 @@ def switch_to_window(driver, window, timeout=settings.SMALL_TIMEOUT):
     timeout - the time to wait for the window in seconds
     """
 
-    start_ms = time.time() * 1000.0
-    stop_ms = start_ms + (timeout * 1000.0)
     if isinstance(window, int):
-        for x in range(int(timeout * 10)):
-            try:
-                window_handle = driver.window_handles[window]
-                driver.switch_to.window(window_handle)
-                return True
-            except IndexError:
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
-                    break
-                time.sleep(0.1)
-        raise Exception("Window was not present after %s seconds!" % timeout)
+        ignored_exceptions = (IndexError,)
+
+        def _switch_to_window():
+            window_handle = driver.window_handles[window]
+            driver.switch_to.window(window_handle)
+            return True
     else:
-        window_handle = window
-        for x in range(int(timeout * 10)):
-            try:
-                driver.switch_to.window(window_handle)
-                return True
-            except NoSuchWindowException:
-                now_ms = time.time() * 1000.0
-                if now_ms >= stop_ms:
-                    break
-                time.sleep(0.1)
+        ignored_exceptions = (NoSuchWindowException,)
+
+        def _switch_to_window():
+            driver.switch_to.window(window)
+            return True
+
+    if not poll_utils.wait_until(
+            _switch_to_window, timeout, name="switch_to_window",
+            ignored_exceptions=ignored_exceptions):
         raise Exception("Window was not present after %s seconds!" % timeout)
+    return True
@@ -2,8 +2,11 @@
 This module contains useful utility methods.
 """
 import codecs
+import collections
 import re
 import requests
+from seleniumbase.core import link_cache
+from seleniumbase.core import link_checker
 
 
 def get_domain_url(url):
@@ -131,20 +134,57 @@ def _get_unique_links(page_url, soup):
 
 def _get_link_status_code(link, allow_redirects=False, timeout=5):
     """ Get the status code of a link.
-        If the timeout is exceeded, will return a 404.
+        If the timeout is exceeded, will return a 598. (TIMED_OUT)
+        If the connection fails, will return a 599. (CONNECTION_ERROR)
         For a list of available status codes, see:
         https://en.wikipedia.org/wiki/List_of_HTTP_status_codes
+        (Status codes are cached for a while. See link_cache.py)
     """
-    status_code = None
-    try:
-        response = requests.get(
+    status_code = link_cache.get(link, allow_redirects)
+    if status_code is link_cache.MISS:
+        status_code = link_checker.get_link_status_code(
             link, allow_redirects=allow_redirects, timeout=timeout)
-        status_code = response.status_code
-    except Exception:
-        status_code = 404
+        link_cache.put(link, allow_redirects, status_code)
     return status_code
 
 
+def _get_link_status_codes(links, allow_redirects=False, timeout=5,
+                           max_workers=None):
+    """ Get the status codes of many links at once. (See link_checker.py)
+        Links with cached status codes don't get checked again.
+        Returns an OrderedDict of {link: status_code}. """
+    status_codes = collections.OrderedDict()
+    unchecked_links = []
+    for link in links:
+        if link not in status_codes:
+            status_codes[link] = link_cache.get(link, allow_redirects)
+            if status_codes[link] is link_cache.MISS:
+                unchecked_links.append(link)
+    if unchecked_links:
+        checked = link_checker.check_links(
+            unchecked_links, allow_redirects=allow_redirects,
+            timeout=timeout, max_workers=max_workers)
+        link_cache.put_many(checked, allow_redirects=allow_redirects)
+        status_codes.update(checked)
+    return status_codes
+
+
+def _get_link_error_message(link, status_code):
+    """ Returns the error message for a broken link (a 404, a timeout, a
+        connection error, or a link that wasn't checked within the time
+        budget), or None if the link isn't broken. """
+    if status_code == 404:
+        return '"%s" returned a 404!' % link
+    elif status_code == link_checker.TIMED_OUT:
+        return '"%s" timed out!' % link
+    elif status_code == link_checker.CONNECTION_ERROR:
+        return '"%s" could not be reached!' % link
+    elif status_code == link_checker.NOT_CHECKED:
+        return ('"%s" was not checked within the time budget! '
+                '(settings.LINK_CHECK_TIME_BUDGET)' % link)
+    return None
+
+
 def _print_unique_links_with_status_codes(page_url, soup):
     """ Finds all unique links in the html of the page source
         and then prints out those links with their status codes.
@@ -153,9 +193,9 @@ def _print_unique_links_with_status_codes(page_url, soup):
         "a"->"href", "img"->"src", "link"->"href", and "script"->"src".
     """
     links = _get_unique_links(page_url, soup)
+    status_codes = _get_link_status_codes(links)
     for link in links:
-        status_code = _get_link_status_code(link)
-        print(link, " -> ", status_code)
+        print(link, " -> ", status_codes[link])
 
 
 def _download_file_to(file_url, destination_folder, new_file_name=None):
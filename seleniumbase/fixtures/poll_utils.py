@@ -0,0 +1,211 @@
+"""
+This module contains the shared polling engine used by page_actions.py
+(and other SeleniumBase helpers) for waiting on conditions.
+
+Instead of polling with a fixed 100ms sleep, polls start out tight and back
+off exponentially up to a ceiling, and all waits run against a deadline
+that is measured with a monotonic clock (when available).
+
+Usage:
+    from seleniumbase.fixtures import poll_utils
+    element = poll_utils.wait_until(
+        lambda: driver.find_element(by=by, value=selector),
+        timeout, name="wait_for_element_present")
+
+The condition is called repeatedly until it returns a truthy value (which
+gets returned) or until the timeout is reached (in which case None is
+returned, letting the caller raise its own exception message).
+
+Per-call statistics can be collected by registering a stats hook:
+    poll_utils.add_stats_hook(my_hook)  # my_hook(poll_stats) -> None
+
+When a test has a time budget (--test_budget / @pytest.mark.budget), every
+wait is capped at the time left in the budget, and the time used by each
+wait is recorded. Running out of budget raises TimeBudgetExceeded.
+"""
+
+import threading
+import time
+from seleniumbase.config import settings
+from seleniumbase.fixtures.errors import TimeBudgetExceeded
+
+try:
+    # Python 3.3+
+    monotonic = time.monotonic
+except AttributeError:
+    # Python 2.7 (No monotonic clock in the standard library)
+    monotonic = time.time
+
+_stats_hooks = []
+_stats_hooks_lock = threading.Lock()
+_budget_state = threading.local()  # The time budget of the running test
+
+
+class PollStats(object):
+    """ The statistics of a single wait_until() call.
+        (Passed to every registered stats hook after the wait finishes.) """
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.attempts = 0
+        self.elapsed = 0.0
+        self.slept = 0.0
+        self.success = False
+
+    def __repr__(self):
+        return ("PollStats(name=%s, timeout=%s, attempts=%s, "
+                "elapsed=%.3f, slept=%.3f, success=%s)" % (
+                    self.name, self.timeout, self.attempts,
+                    self.elapsed, self.slept, self.success))
+
+
+class TimeBudget(object):
+    """ The time budget of a test, with the time used by each wait. """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.start = monotonic()
+        self.steps = []  # A list of (name, seconds_used, timeout)
+
+    def get_remaining(self):
+        return self.seconds - (monotonic() - self.start)
+
+    def record_step(self, name, seconds_used, timeout):
+        self.steps.append((name, seconds_used, timeout))
+
+    def get_report_lines(self, max_steps=10):
+        """ Returns the budget summary followed by the slowest steps. """
+        used = monotonic() - self.start
+        waited = sum([step[1] for step in self.steps])
+        lines = []
+        lines.append(
+            "Time budget: %.3fs used of %.3fs (%.3fs spent in %s waits)" % (
+                used, self.seconds, waited, len(self.steps)))
+        slowest = sorted(
+            enumerate(self.steps), key=lambda x: x[1][1], reverse=True)
+        for index, (name, seconds_used, timeout) in slowest[:max_steps]:
+            lines.append("  Step %s: %-40s %8.3fs (timeout: %ss)" % (
+                index + 1, name or "(wait)", seconds_used, timeout))
+        return lines
+
+
+def start_test_budget(seconds):
+    """ Starts the time budget for the test running in this thread. """
+    _budget_state.budget = TimeBudget(seconds)
+    return _budget_state.budget
+
+
+def stop_test_budget():
+    """ Stops the current time budget and returns it (or None). """
+    budget = getattr(_budget_state, "budget", None)
+    _budget_state.budget = None
+    return budget
+
+
+def get_test_budget():
+    return getattr(_budget_state, "budget", None)
+
+
+def cap_timeout(timeout):
+    """ Returns the timeout, capped at the time left in the test budget. """
+    budget = getattr(_budget_state, "budget", None)
+    if budget is None:
+        return timeout
+    return max(min(timeout, budget.get_remaining()), 0)
+
+
+def add_stats_hook(hook):
+    """ Registers a hook that receives a PollStats object per wait. """
+    with _stats_hooks_lock:
+        if hook not in _stats_hooks:
+            _stats_hooks.append(hook)
+
+
+def remove_stats_hook(hook):
+    with _stats_hooks_lock:
+        if hook in _stats_hooks:
+            _stats_hooks.remove(hook)
+
+
+def _report_stats(poll_stats):
+    with _stats_hooks_lock:
+        hooks = list(_stats_hooks)
+    for hook in hooks:
+        try:
+            hook(poll_stats)
+        except Exception:
+            pass  # Stats hooks should never break a wait
+
+
+def get_poll_intervals(min_interval=None, max_interval=None, backoff=None):
+    """ Yields sleep intervals: tight at first, then backing off
+        exponentially until the ceiling is reached. """
+    if min_interval is None:
+        min_interval = settings.POLL_MIN_INTERVAL
+    if max_interval is None:
+        max_interval = settings.POLL_MAX_INTERVAL
+    if backoff is None:
+        backoff = settings.POLL_BACKOFF
+    if backoff < 1:
+        backoff = 1
+    interval = min(min_interval, max_interval)
+    while True:
+        yield interval
+        interval = min(interval * backoff, max_interval)
+
+
+def wait_until(condition, timeout, name=None,
+               ignored_exceptions=(Exception,), min_interval=None,
+               max_interval=None, backoff=None):
+    """
+    Calls the condition until it returns a truthy value, which is returned.
+    If the deadline is reached first, None is returned.
+    The condition is always called at least once, even if timeout is 0.
+    If the test has a time budget, the timeout is capped at the time left,
+    and TimeBudgetExceeded is raised if the budget runs out while waiting.
+    @Params
+    condition - a function with no arguments (required)
+    timeout - the time to wait in seconds (required)
+    name - the name of the wait (for stats hooks)
+    ignored_exceptions - exceptions that count as "not yet" (Default: all)
+    min_interval - the first sleep interval in seconds
+    max_interval - the ceiling for sleep intervals in seconds
+    backoff - the multiplier applied to the interval after each poll
+    """
+    poll_stats = PollStats(name, timeout)
+    budget = getattr(_budget_state, "budget", None)
+    start = monotonic()
+    deadline = start + timeout
+    if budget is not None:
+        deadline = min(deadline, start + max(budget.get_remaining(), 0))
+    intervals = get_poll_intervals(min_interval, max_interval, backoff)
+    result = None
+    try:
+        while True:
+            poll_stats.attempts += 1
+            try:
+                result = condition()
+            except ignored_exceptions:
+                result = None
+            if result:
+                poll_stats.success = True
+                return result
+            now = monotonic()
+            if now >= deadline:
+                if budget is not None and budget.get_remaining() <= 0:
+                    raise TimeBudgetExceeded(
+                        "Test ran out of its %s second time budget while "
+                        "waiting {%s}!\n%s" % (
+                            budget.seconds, name or "(wait)",
+                            "\n".join(budget.get_report_lines())))
+                return None
+            sleep_time = min(next(intervals), deadline - now)
+            time.sleep(sleep_time)
+            poll_stats.slept += sleep_time
+    finally:
+        poll_stats.elapsed = monotonic() - start
+        if budget is not None:
+            budget.record_step(name, poll_stats.elapsed, timeout)
+        if _stats_hooks:
+            _report_stats(poll_stats)
@@ -0,0 +1,97 @@
+"""
+This module resolves raw selector strings for base_case.py.
+
+Test suites reuse the same few hundred selectors over and over, so the
+selector type detection (CSS / XPath / Link Text), the XPath-to-CSS
+conversion, and the JavaScript escaping are all done once per selector
+and then kept in a bounded LRU cache.
+
+Usage:
+    descriptor = selector_utils.resolve_selector("link=Home", By.CSS_SELECTOR)
+    descriptor.selector  # => "Home"
+    descriptor.by  # => By.LINK_TEXT
+    css = selector_utils.convert_to_css_selector(
+        descriptor.selector, descriptor.by)  # => 'a:contains("Home")'
+    js_css = selector_utils.escape_selector_for_js(css)  # (For JS strings)
+"""
+
+import re
+from selenium.webdriver.common.by import By
+from seleniumbase.common import decorators
+from seleniumbase.config import settings
+from seleniumbase.fixtures import js_utils
+from seleniumbase.fixtures import page_utils
+from seleniumbase.fixtures import xpath_to_css
+
+
+class SelectorDescriptor(object):
+    """ A pre-parsed selector. (The selector type has been determined.) """
+
+    __slots__ = ("raw_selector", "selector", "by")
+
+    def __init__(self, raw_selector, selector, by):
+        self.raw_selector = raw_selector
+        self.selector = selector
+        self.by = by
+
+    def __repr__(self):
+        return "SelectorDescriptor(selector=%s, by=%s)" % (
+            self.selector, self.by)
+
+
+@decorators.memoized(max_size=settings.SELECTOR_CACHE_MAX_SIZE)
+def resolve_selector(selector, by=By.CSS_SELECTOR):
+    """ Determines the selector type automatically (XPath and Link Text
+        selectors are recognized from the selector string itself).
+        Returns a SelectorDescriptor. """
+    raw_selector = selector
+    if page_utils.is_xpath_selector(selector):
+        by = By.XPATH
+    if page_utils.is_link_text_selector(selector):
+        selector = page_utils.get_link_text_from_selector(selector)
+        by = By.LINK_TEXT
+    return SelectorDescriptor(raw_selector, selector, by)
+
+
+@decorators.memoized(max_size=settings.SELECTOR_CACHE_MAX_SIZE)
+def convert_to_css_selector(selector, by):
+    """ This method converts a selector to a CSS_SELECTOR.
+        jQuery commands require a CSS_SELECTOR for finding elements.
+        This method should only be used for jQuery/JavaScript actions.
+        Pure JavaScript doesn't support using a:contains("LINK_TEXT"). """
+    if by == By.CSS_SELECTOR:
+        return selector
+    elif by == By.ID:
+        return '#%s' % selector
+    elif by == By.CLASS_NAME:
+        return '.%s' % selector
+    elif by == By.NAME:
+        return '[name="%s"]' % selector
+    elif by == By.TAG_NAME:
+        return selector
+    elif by == By.XPATH:
+        return xpath_to_css.convert_xpath_to_css(selector)
+    elif by == By.LINK_TEXT:
+        return 'a:contains("%s")' % selector
+    elif by == By.PARTIAL_LINK_TEXT:
+        return 'a:contains("%s")' % selector
+    else:
+        raise Exception(
+            "Exception: Could not convert {%s}(by=%s) to CSS_SELECTOR!" % (
+                selector, by))
+
+
+@decorators.memoized(max_size=settings.SELECTOR_CACHE_MAX_SIZE)
+def escape_selector_for_js(css_selector):
+    """ Escapes a CSS Selector for use inside a quoted JavaScript string. """
+    css_selector = re.escape(css_selector)
+    return js_utils.escape_quotes_if_needed(css_selector)
+
+
+def get_cache_info():
+    """ Returns the hit/miss counters of the selector caches. """
+    return {
+        "resolve_selector": resolve_selector.cache_info(),
+        "convert_to_css_selector": convert_to_css_selector.cache_info(),
+        "escape_selector_for_js": escape_selector_for_js.cache_info(),
+    }
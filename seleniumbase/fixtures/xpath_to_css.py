@@ -1,8 +1,23 @@
 """
 Convert XPath selectors into CSS selectors
+
+XPaths are first tokenized and compiled into CSS by a small parser, which
+handles multiple predicates, text(), contains(), starts-with(), ends-with(),
+not(), last(), and "!=" comparisons. (Simple XPaths, with only tags,
+attribute matches, and positions, are converted directly by a regex.)
+If that fails, the original regex-based converter is used as a fallback.
+Results are cached, since test suites convert the same selectors over and
+over.
+
+Differences from the original converter's output (all intended):
+    text()="x" and .="x" become :contains("x") (No exact text match in CSS)
+    Attribute values and :contains() text are always quoted
+    IDs that aren't CSS identifiers (Ex: "a b") become [id="..."]
+(The XPath-to-CSS benchmark checks that there are no other differences.)
 """
 
 import re
+from seleniumbase.common import decorators
 
 _sub_regexes = {
     "tag": r"([a-zA-Z][a-zA-Z0-9]{0,10}|\*)",
@@ -127,7 +142,8 @@ def _get_raw_css_from_xpath(xpath):
         return css
 
 
-def convert_xpath_to_css(xpath):
+def _legacy_convert_xpath_to_css(xpath):
+    """ The original regex-based converter. (Used as a fallback) """
     if xpath[0] != '"' and xpath[-1] != '"' and xpath.count('"') % 2 == 0:
         xpath = _handle_brackets_in_strings(xpath)
 
@@ -152,3 +168,269 @@ def convert_xpath_to_css(xpath):
     css = css.replace('_STR_R_bracket_', '\\]')
 
     return css
+
+
+_token_pattern = (
+    r"\"[^\"]*\"|'[^']*'"  # Strings
+    r"|\d+(?![\w.])"  # Numbers
+    r"|//|/|\[|\]|\(|\)|@|!=|=|,|::|\.\.|\.|\*"  # Operators
+    r"|[a-zA-Z_][-\w]*")  # Names
+_token_re = re.compile(r"(\s*(?:%s)\s*)" % _token_pattern)
+_compact_token_re = re.compile(_token_pattern)  # (No whitespace to strip)
+
+_css_identifier_re = re.compile(r"^-?[_a-zA-Z][_a-zA-Z0-9-]*$")
+
+# The most common kind of XPath (Ex: "//ul[@id='menu']/li[2]/a") only has
+# steps with a tag, an optional attribute match, and an optional position.
+# Those get converted directly, without tokenizing and parsing.
+_simple_step_re = re.compile(
+    r"(//?)([a-zA-Z_][-\w]*|\*)"
+    r"(?:\[@([a-zA-Z_][-\w]*)=(?:\"([^\"]*)\"|'([^']*)')\])?"
+    r"(?:\[(\d+)\])?")
+_simple_xpath_re = re.compile(r"(?:%s)+\Z" % _simple_step_re.pattern)
+
+_attribute_function_operators = {
+    "contains": "*=",
+    "starts-with": "^=",
+    "ends-with": "$=",
+}
+
+
+def _tokenize_xpath(xpath):
+    """ Splits an XPath into tokens. The kind of each token can be told
+        from its first character. (Quote: string, digit: number,
+        letter or underscore: name, anything else: operator) """
+    tokens = _compact_token_re.findall(xpath)
+    if "".join(tokens) == xpath:
+        return tokens  # (The usual case, with no whitespace between tokens)
+    tokens = _token_re.findall(xpath)
+    if "".join(tokens) != xpath:
+        # Some characters didn't belong to any token
+        raise XpathException("Invalid or unsupported Xpath: %s" % xpath)
+    return [token.strip() for token in tokens]
+
+
+def _is_string(token):
+    return token[:1] in ('"', "'")
+
+
+def _quote_css_value(value):
+    if '"' in value:
+        return "'%s'" % value
+    return '"%s"' % value
+
+
+def _get_id_css(value):
+    if _css_identifier_re.match(value):
+        return "#%s" % value
+    return "[id=%s]" % _quote_css_value(value)
+
+
+def _get_attribute_css(attribute, value):
+    if attribute == "id":
+        return _get_id_css(value)
+    if attribute == "class":
+        classes = value.split()
+        if classes and all(
+                [_css_identifier_re.match(name) for name in classes]):
+            return "." + ".".join(classes)
+    return "[%s=%s]" % (attribute, _quote_css_value(value))
+
+
+class _XpathCompiler(object):
+    """ Compiles the tokens of an XPath into an equivalent CSS Selector.
+        Raises XpathException for anything CSS can't express. """
+
+    def __init__(self, xpath):
+        self.xpath = xpath
+        self.tokens = _tokenize_xpath(xpath)
+        # End markers (Two, so that peek(1) never goes past the end, since
+        # next() never moves past the first one)
+        self.tokens.extend((None, None))
+        self.position = 0
+
+    def fail(self):
+        raise XpathException("Invalid or unsupported Xpath: %s" % self.xpath)
+
+    def peek(self, offset=0):
+        return self.tokens[self.position + offset]
+
+    def next(self):
+        token = self.tokens[self.position]
+        if token is None:
+            self.fail()
+        self.position += 1
+        return token
+
+    def expect(self, value):
+        if self.next() != value:
+            self.fail()
+
+    def expect_string(self):
+        """ Returns the value of the next token, which must be a string. """
+        token = self.next()
+        if not _is_string(token):
+            self.fail()
+        return token[1:-1]
+
+    def accept(self, value):
+        if self.tokens[self.position] == value:
+            self.position += 1
+            return True
+        return False
+
+    def compile(self):
+        steps = self.parse_path()
+        if self.peek() is not None:
+            self.fail()
+        css = ""
+        for nav, step_css in steps:
+            if css:
+                css += " > " if nav == "/" else " "
+            css += step_css
+        return css
+
+    def parse_path(self):
+        if self.accept("("):
+            # Grouping, Ex: "(//button[@type='submit'])[1]"
+            # (Like the original converter, the position is applied to the
+            # last step, which is the best that CSS can do.)
+            steps = self.parse_path()
+            self.expect(")")
+            while self.accept("["):
+                nth = self.next()
+                if not nth.isdigit():
+                    self.fail()
+                self.expect("]")
+                nav, step_css = steps[-1]
+                steps[-1] = (nav, step_css + ":nth-of-type(%s)" % nth)
+            return steps
+        steps = []
+        if self.peek() == "id" and self.peek(1) == "(":
+            self.position += 2
+            value = self.expect_string()
+            self.expect(")")
+            steps.append(("", _get_id_css(value)))
+        else:
+            self.accept(".")  # A relative XPath, Ex: ".//div"
+        while self.peek() in ("/", "//"):
+            nav = self.next()
+            steps.append((nav, self.parse_step()))
+        if not steps:
+            self.fail()
+        return steps
+
+    def parse_step(self):
+        token = self.next()
+        if token == "*":
+            tag = ""
+        elif (token[0].isalpha() or token[0] == "_") and (
+                self.peek() not in ("(", "::")):
+            tag = token
+        else:
+            self.fail()  # Axes, functions, and ".." have no CSS equivalent
+        css = ""
+        nth = ""
+        while self.accept("["):
+            token = self.peek()
+            if token and token.isdigit() and self.peek(1) == "]":
+                nth = ":nth-of-type(%s)" % token
+                self.position += 1
+            elif token == "last" and self.peek(1) == "(":
+                self.position += 2
+                self.expect(")")
+                nth = ":last-of-type"
+            else:
+                css += self.parse_condition()
+                while self.accept("and"):
+                    css += self.parse_condition()
+            self.expect("]")
+        if not tag and not css and not nth:
+            tag = "*"
+        return tag + css + nth
+
+    def parse_condition(self):
+        token = self.next()
+        if token == "@":
+            attribute = self.next()
+            if not attribute[0].isalpha() and attribute[0] != "_":
+                self.fail()
+            if self.accept("="):
+                return _get_attribute_css(attribute, self.expect_string())
+            elif self.accept("!="):
+                return ":not([%s=%s])" % (
+                    attribute, _quote_css_value(self.expect_string()))
+            return "[%s]" % attribute
+        elif token == ".":
+            self.expect("=")
+            return ":contains(%s)" % _quote_css_value(self.expect_string())
+        elif self.accept("("):
+            if token == "text":
+                self.expect(")")
+                self.expect("=")
+                return ":contains(%s)" % _quote_css_value(
+                    self.expect_string())
+            elif token == "not":
+                css = self.parse_condition()
+                self.expect(")")
+                if css.startswith(":"):
+                    self.fail()
+                return ":not(%s)" % css
+            elif token in _attribute_function_operators:
+                return self.parse_attribute_function(token)
+        self.fail()
+
+    def parse_attribute_function(self, function):
+        if self.accept("@"):
+            attribute = self.next()
+        elif self.accept("text"):
+            self.expect("(")
+            self.expect(")")
+            attribute = None
+        elif self.accept("."):
+            attribute = None
+        else:
+            self.fail()
+        self.expect(",")
+        value = self.expect_string()
+        self.expect(")")
+        if attribute is None:
+            if function != "contains":
+                self.fail()  # CSS can only search text with :contains()
+            return ":contains(%s)" % _quote_css_value(value)
+        return "[%s%s%s]" % (
+            attribute, _attribute_function_operators[function],
+            _quote_css_value(value))
+
+
+def _convert_simple_xpath(xpath):
+    """ Converts an XPath that matches _simple_xpath_re. (Gives the same
+        CSS Selector as _XpathCompiler, in a fraction of the time.) """
+    css = ""
+    for nav, tag, attribute, value, value_2, nth in (
+            _simple_step_re.findall(xpath)):
+        if css:
+            css += " > " if nav == "/" else " "
+        if tag == "*":
+            tag = ""
+        if attribute:
+            tag += _get_attribute_css(attribute, value or value_2)
+        if nth:
+            tag += ":nth-of-type(%s)" % nth
+        css += tag or "*"
+    return css
+
+
+def compile_xpath_to_css(xpath):
+    """ Compiles an XPath into a CSS Selector. (Raises XpathException) """
+    if _simple_xpath_re.match(xpath):
+        return _convert_simple_xpath(xpath)
+    return _XpathCompiler(xpath).compile()
+
+
+@decorators.memoized(max_size=2048)
+def convert_xpath_to_css(xpath):
+    try:
+        return compile_xpath_to_css(xpath)
+    except XpathException:
+        return _legacy_convert_xpath_to_css(xpath)
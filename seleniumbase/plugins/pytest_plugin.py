@@ -2,9 +2,18 @@
 """ This is the pytest configuration file """
 
 import optparse
+import os
 import pytest
 from seleniumbase import config as sb_config
+from seleniumbase.config import settings
+from seleniumbase.core import driver_pool
+from seleniumbase.core import driver_reaper
+from seleniumbase.core import driver_recycler
+from seleniumbase.core import launch_profiler
+from seleniumbase.core import lean_mode_helper
+from seleniumbase.core import link_cache
 from seleniumbase.core import log_helper
+from seleniumbase.core import process_tracker
 from seleniumbase.core import proxy_helper
 from seleniumbase.fixtures import constants
 
@@ -155,7 +164,19 @@ def pytest_addoption(parser):
                      dest='ad_block_on',
                      default=False,
                      help="""Using this makes WebDriver block display ads
-                          that are defined in ad_block_list.AD_BLOCK_LIST.""")
+                          that are defined in ad_block_list.AD_BLOCK_LIST.
+                          (Requests to the ad hosts in AD_HOST_BLOCK_LIST
+                          are also blocked by Chrome and Firefox.)""")
+    parser.addoption('--block_resources', action='store',
+                     dest='block_resources',
+                     default=None,
+                     help="""Using this makes the browser skip downloading
+                          the given resource types, which speeds up page
+                          loads. Format: a comma-separated list of types.
+                          Options: images, fonts, media.
+                          (Chrome and Firefox only. Headless Chrome only
+                          blocks images. Firefox only stops media from
+                          autoplaying, without blocking downloads.)""")
     parser.addoption('--verify_delay', action='store', dest='verify_delay',
                      default=None,
                      help="""Setting this overrides the default wait time
@@ -187,6 +208,74 @@ def pytest_addoption(parser):
                      help="""Setting this overrides the default timeout
                           by the multiplier when waiting for page elements.
                           Unused when tests overide the default value.""")
+    parser.addoption('--lean', action='store_true',
+                     dest='lean_mode',
+                     default=False,
+                     help="""Using this replaces the short hard-coded sleeps
+                          after actions (clicks, typing, highlights, etc.)
+                          with waiting for the DOM to settle, which only
+                          waits while the page is still changing.
+                          A report of the time saved per test is printed
+                          at the end of the run.""")
+    parser.addoption('--test_budget', action='store',
+                     dest='test_budget',
+                     default=None,
+                     help="""The maximum time (in seconds) for each test.
+                          Every wait is capped at the time left in the
+                          test's budget, so slow tests fail fast.
+                          (Override per test: @pytest.mark.budget(SECS))""")
+    parser.addoption('--reuse_session', action='store_true',
+                     dest='reuse_session',
+                     default=False,
+                     help="""Using this keeps browsers running between tests.
+                          Each test gets a browser from a pool (matched by
+                          the launch options), which gets reset (cookies,
+                          storage, extra windows) when the test is done.""")
+    parser.addoption('--prelaunch', action='store_true',
+                     dest='prelaunch',
+                     default=False,
+                     help="""Using this launches the next test's browser in
+                          the background while the current test runs.
+                          The next test uses it if the launch options
+                          match. (Otherwise it launches a new one.)
+                          A report of the setUp() time saved is printed
+                          at the end of the run.""")
+    parser.addoption('--profile_launch', action='store_true',
+                     dest='profile_launch',
+                     default=False,
+                     help="""Using this records how long each phase of
+                          launching browsers takes (options, driver start,
+                          window sizing, etc.) to a JSON lines file in the
+                          log folder. A summary per browser type is printed
+                          at the end of the run.""")
+    parser.addoption('--warm_cache_profile', action='store',
+                     dest='warm_cache_profile',
+                     default=None,
+                     help="""Using this seeds each new Chrome/Firefox browser
+                          with a copy of the HTTP cache that was saved in
+                          the given folder by "seleniumbase warm-cache".
+                          (Cookies and Web Storage still start clean.)""")
+    parser.addoption('--max_driver_rss', action='store',
+                     dest='max_driver_rss',
+                     default=settings.RECYCLE_DRIVER_MAX_RSS_MB,
+                     help="""Using this replaces browsers at safe points
+                          (between tests or on page loads) once the memory
+                          use of the browser processes reaches this many
+                          MB. (Requires psutil.)""")
+    parser.addoption('--max_driver_commands', action='store',
+                     dest='max_driver_commands',
+                     default=settings.RECYCLE_DRIVER_MAX_COMMANDS,
+                     help="""Using this replaces browsers at safe points
+                          (between tests or on page loads) once they have
+                          been sent this many WebDriver commands.""")
+    parser.addoption('--link_cache_db', action='store',
+                     dest='link_cache_db',
+                     default=None,
+                     help="""Using this shares the cache of link status codes
+                          (from assert_no_404_errors(), etc.) between test
+                          processes (Ex: pytest -n 4) and later test runs,
+                          with the given SQLite file. (Entries expire
+                          after settings.LINK_CACHE_TTL seconds.)""")
 
 
 def pytest_configure(config):
@@ -217,16 +306,65 @@ def pytest_configure(config):
     sb_config.message_duration = config.getoption('message_duration')
     sb_config.js_checking_on = config.getoption('js_checking_on')
     sb_config.ad_block_on = config.getoption('ad_block_on')
+    sb_config.block_resources = config.getoption('block_resources')
     sb_config.verify_delay = config.getoption('verify_delay')
     sb_config.disable_csp = config.getoption('disable_csp')
     sb_config.save_screenshot = config.getoption('save_screenshot')
     sb_config.visual_baseline = config.getoption('visual_baseline')
     sb_config.timeout_multiplier = config.getoption('timeout_multiplier')
+    sb_config.lean_mode = config.getoption('lean_mode')
+    sb_config.test_budget = config.getoption('test_budget')
+    sb_config.marked_test_budget = None
+    sb_config.reuse_session = config.getoption('reuse_session')
+    sb_config.prelaunch = config.getoption('prelaunch')
+    sb_config.profile_launch = config.getoption('profile_launch')
+    sb_config.warm_cache_profile = config.getoption('warm_cache_profile')
+    sb_config.max_driver_rss = config.getoption('max_driver_rss')
+    sb_config.max_driver_commands = config.getoption('max_driver_commands')
+    sb_config.link_cache_db = config.getoption('link_cache_db')
     sb_config.pytest_html_report = config.getoption("htmlpath")  # --html=FILE
 
     if sb_config.with_testing_base:
         log_helper.log_folder_setup(sb_config.log_path, sb_config.archive_logs)
     proxy_helper.remove_proxy_zip_if_present()
+    # Only the main process clears shared files (pytest-xdist workers share)
+    is_xdist_worker = hasattr(config, "workerinput") or (
+        hasattr(config, "slaveinput"))
+    if sb_config.lean_mode:
+        lean_mode_helper.enable(
+            os.path.join(sb_config.log_path, settings.LEAN_MODE_REPORT_FILE),
+            reset=not is_xdist_worker)
+    if sb_config.profile_launch:
+        launch_profiler.enable(
+            os.path.join(sb_config.log_path, settings.LAUNCH_PROFILE_FILE),
+            reset=not is_xdist_worker)
+    driver_recycler.enable(
+        sb_config.max_driver_rss, sb_config.max_driver_commands,
+        os.path.join(sb_config.log_path, settings.DRIVER_RECYCLE_LOG),
+        reset=not is_xdist_worker)
+    # (Also kills processes left running by earlier test runs that crashed)
+    process_tracker.enable(
+        os.path.join(sb_config.log_path, settings.PROCESS_REAPER_LOG),
+        reset=not is_xdist_worker)
+    link_cache.enable(
+        sb_config.link_cache_db,
+        os.path.join(sb_config.log_path, settings.LINK_CACHE_STATS_FILE),
+        reset=not is_xdist_worker)
+    config.addinivalue_line(
+        "markers", "budget(seconds): the time budget for the test. "
+                   "(Overrides --test_budget)")
+
+
+def pytest_sessionfinish(session):
+    """ This runs after all tests have completed (before the reports). """
+    driver_pool.quit_all_drivers()
+    if sb_config.prelaunch:
+        from seleniumbase.core import browser_launcher
+        browser_launcher.quit_prelaunched_driver()
+    # (Before the reports, so that the leaked processes get reported)
+    driver_reaper.drain()
+    process_tracker.reap_all_process_trees()
+    link_cache.save_stats()
 
 
 def pytest_unconfigure():
@@ -234,9 +372,50 @@ def pytest_unconfigure():
     proxy_helper.remove_proxy_zip_if_present()
 
 
-def pytest_runtest_setup():
+def pytest_terminal_summary(terminalreporter):
+    """ This runs after all tests have completed, to add extra reports. """
+    if sb_config.lean_mode:
+        report_lines = lean_mode_helper.get_report_lines()
+        if report_lines:
+            terminalreporter.write_sep("=", "Lean Mode: Time Saved")
+            for line in report_lines:
+                terminalreporter.write_line(line)
+    if sb_config.profile_launch:
+        report_lines = launch_profiler.get_report_lines()
+        if report_lines:
+            terminalreporter.write_sep("=", "Browser Launch Profile")
+            for line in report_lines:
+                terminalreporter.write_line(line)
+    if sb_config.prelaunch:
+        from seleniumbase.core import browser_launcher
+        report_lines = browser_launcher.get_prelaunch_report_lines()
+        if report_lines:
+            terminalreporter.write_sep("=", "Pre-launched Browsers")
+            for line in report_lines:
+                terminalreporter.write_line(line)
+    report_lines = driver_recycler.get_report_lines()
+    if report_lines:
+        terminalreporter.write_sep("=", "Recycled Browsers")
+        for line in report_lines:
+            terminalreporter.write_line(line)
+    report_lines = process_tracker.get_report_lines()
+    if report_lines:
+        terminalreporter.write_sep("=", "Leaked Browser Processes")
+        for line in report_lines:
+            terminalreporter.write_line(line)
+    report_lines = link_cache.get_report_lines()
+    if report_lines:
+        terminalreporter.write_sep("=", "Link Status Cache")
+        for line in report_lines:
+            terminalreporter.write_line(line)
+
+
+def pytest_runtest_setup(item):
     """ This runs before every test with pytest """
-    pass
+    sb_config.marked_test_budget = None
+    marker = item.get_closest_marker("budget")
+    if marker and marker.args:
+        sb_config.marked_test_budget = marker.args[0]
 
 
 def pytest_runtest_teardown(item):
@@ -245,11 +424,8 @@ def pytest_runtest_teardown(item):
     # Make sure webdriver has exited properly and any headless display
     try:
         self = item._testcase
-        try:
-            if hasattr(self, 'driver') and self.driver:
-                self.driver.quit()
-        except Exception:
-            pass
+        if hasattr(self, 'driver') and self.driver:
+            driver_reaper.quit_driver_async(self.driver)
         try:
             if hasattr(self, 'headless') and self.headless:
                 if self.headless_active:
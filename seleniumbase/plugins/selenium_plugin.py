@@ -3,8 +3,17 @@ This plugin gives the power of Selenium to nosetests
 by providing a WebDriver object for the tests to use.
 """
 
+import os
 from nose.plugins import Plugin
 from pyvirtualdisplay import Display
+from seleniumbase.config import settings
+from seleniumbase.core import driver_pool
+from seleniumbase.core import driver_reaper
+from seleniumbase.core import driver_recycler
+from seleniumbase.core import launch_profiler
+from seleniumbase.core import lean_mode_helper
+from seleniumbase.core import link_cache
+from seleniumbase.core import process_tracker
 from seleniumbase.core import proxy_helper
 from seleniumbase.fixtures import constants
 
@@ -27,11 +36,21 @@ class SeleniumBrowser(Plugin):
     self.options.message_duration -- Messenger alert time (--message_duration)
     self.options.js_checking_on -- option to check for js errors (--check_js)
     self.options.ad_block -- the option to block some display ads (--ad_block)
+    self.options.block_resources -- resource types to skip (--block_resources)
     self.options.verify_delay -- delay before MasterQA checks (--verify_delay)
     self.options.disable_csp -- disable Content Security Policy (--disable_csp)
     self.options.save_screenshot -- save screen after test (--save_screenshot)
     self.options.visual_baseline -- set the visual baseline (--visual_baseline)
     self.options.timeout_multiplier -- increase defaults (--timeout_multiplier)
+    self.options.lean_mode -- settle the DOM instead of sleeping (--lean)
+    self.options.test_budget -- the max time for each test (--test_budget)
+    self.options.reuse_session -- keep browsers between tests (--reuse_session)
+    self.options.prelaunch -- launch the next browser early (--prelaunch)
+    self.options.profile_launch -- time browser launches (--profile_launch)
+    self.options.warm_cache_profile -- use a warm cache (--warm_cache_profile)
+    self.options.max_driver_rss -- recycle big browsers (--max_driver_rss)
+    self.options.max_driver_commands -- recycle (--max_driver_commands)
+    self.options.link_cache_db -- the shared link cache (--link_cache_db)
     """
     name = 'selenium'  # Usage: --with-selenium
 
@@ -123,7 +142,20 @@ class SeleniumBrowser(Plugin):
             dest='ad_block_on',
             default=False,
             help="""Using this makes WebDriver block display ads
-                    that are defined in ad_block_list.AD_BLOCK_LIST.""")
+                    that are defined in ad_block_list.AD_BLOCK_LIST.
+                    (Requests to the ad hosts in AD_HOST_BLOCK_LIST
+                    are also blocked by Chrome and Firefox.)""")
+        parser.add_option(
+            '--block_resources', action='store',
+            dest='block_resources',
+            default=None,
+            help="""Using this makes the browser skip downloading
+                    the given resource types, which speeds up page
+                    loads. Format: a comma-separated list of types.
+                    Options: images, fonts, media.
+                    (Chrome and Firefox only. Headless Chrome only
+                    blocks images. Firefox only stops media from
+                    autoplaying, without blocking downloads.)""")
         parser.add_option(
             '--verify_delay', action='store',
             dest='verify_delay', default=None,
@@ -160,6 +192,82 @@ class SeleniumBrowser(Plugin):
             help="""Setting this overrides the default timeout
                     by the multiplier when waiting for page elements.
                     Unused when tests overide the default value.""")
+        parser.add_option(
+            '--lean', action='store_true',
+            dest='lean_mode',
+            default=False,
+            help="""Using this replaces the short hard-coded sleeps
+                    after actions (clicks, typing, highlights, etc.)
+                    with waiting for the DOM to settle, which only
+                    waits while the page is still changing.
+                    A report of the time saved per test is printed
+                    at the end of the run.""")
+        parser.add_option(
+            '--test_budget', action='store',
+            dest='test_budget',
+            default=None,
+            help="""The maximum time (in seconds) for each test.
+                    Every wait is capped at the time left in the
+                    test's budget, so slow tests fail fast.""")
+        parser.add_option(
+            '--reuse_session', action='store_true',
+            dest='reuse_session',
+            default=False,
+            help="""Using this keeps browsers running between tests.
+                    Each test gets a browser from a pool (matched by
+                    the launch options), which gets reset (cookies,
+                    storage, extra windows) when the test is done.""")
+        parser.add_option(
+            '--prelaunch', action='store_true',
+            dest='prelaunch',
+            default=False,
+            help="""Using this launches the next test's browser in
+                    the background while the current test runs.
+                    The next test uses it if the launch options
+                    match. (Otherwise it launches a new one.)
+                    A report of the setUp() time saved is printed
+                    at the end of the run.""")
+        parser.add_option(
+            '--profile_launch', action='store_true',
+            dest='profile_launch',
+            default=False,
+            help="""Using this records how long each phase of
+                    launching browsers takes (options, driver start,
+                    window sizing, etc.) to a JSON lines file in the
+                    log folder. A summary per browser type is printed
+                    at the end of the run.""")
+        parser.add_option(
+            '--warm_cache_profile', action='store',
+            dest='warm_cache_profile',
+            default=None,
+            help="""Using this seeds each new Chrome/Firefox browser
+                    with a copy of the HTTP cache that was saved in
+                    the given folder by "seleniumbase warm-cache".
+                    (Cookies and Web Storage still start clean.)""")
+        parser.add_option(
+            '--max_driver_rss', action='store',
+            dest='max_driver_rss',
+            default=settings.RECYCLE_DRIVER_MAX_RSS_MB,
+            help="""Using this replaces browsers at safe points
+                    (between tests or on page loads) once the memory
+                    use of the browser processes reaches this many
+                    MB. (Requires psutil.)""")
+        parser.add_option(
+            '--max_driver_commands', action='store',
+            dest='max_driver_commands',
+            default=settings.RECYCLE_DRIVER_MAX_COMMANDS,
+            help="""Using this replaces browsers at safe points
+                    (between tests or on page loads) once they have
+                    been sent this many WebDriver commands.""")
+        parser.add_option(
+            '--link_cache_db', action='store',
+            dest='link_cache_db',
+            default=None,
+            help="""Using this shares the cache of link status codes
+                    (from assert_no_404_errors(), etc.) between test
+                    processes (Ex: pytest -n 4) and later test runs,
+                    with the given SQLite file. (Entries expire
+                    after settings.LINK_CACHE_TTL seconds.)""")
 
     def configure(self, options, conf):
         super(SeleniumBrowser, self).configure(options, conf)
@@ -167,6 +275,21 @@ class SeleniumBrowser(Plugin):
         self.options = options
         self.headless_active = False  # Default setting
         proxy_helper.remove_proxy_zip_if_present()
+        if options.lean_mode:
+            lean_mode_helper.enable(
+                os.path.join("latest_logs", settings.LEAN_MODE_REPORT_FILE))
+        if options.profile_launch:
+            launch_profiler.enable(
+                os.path.join("latest_logs", settings.LAUNCH_PROFILE_FILE))
+        driver_recycler.enable(
+            options.max_driver_rss, options.max_driver_commands,
+            os.path.join("latest_logs", settings.DRIVER_RECYCLE_LOG))
+        # (Also kills processes left running by earlier test runs that crashed)
+        process_tracker.enable(
+            os.path.join("latest_logs", settings.PROCESS_REAPER_LOG))
+        link_cache.enable(
+            options.link_cache_db,
+            os.path.join("latest_logs", settings.LINK_CACHE_STATS_FILE))
 
     def beforeTest(self, test):
         test.test.browser = self.options.browser
@@ -182,11 +305,17 @@ class SeleniumBrowser(Plugin):
         test.test.message_duration = self.options.message_duration
         test.test.js_checking_on = self.options.js_checking_on
         test.test.ad_block_on = self.options.ad_block_on
+        test.test.block_resources = self.options.block_resources
         test.test.verify_delay = self.options.verify_delay  # MasterQA
         test.test.disable_csp = self.options.disable_csp
         test.test.save_screenshot_after_test = self.options.save_screenshot
         test.test.visual_baseline = self.options.visual_baseline
         test.test.timeout_multiplier = self.options.timeout_multiplier
+        test.test.lean_mode = self.options.lean_mode
+        test.test.test_budget = self.options.test_budget
+        test.test.reuse_session = self.options.reuse_session
+        test.test.prelaunch = self.options.prelaunch
+        test.test.warm_cache_profile = self.options.warm_cache_profile
         test.test.use_grid = False
         if test.test.servername != "localhost":
             # Use Selenium Grid (Use --server=127.0.0.1 for localhost Grid)
@@ -202,6 +331,41 @@ class SeleniumBrowser(Plugin):
     def finalize(self, result):
         """ This runs after all tests have completed with nosetests. """
         proxy_helper.remove_proxy_zip_if_present()
+        driver_pool.quit_all_drivers()
+        if self.options.prelaunch:
+            from seleniumbase.core import browser_launcher
+            browser_launcher.quit_prelaunched_driver()
+        driver_reaper.drain()
+        process_tracker.reap_all_process_trees()
+        link_cache.save_stats()
+        if self.options.lean_mode:
+            report_lines = lean_mode_helper.get_report_lines()
+            if report_lines:
+                print("\n*** Lean Mode: Time Saved ***")
+                print("\n".join(report_lines))
+        if self.options.profile_launch:
+            report_lines = launch_profiler.get_report_lines()
+            if report_lines:
+                print("\n*** Browser Launch Profile ***")
+                print("\n".join(report_lines))
+        if self.options.prelaunch:
+            from seleniumbase.core import browser_launcher
+            report_lines = browser_launcher.get_prelaunch_report_lines()
+            if report_lines:
+                print("\n*** Pre-launched Browsers ***")
+                print("\n".join(report_lines))
+        report_lines = driver_recycler.get_report_lines()
+        if report_lines:
+            print("\n*** Recycled Browsers ***")
+            print("\n".join(report_lines))
+        report_lines = process_tracker.get_report_lines()
+        if report_lines:
+            print("\n*** Leaked Browser Processes ***")
+            print("\n".join(report_lines))
+        report_lines = link_cache.get_report_lines()
+        if report_lines:
+            print("\n*** Link Status Cache ***")
+            print("\n".join(report_lines))
 
     def afterTest(self, test):
         try:
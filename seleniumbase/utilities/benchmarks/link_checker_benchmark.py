@@ -0,0 +1,267 @@
+"""
+Measures links checked per second by assert_no_404_errors():
+the original checker (a GET request per link, with no connection reuse,
+in a pool of 10 threads) vs. the link_checker engine (pooled connections
+per host, HEAD requests first, and per-host/global concurrency caps).
+
+The links are served by local HTTP stand-in servers (one per "host"),
+with a small delay per request (to act like a network), a body on every
+GET response (to act like a page or an image), some missing links (404),
+and some links that don't support HEAD requests (405).
+
+Before measuring, the status codes of the link_checker engine and the
+link status cache are checked against the stand-in servers: the GET
+fallback for HEAD requests that fail (405), TIMED_OUT vs. CONNECTION_ERROR,
+NOT_CHECKED (time budget), and the cache TTLs. (Any failure exits with 1.)
+
+Usage:
+    python -m seleniumbase.utilities.benchmarks.link_checker_benchmark
+    python -m seleniumbase.utilities.benchmarks.link_checker_benchmark \
+        [--links=LINKS] [--hosts=HOSTS] [--delay=SECONDS] [--kb=KB] \
+        [--check_only]
+"""
+
+import multiprocessing
+import socket
+import sys
+import time
+import requests
+from seleniumbase.config import settings
+from seleniumbase.core import link_cache
+from seleniumbase.core import link_checker
+if sys.version_info[0] == 2:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+else:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+
+SLOW_DELAY = 3  # (Seconds. Links in "/slow/" are slower than any timeout.)
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        pass  # (Ex: The client closed a keep-alive connection)
+
+
+def make_handler(delay, body):
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # (Keep-alive connections)
+
+        def respond(self, send_body):
+            time.sleep(delay)
+            if self.path.startswith("/slow/"):
+                time.sleep(SLOW_DELAY)
+            if self.path.startswith("/missing/"):
+                status_code = 404
+            elif self.path.startswith("/no_head/") and not send_body:
+                status_code = 405
+            else:
+                status_code = 200
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                try:
+                    self.wfile.write(body)
+                except Exception:
+                    pass  # (The client closed the connection early)
+
+        def do_GET(self):
+            self.respond(send_body=True)
+
+        def do_HEAD(self):
+            self.respond(send_body=False)
+
+        def log_message(self, format, *args):
+            pass  # Don't print every request
+
+    return StandInHandler
+
+
+def _serve(port_queue, delay, kb):
+    server = StandInServer(
+        ("127.0.0.1", 0), make_handler(delay, b"x" * (kb * 1024)))
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_servers(hosts, delay, kb):
+    """ Starts a server process for each host (so that the servers don't
+        compete with the link checkers for the GIL). Returns the ports. """
+    port_queue = multiprocessing.Queue()
+    processes = []
+    for x in range(hosts):
+        process = multiprocessing.Process(
+            target=_serve, args=(port_queue, delay, kb))
+        process.daemon = True
+        process.start()
+        processes.append(process)
+    ports = [port_queue.get(timeout=10) for process in processes]
+    return ports, processes
+
+
+def get_links(ports, count):
+    links = []
+    for i in range(count):
+        port = ports[i % len(ports)]
+        if i % 50 == 7:
+            folder = "missing"
+        elif i % 10 == 3:
+            folder = "no_head"
+        else:
+            folder = "found"
+        links.append("http://127.0.0.1:%s/%s/%s.png" % (port, folder, i))
+    return links
+
+
+def _get_closed_port():
+    """ Returns a local port that nothing is listening on. """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def check_link_checker(port):
+    """ Checks the status codes of link_checker and the TTLs of link_cache
+        against a stand-in server. Returns the list of failures. """
+    failures = []
+
+    def expect(name, actual, expected):
+        if actual != expected:
+            failures.append("%s: expected %s, got %s" % (
+                name, expected, actual))
+    host = "http://127.0.0.1:%s" % port
+    expect("Found link",
+           link_checker.get_link_status_code(host + "/found/1.png"), 200)
+    expect("Missing link (404)",
+           link_checker.get_link_status_code(host + "/missing/1.png"), 404)
+    expect("HEAD fails with 405, GET fallback",
+           link_checker.get_link_status_code(host + "/no_head/1.png"), 200)
+    expect("Read timeout",
+           link_checker.get_link_status_code(
+               host + "/slow/1.png", timeout=0.5), link_checker.TIMED_OUT)
+    expect("Connection refused",
+           link_checker.get_link_status_code(
+               "http://127.0.0.1:%s/x.png" % _get_closed_port()),
+           link_checker.CONNECTION_ERROR)
+    # (One worker: The slow link uses up the time budget, so the next link
+    # never gets checked. The slow link's timeout is capped at the budget.)
+    status_codes = link_checker.check_links(
+        [host + "/slow/2.png", host + "/found/2.png"], timeout=5,
+        max_workers=1, time_budget=1)
+    expect("Timed out at the end of the time budget",
+           status_codes[host + "/slow/2.png"], link_checker.TIMED_OUT)
+    expect("Not checked within the time budget",
+           status_codes[host + "/found/2.png"], link_checker.NOT_CHECKED)
+
+    ttls = (settings.LINK_CACHE_TTL, settings.LINK_CACHE_NEGATIVE_TTL)
+    settings.LINK_CACHE_TTL = 1.0
+    settings.LINK_CACHE_NEGATIVE_TTL = 0.4
+    try:
+        link_cache.enable()
+        link_cache.clear()
+        link_cache.put_many({
+            "/ok": 200, "/broken": 404, "/timed_out": link_checker.TIMED_OUT,
+            "/refused": link_checker.CONNECTION_ERROR})
+        expect("Cached (TTL)", link_cache.get("/ok"), 200)
+        expect("Cached (negative TTL)", link_cache.get("/broken"), 404)
+        expect("Timeouts aren't cached",
+               link_cache.get("/timed_out"), link_cache.MISS)
+        expect("Connection errors aren't cached",
+               link_cache.get("/refused"), link_cache.MISS)
+        time.sleep(0.6)
+        expect("Still cached (TTL)", link_cache.get("/ok"), 200)
+        expect("Expired (negative TTL)",
+               link_cache.get("/broken"), link_cache.MISS)
+        time.sleep(0.6)
+        expect("Expired (TTL)", link_cache.get("/ok"), link_cache.MISS)
+    finally:
+        link_cache.clear()
+        settings.LINK_CACHE_TTL, settings.LINK_CACHE_NEGATIVE_TTL = ttls
+    return failures
+
+
+def _original_get_link_status_code(link, allow_redirects=False, timeout=5):
+    """ The status code check used before link_checker.py """
+    try:
+        response = requests.get(
+            link, allow_redirects=allow_redirects, timeout=timeout)
+        return response.status_code
+    except Exception:
+        return 404
+
+
+def check_links_original(links):
+    from multiprocessing.dummy import Pool as ThreadPool
+    pool = ThreadPool(10)
+    status_codes = pool.map(_original_get_link_status_code, links)
+    pool.close()
+    pool.join()
+    return dict(zip(links, status_codes))
+
+
+def check_links_engine(links):
+    return link_checker.check_links(links)
+
+
+def _measure(function, links):
+    """ Returns (links per second, the status codes). """
+    start = time.time()
+    status_codes = function(links)
+    return len(links) / (time.time() - start), status_codes
+
+
+def main():
+    link_count = 3000
+    hosts = 4
+    delay = 0.05
+    kb = 64
+    check_only = False
+    for arg in sys.argv[1:]:
+        if arg.startswith("--links="):
+            link_count = int(arg.split("=")[1])
+        elif arg.startswith("--hosts="):
+            hosts = int(arg.split("=")[1])
+        elif arg.startswith("--delay="):
+            delay = float(arg.split("=")[1])
+        elif arg.startswith("--kb="):
+            kb = int(arg.split("=")[1])
+        elif arg == "--check_only":
+            check_only = True
+    ports, processes = start_servers(hosts, delay, kb)
+    failures = check_link_checker(ports[0])
+    print("Status code and cache checks: %s" % (
+        "FAILED" if failures else "OK"))
+    for failure in failures:
+        print("* " + failure)
+    if failures or check_only:
+        for process in processes:
+            process.terminate()
+        sys.exit(1 if failures else 0)
+    links = get_links(ports, link_count)
+    print("Links: %s across %s hosts (%sms delay, %s KB bodies)\n" % (
+        link_count, hosts, int(delay * 1000), kb))
+
+    original, original_codes = _measure(check_links_original, links)
+    engine, engine_codes = _measure(check_links_engine, links)
+    mismatches = len(
+        [link for link in links if original_codes[link] != engine_codes[link]])
+    print("%-30s %12s %8s" % ("Checker", "Links/sec", "Speedup"))
+    print("%-30s %12d %8s" % ("Original (GET, no pooling)", original, "1.00x"))
+    print("%-30s %12d %7.2fx" % (
+        "link_checker (HEAD, pooled)", engine, engine / original))
+    print("\nStatus codes that differ: %s" % mismatches)
+    for process in processes:
+        process.terminate()
+
+
+if __name__ == "__main__":
+    main()
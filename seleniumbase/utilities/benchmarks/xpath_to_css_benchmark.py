@@ -0,0 +1,226 @@
+"""
+Measures XPath-to-CSS conversions per second:
+the original regex converter vs. the compiled converter (cold and cached).
+
+The corpus is made of the XPath strings found in the examples/ folder
+(Python files and ReadMe files), plus a built-in list of real-world
+selectors, since the examples mostly use CSS Selectors.
+Speeds are measured on the XPaths that both converters support.
+(The original converter fails fast on the others, which isn't a fair
+comparison.)
+
+Before measuring, the output of the compiled converter is checked against
+the original converter for every XPath that the original supports. The
+only differences allowed are the intended changes in INTENDED_CHANGES.
+Any other difference is a regression, and the benchmark exits with 1.
+
+Usage:
+    python -m seleniumbase.utilities.benchmarks.xpath_to_css_benchmark
+    python -m seleniumbase.utilities.benchmarks.xpath_to_css_benchmark \
+        [EXAMPLES_DIR] [--seconds=SECONDS]
+"""
+
+import os
+import re
+import sys
+import time
+from seleniumbase.fixtures import page_utils
+from seleniumbase.fixtures import xpath_to_css
+
+BUILT_IN_CORPUS = [
+    '//*[@id="user[login]"]',
+    "(//button[@type='submit'])[1]",
+    "/html/body/div[3]/div[4]/p[2]/a",
+    "//a[contains(text(),'Sign in')]",
+    "//div[@class='search-box']/input",
+    "//input[@name='q']",
+    "//span[@class='btn btn-primary']",
+    "//ul[@id='menu']/li[2]/a",
+    "//div[contains(@class,'results')]//h3",
+    "//table[@id='data']/tbody/tr[3]/td[1]",
+    "//input[@name='q' and @type='text']",
+    "//a[starts-with(@href,'/wiki/')]",
+    "//li[last()]",
+    "//div[not(@hidden)]//button",
+    "//a[text()='Home']",
+    "id('main')/div",
+    "//form[@action='/login']//input[@type='password']",
+    "//a[@title='Sign up now']",
+    "//div[@class='a']//span[2]",
+    "//*[@data-id='5']",
+    "//a[contains(@href,'login')]",
+    "//td[.='Total']",
+    "//input[@id='first-name']",
+    "//button[contains(text(),'Log in')]",
+    "//*[@id='a b']",
+    "//div[@id='x']/*[2]",
+]
+
+# The intended differences from the original converter's output, as
+# (description, regex, replacement) rules that turn an original output into
+# the expected compiled output
+INTENDED_CHANGES = [
+    ('text()="x" and .="x" become :contains("x"). (jQuery has no exact '
+     'text match, and the original ":contains(^x$)" looked for the literal '
+     'text "^x$", which never matched.)',
+     re.compile(r":contains\(\^(.*?)\$\)"), r':contains("\1")'),
+    ('contains(text(), "x") becomes :contains("x"). (Quoted, so that text '
+     'with spaces or parentheses works.)',
+     re.compile(r":contains\(([^\"].*?)\)"), r':contains("\1")'),
+    ('Attribute values are always quoted with double quotes. (The original '
+     'left some values unquoted, which is invalid for values such as "5".)',
+     re.compile(r"\[([-\w:.]+)([*^$]?=)(?:'([^'\]]*)'|([^\"'\]]*))\]"),
+     lambda match: '[%s%s"%s"]' % (
+         match.group(1), match.group(2), match.group(3) or match.group(4))),
+    ('IDs that aren\'t CSS identifiers become [id="..."]. (The original '
+     'escaped brackets, and turned "a b" into "#a#b", which never matched.)',
+     re.compile(r"#((?:[-\w]|\\\[|\\\])*(?:#|\\\[)(?:[-\w#]|\\\[|\\\])*)"),
+     lambda match: '[id="%s"]' % match.group(1).replace(
+         "#", " ").replace("\\", "")),
+]
+
+# Quoted strings in Python files (to find XPath selectors in examples/)
+_quoted_string_re = re.compile(r"""("[^"\n]+"|'[^'\n]+')""")
+
+
+def get_corpus_from_examples(examples_dir):
+    corpus = []
+    if not os.path.isdir(examples_dir):
+        return corpus
+    for root, dirs, files in os.walk(examples_dir):
+        for file_name in sorted(files):
+            if not file_name.endswith(".py") and (
+                    not file_name.endswith(".md")):
+                continue
+            with open(os.path.join(root, file_name), "r") as f:
+                text = f.read()
+            for quoted in _quoted_string_re.findall(text):
+                selector = quoted[1:-1]
+                if not page_utils.is_xpath_selector(selector):
+                    continue
+                if "://" in selector or selector.startswith("//www."):
+                    continue  # A URL
+                try:
+                    # Only keep XPaths that one of the converters can handle
+                    xpath_to_css.convert_xpath_to_css(selector)
+                except Exception:
+                    continue
+                if selector not in corpus:
+                    corpus.append(selector)
+    return corpus
+
+
+def get_expected_css(legacy_css):
+    """ Applies the INTENDED_CHANGES to an output of the original converter.
+    """
+    for description, pattern, replacement in INTENDED_CHANGES:
+        legacy_css = pattern.sub(replacement, legacy_css)
+    return legacy_css
+
+
+def check_parity(corpus):
+    """ Compares the compiled converter with the original converter.
+        Returns the regressions, as (xpath, expected, actual) tuples.
+        (XPaths that the original converter doesn't support are skipped.)
+    """
+    regressions = []
+    for selector in corpus:
+        try:
+            legacy_css = xpath_to_css._legacy_convert_xpath_to_css(selector)
+        except Exception:
+            continue
+        expected = get_expected_css(legacy_css)
+        try:
+            actual = xpath_to_css.compile_xpath_to_css(selector)
+        except Exception as e:
+            actual = "%s: %s" % (e.__class__.__name__, e)
+        if actual != expected:
+            regressions.append((selector, expected, actual))
+    return regressions
+
+
+def _measure(function, corpus, seconds):
+    """ Returns the number of conversions per second. """
+    conversions = 0
+    start = time.time()
+    stop = start + seconds
+    while time.time() < stop:
+        for selector in corpus:
+            try:
+                function(selector)
+            except Exception:
+                pass
+        conversions += len(corpus)
+    return conversions / (time.time() - start)
+
+
+def _convert_cached(xpath):
+    return xpath_to_css.convert_xpath_to_css(xpath)
+
+
+def _convert_cold(xpath):
+    try:
+        return xpath_to_css.compile_xpath_to_css(xpath)
+    except xpath_to_css.XpathException:
+        return xpath_to_css._legacy_convert_xpath_to_css(xpath)
+
+
+def main():
+    seconds = 1.0
+    examples_dir = os.path.join(os.getcwd(), "examples")
+    for arg in sys.argv[1:]:
+        if arg.startswith("--seconds="):
+            seconds = float(arg.split("=")[1])
+        else:
+            examples_dir = arg
+    corpus = get_corpus_from_examples(examples_dir)
+    example_count = len(corpus)
+    for selector in BUILT_IN_CORPUS:
+        if selector not in corpus:
+            corpus.append(selector)
+    print("Corpus: %s XPaths (%s from %s, %s built-in)" % (
+        len(corpus), example_count, examples_dir,
+        len(corpus) - example_count))
+
+    legacy_supported = []
+    compiled_supported = []
+    for selector in corpus:
+        try:
+            xpath_to_css._legacy_convert_xpath_to_css(selector)
+            legacy_supported.append(selector)
+        except Exception:
+            pass
+        try:
+            xpath_to_css.compile_xpath_to_css(selector)
+            compiled_supported.append(selector)
+        except Exception:
+            pass
+    print("Supported by the original converter: %s/%s" % (
+        len(legacy_supported), len(corpus)))
+    print("Supported by the compiled converter: %s/%s" % (
+        len(compiled_supported), len(corpus)))
+    corpus = [selector for selector in legacy_supported
+              if selector in compiled_supported]
+    regressions = check_parity(legacy_supported)
+    print("Differences from the original converter (besides "
+          "INTENDED_CHANGES): %s" % len(regressions))
+    for selector, expected, actual in regressions:
+        print("* %s\n    Expected: %s\n    Actual:   %s" % (
+            selector, expected, actual))
+    if regressions:
+        sys.exit(1)
+    print("Measured (supported by both): %s\n" % len(corpus))
+
+    legacy = _measure(
+        xpath_to_css._legacy_convert_xpath_to_css, corpus, seconds)
+    cold = _measure(_convert_cold, corpus, seconds)
+    xpath_to_css.convert_xpath_to_css.cache_clear()
+    cached = _measure(_convert_cached, corpus, seconds)
+    print("%-30s %12s %8s" % ("Converter", "Conv/sec", "Speedup"))
+    print("%-30s %12d %8s" % ("Original (regex)", legacy, "1.00x"))
+    print("%-30s %12d %7.2fx" % ("Compiled (cold)", cold, cold / legacy))
+    print("%-30s %12d %7.2fx" % ("Compiled (cached)", cached, cached / legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -79,10 +79,12 @@ setup(
         'boto>=2.49.0',
         'flake8>=3.7.7',
         'certifi>=2019.3.9',
+        'psutil>=5.6.3',
         'PyVirtualDisplay==0.2.1',  # Keep at 0.2.1 (later versions are slow)
     ],
     packages=[
         'seleniumbase',
+        'seleniumbase.assets',
         'seleniumbase.common',
         'seleniumbase.config',
         'seleniumbase.console_scripts',
@@ -93,6 +95,7 @@ setup(
         'seleniumbase.masterqa',
         'seleniumbase.plugins',
         'seleniumbase.utilities',
+        'seleniumbase.utilities.benchmarks',
         'seleniumbase.utilities.selenium_grid',
         'seleniumbase.utilities.selenium_ide',
     ],